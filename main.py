@@ -1,470 +1,558 @@
 #%%
+import argparse
 import os
+import time
 import pandas as pd
-from openpyxl.styles import Alignment
-from modules.credit_risk_assessment.calculate_pd import process_PD_domestic_corporate_credit, process_PD_domestic_personal_mortgage, process_PD_domestic_personal_other, process_PD_overseas_credit, process_PD_domestic_investment, process_PD_overseas_investment
-from modules.credit_risk_assessment.calculate_lgd import process_LGD_domestic_corporate_credit, process_LGD_domestic_personal_mortgage, process_LGD_domestic_personal_other, process_LGD_overseas_credit, process_LGD_domestic_investment, process_LGD_overseas_investment
-from modules.credit_risk_assessment.calculate_ead import process_EAD_domestic_corporate_credit, process_EAD_domestic_personal_mortgage, process_EAD_domestic_personal_other, process_EAD_overseas_credit, process_EAD_domestic_investment, process_EAD_overseas_investment
+from modules.ingestion import load_portfolio, is_input_file, STREAMABLE_EXTENSIONS
+from modules.credit_risk_assessment.sharding import compute_results_sharded, start_shard_pool
+from modules.credit_risk_assessment.summary import expected_loss, store_summary
+from modules.credit_risk_assessment.streaming import stream_portfolio
+
+# Excel engine used to read input workbooks; 'calamine' (python-calamine) parses much faster than the default openpyxl
+EXCEL_ENGINE = None
+
+# Formats the summary tables are saved in: 'excel' and/or 'parquet' (needs pyarrow)
+OUTPUT_FORMATS = ('excel',)
+
+# Rows per chunk for streaming CSV/Parquet portfolios; None loads every file whole.
+# Streamed summaries are written as Parquet when OUTPUT_FORMATS includes it, CSV otherwise.
+STREAM_CHUNK_SIZE = None
+
+# Worker processes of main(); None uses every CPU, 1 runs every file in the main process
+WORKERS = None
+
+# Worker processes each large input file is split across by rows, see compute_results_sharded;
+# None shares out the CPUs the file-level workers leave idle
+SHARD_WORKERS = None
+
+# Files buffered between the read, compute and write stages of a run in one process, see run_pipeline;
+# 0 processes the files strictly one after another
+PIPELINE_DEPTH = 1
+
+# Consolidated report of a run of main(), one row per input file
+RUN_REPORT_PATH = 'results-data_files/執行報告.csv'
+RUN_REPORT_COLUMNS = ['run', 'file', 'portfolio_type', 'summary_rows', 'seconds', 'worker', 'status', 'error', 'outputs']
+
+# Input directory, output directory, input file name suffix and summary table name by horizon of every portfolio run.
+# The domestic investment run takes every input file of its directory; 股權投資部位 files are domestic_equity_investment.
+PORTFOLIO_RUNS = {
+    'domestic_corporate_credit': ('input-data_files/授信部位/國內授信/', 'results-data_files/授信部位/國內授信/', '國內企業授信',
+                                  {'2030': '國內授信彙總表(2030年)(企業授信)', '2050': '國內授信彙總表(2050年)(企業授信)'}),
+    'domestic_personal_mortgage': ('input-data_files/授信部位/國內授信/', 'results-data_files/授信部位/國內授信/', '國內個人授信-房貸擔保品',
+                                   {'2030': '國內授信彙總表(2030年)(個人授信-房貸擔保品)', '2050': '國內授信彙總表(2050年)(個人授信-房貸擔保品)'}),
+    'domestic_personal_other': ('input-data_files/授信部位/國內授信/', 'results-data_files/授信部位/國內授信/', '國內個人授信-其他擔保品',
+                                {'2030': '國內授信彙總表(2030年)(個人授信-其他擔保品)', '2050': '國內授信彙總表(2050年)(個人授信-其他擔保品)'}),
+    'overseas_credit': ('input-data_files/授信部位/國外授信/', 'results-data_files/授信部位/國外授信/', '國外授信',
+                        {'2030': '國外授信彙總表(2030年)', '2050': '國外授信彙總表(2050年)'}),
+    'domestic_investment': ('input-data_files/投資部位/國內投資/', 'results-data_files/投資部位/國內投資/', '',
+                            {'2030': '國內投資彙總表(2030年)', '2050': '國內投資彙總表(2050年)'}),
+    'overseas_investment': ('input-data_files/投資部位/國外投資/', 'results-data_files/投資部位/國外投資/', '國外投資',
+                            {'2030': '國外投資彙總表(2030年)', '2050': '國外投資彙總表(2050年)'}),
+}
+
+# Scenario groups of the summary tables and the measures reported for each
+SCENARIO_HEADERS = ['基準情境', '有序轉型', '無序轉型', '無政策情境']
+SUMMARY_MEASURES = ['平均違約率(%)', '平均違約損失率(%)', '估計可能損失數']
 
 def calculate_expected_loss(ead, pd_rate, lgd_rate):
     """Calculate the expected loss given EAD, PD rate, and LGD rate.
 
     Args:
-        ead (float): Exposure at default.
-        pd_rate (float or list): Probability of default rate.
-        lgd_rate (float or list): Loss given default rate.
+        ead (float or np.ndarray): Exposure at default.
+        pd_rate (float or list or np.ndarray): Probability of default rate.
+        lgd_rate (float or list or np.ndarray): Loss given default rate.
 
     Returns:
-        float: Expected loss.
+        float or np.ndarray: Expected loss, element-wise for array inputs.
     """
     if isinstance(pd_rate, list):
         pd_rate = pd_rate[0]
     if isinstance(lgd_rate, list):
         lgd_rate = lgd_rate[0]
-    el = pd_rate / 100 * lgd_rate / 100 * ead * 100
-    return el
+    return expected_loss(ead, pd_rate, lgd_rate)
 
 
 #%%
-def save_to_excel(summary_df, sheet_name, writer, pd_rate, lgd_rate, pd_rate_orderly, lgd_rate_orderly, pd_rate_disorderly, lgd_rate_disorderly, pd_rate_no_policy, lgd_rate_no_policy, ead):
-    """Save the summary data to an Excel sheet with proper formatting.
+def summarize(summary_df, store, horizon, data_rows=None):
+    """Build the summary table of a domestic portfolio.
+
+    Every row with a 客戶名 gets the first PD and LGD entry of its client name in each scenario,
+    and its own EAD by row id; rows of later sheets get the first EAD of their client name.
 
     Args:
-        summary_df (pd.DataFrame): Summary data frame.
-        sheet_name (str): Name of the sheet to save data.
-        writer (pd.ExcelWriter): Excel writer object.
-        pd_rate (list): List of PD rates.
-        lgd_rate (list): List of LGD rates.
-        pd_rate_orderly (list): List of orderly transition PD rates.
-        lgd_rate_orderly (list): List of orderly transition LGD rates.
-        pd_rate_disorderly (list): List of disorderly transition PD rates.
-        lgd_rate_disorderly (list): List of disorderly transition LGD rates.
-        pd_rate_no_policy (list): List of no policy scenario PD rates.
-        lgd_rate_no_policy (list): List of no policy scenario LGD rates.
-        ead (list): List of EAD values.
+        summary_df (pd.DataFrame): Summary data frame, indexed by row id.
+        store (ResultStore): Results of the portfolio from compute_results.
+        horizon (str): '2030' or '2050'.
+        data_rows (pd.Index): Row ids the store was computed from; None for every summary row.
+
+    Returns:
+        pd.DataFrame: One row per client, with columns named '<scenario>_<measure>'.
     """
-    ead_df = pd.DataFrame(ead)
-    summary_df = summary_df.dropna(subset=['客戶名'])
-    summary_df = summary_df.merge(ead_df, on='客戶名', how='left')
-    summary_df.rename(columns={'EAD': '曝險金額'}, inplace=True)
-
-    pd_rate_df = pd.DataFrame(pd_rate)
-    lgd_rate_df = pd.DataFrame(lgd_rate)
-    pd_rate_orderly_df = pd.DataFrame(pd_rate_orderly)
-    lgd_rate_orderly_df = pd.DataFrame(lgd_rate_orderly)
-    pd_rate_disorderly_df = pd.DataFrame(pd_rate_disorderly)
-    lgd_rate_disorderly_df = pd.DataFrame(lgd_rate_disorderly)
-    pd_rate_no_policy_df = pd.DataFrame(pd_rate_no_policy)
-    lgd_rate_no_policy_df = pd.DataFrame(lgd_rate_no_policy)
-
-    summary_data = []
-
-    for idx, row in summary_df.iterrows():
-        company = row['客戶名']
-        company_ead = row['曝險金額']
-
-        # Extract PD and LGD rates for different scenarios
-        company_pd_rate = pd_rate_df[pd_rate_df['客戶名'] == company]['PD(%)'].values
-        company_lgd_rate = lgd_rate_df[lgd_rate_df['客戶名'] == company]['LGD(%)'].values
-        company_pd_rate_orderly = pd_rate_orderly_df[pd_rate_orderly_df['客戶名'] == company]['PD(%)'].values
-        company_lgd_rate_orderly = lgd_rate_orderly_df[lgd_rate_orderly_df['客戶名'] == company]['LGD(%)'].values
-        company_pd_rate_disorderly = pd_rate_disorderly_df[pd_rate_disorderly_df['客戶名'] == company]['PD(%)'].values
-        company_lgd_rate_disorderly = lgd_rate_disorderly_df[lgd_rate_disorderly_df['客戶名'] == company]['LGD(%)'].values
-        company_pd_rate_no_policy = pd_rate_no_policy_df[pd_rate_no_policy_df['客戶名'] == company]['PD(%)'].values
-        company_lgd_rate_no_policy = lgd_rate_no_policy_df[lgd_rate_no_policy_df['客戶名'] == company]['LGD(%)'].values
-
-        result = {
-            '客戶名': company,
-            '曝險金額': company_ead,
-            '基準情境_平均違約率': float('nan'), '基準情境_平均違約損失率': float('nan'), '基準情境_估計可能損失數': float('nan'), 
-            '有序轉型_平均違約率': float('nan'), '有序轉型_平均違約損失率': float('nan'), '有序轉型_估計可能損失數': float('nan'), 
-            '無序轉型_平均違約率': float('nan'), '無序轉型_平均違約損失率': float('nan'), '無序轉型_估計可能損失數': float('nan'), 
-            '無政策情境_平均違約率': float('nan'), '無政策情境_平均違約損失率': float('nan'), '無政策情境_估計可能損失數': float('nan')
-        }
-
-        # Baseline scenario
-        if len(company_pd_rate) > 0:
-            result['基準情境_平均違約率'] = company_pd_rate[0]
-            result['基準情境_估計可能損失數'] = float('nan')
-        if len(company_lgd_rate) > 0:
-            result['基準情境_平均違約損失率'] = company_lgd_rate[0] *100
-            result['基準情境_估計可能損失數'] = float('nan')
-        if len(company_pd_rate) > 0 and len(company_lgd_rate) > 0:
-            base_el = calculate_expected_loss(company_ead, company_pd_rate[0], company_lgd_rate[0])
-            result['基準情境_估計可能損失數'] = base_el
-
-        # Orderly transition scenario
-        if len(company_pd_rate_orderly) > 0:
-            result['有序轉型_平均違約率'] = company_pd_rate_orderly[0]
-            result['有序轉型_估計可能損失數'] = float('nan')
-        if len(company_lgd_rate_orderly) > 0:
-            result['有序轉型_平均違約損失率'] = company_lgd_rate_orderly[0]*100
-            result['有序轉型_估計可能損失數'] = float('nan')
-        elif len(company_pd_rate_orderly) > 0 and len(company_lgd_rate_orderly) > 0:
-            orderly_el = calculate_expected_loss(company_ead, company_pd_rate_orderly[0], company_lgd_rate_orderly[0])
-            result['有序轉型_估計可能損失數'] = orderly_el
-
-        # Disorderly transition scenario
-        if len(company_pd_rate_disorderly) > 0:
-            result['無序轉型_平均違約率'] = company_pd_rate_disorderly[0] 
-            result['無序轉型_估計可能損失數'] = float('nan')
-        if len(company_lgd_rate_disorderly) > 0:
-            result['無序轉型_平均違約損失率'] = company_lgd_rate_disorderly[0]*100
-            result['無序轉型_估計可能損失數'] = float('nan')
-        if len(company_pd_rate_disorderly) > 0 and len(company_lgd_rate_disorderly) > 0:
-            disorderly_el = calculate_expected_loss(company_ead, company_pd_rate_disorderly[0], company_lgd_rate_disorderly[0])
-            result['無序轉型_估計可能損失數'] = disorderly_el        
-
-        # No policy scenario
-        if len(company_pd_rate_no_policy) > 0:
-            result['無政策情境_平均違約率'] = company_pd_rate_no_policy[0]
-            result['無政策情境_估計可能損失數'] = float('nan')
-        if len(company_lgd_rate_no_policy) > 0:
-            result['無政策情境_平均違約損失率'] = company_lgd_rate_no_policy[0]*100
-            result['無政策情境_估計可能損失數'] = float('nan')
-        if len(company_pd_rate_no_policy) > 0 and len(company_lgd_rate_no_policy) > 0:
-            no_policy_el = calculate_expected_loss(company_ead, company_pd_rate_no_policy[0], company_lgd_rate_no_policy[0])
-            result['無政策情境_估計可能損失數'] = no_policy_el
-
-        summary_data.append(result)
-
-    summary_result_df = pd.DataFrame(summary_data)
-    
-    # Update column titles
-    summary_result_df.columns = ['客戶名', '曝險金額'] + ['平均違約率(%)', '平均違約損失率(%)', '估計可能損失數'] * 4
-
-    # Save the summary data frame to the specified Excel sheet
-    summary_result_df.to_excel(writer, sheet_name=sheet_name, index=False, startrow=1)
-    worksheet = writer.sheets[sheet_name]
-
-    # Merge cells for the scenario headers and set alignment
-    worksheet.merge_cells('C1:E1')
-    worksheet['C1'] = '基準情境'
-    worksheet['C1'].alignment = Alignment(horizontal='center', vertical='center')
-
-    worksheet.merge_cells('F1:H1')
-    worksheet['F1'] = '有序轉型'
-    worksheet['F1'].alignment = Alignment(horizontal='center', vertical='center')
-
-    worksheet.merge_cells('I1:K1')
-    worksheet['I1'] = '無序轉型'
-    worksheet['I1'].alignment = Alignment(horizontal='center', vertical='center')
-
-    worksheet.merge_cells('L1:N1')
-    worksheet['L1'] = '無政策情境'
-    worksheet['L1'].alignment = Alignment(horizontal='center', vertical='center')
-
-def save_to_excel_overseas(summary_df, sheet_name, writer, pd_rate, lgd_rate, pd_rate_orderly, lgd_rate_orderly, pd_rate_disorderly, lgd_rate_disorderly, ead):
-    """Save the overseas summary data to an Excel sheet with proper formatting.
+    return store_summary(summary_df, store, horizon, data_rows=data_rows)
+
+def summarize_overseas(summary_df, store, horizon, data_rows=None):
+    """Build the summary table of an overseas portfolio.
 
     Args:
-        summary_df (pd.DataFrame): Summary data frame.
+        summary_df (pd.DataFrame): Summary data frame, indexed by row id.
+        store (ResultStore): Results of the portfolio from compute_results.
+        horizon (str): '2030' or '2050'.
+        data_rows (pd.Index): Row ids the store was computed from; None for every summary row.
+
+    Returns:
+        pd.DataFrame: One row per client, with columns named '<scenario>_<measure>'.
+    """
+    return store_summary(summary_df, store, horizon, overseas=True, data_rows=data_rows)
+
+def write_summary_sheet(summary_result_df, sheet_name, workbook):
+    """Write a summary table to a sheet of a write-only workbook with merged scenario headers.
+
+    The scenario headers, column titles and rows are written in a single forward pass, so the
+    sheet is never held in memory. Missing values are written as empty strings like DataFrame.to_excel.
+
+    Args:
+        summary_result_df (pd.DataFrame): Summary table from summarize or summarize_overseas.
         sheet_name (str): Name of the sheet to save data.
-        writer (pd.ExcelWriter): Excel writer object.
-        pd_rate (list): List of PD rates.
-        lgd_rate (list): List of LGD rates.
-        pd_rate_orderly (list): List of orderly transition PD rates.
-        lgd_rate_orderly (list): List of orderly transition LGD rates.
-        pd_rate_disorderly (list): List of disorderly transition PD rates.
-        lgd_rate_disorderly (list): List of disorderly transition LGD rates.
-        ead (list): List of EAD values.
+        workbook (Workbook): Workbook opened with write_only=True.
     """
-    ead_df = pd.DataFrame(ead)
-    summary_df = summary_df.dropna(subset=['客戶名'])
-    summary_df = summary_df.merge(ead_df, on='客戶名', how='left')
-    summary_df.rename(columns={'EAD': '曝險金額'}, inplace=True)
-
-    pd_rate_df = pd.DataFrame(pd_rate)
-    lgd_rate_df = pd.DataFrame(lgd_rate)
-    pd_rate_orderly_df = pd.DataFrame(pd_rate_orderly)
-    lgd_rate_orderly_df = pd.DataFrame(lgd_rate_orderly)
-    pd_rate_disorderly_df = pd.DataFrame(pd_rate_disorderly)
-    lgd_rate_disorderly_df = pd.DataFrame(lgd_rate_disorderly)
-
-    summary_data = []
-
-    for idx, row in summary_df.iterrows():
-        company = row['客戶名']
-        company_ead = row['曝險金額']
-
-        # Ensure the extracted data is not a list
-        company_pd_rate = pd_rate_df[pd_rate_df['客戶名'] == company]['PD(%)'].values
-        company_lgd_rate = lgd_rate_df[lgd_rate_df['客戶名'] == company]['LGD(%)'].values
-        company_pd_rate_orderly = pd_rate_orderly_df[pd_rate_orderly_df['客戶名'] == company]['PD(%)'].values
-        company_lgd_rate_orderly = lgd_rate_orderly_df[lgd_rate_orderly_df['客戶名'] == company]['LGD(%)'].values
-        company_pd_rate_disorderly = pd_rate_disorderly_df[pd_rate_disorderly_df['客戶名'] == company]['PD(%)'].values
-        company_lgd_rate_disorderly = lgd_rate_disorderly_df[lgd_rate_disorderly_df['客戶名'] == company]['LGD(%)'].values
-
-        result = {
-            '客戶名': company,
-            '曝險金額': company_ead,
-            '基準情境_平均違約率': company_pd_rate[0] if len(company_pd_rate) > 0 else float('nan'),
-            '基準情境_平均違約損失率': company_lgd_rate[0]*100 if len(company_lgd_rate) > 0 else float('nan'),
-            '基準情境_估計可能損失數': float('nan'),
-            '有序轉型_平均違約率': company_pd_rate_orderly[0] if len(company_pd_rate_orderly) > 0 else float('nan'),
-            '有序轉型_平均違約損失率': company_lgd_rate_orderly[0]*100 if len(company_lgd_rate_orderly) > 0 else float('nan'),
-            '有序轉型_估計可能損失數': float('nan'),
-            '無序轉型_平均違約率': company_pd_rate_disorderly[0] if len(company_pd_rate_disorderly) > 0 else float('nan'),
-            '無序轉型_平均違約損失率': company_lgd_rate_disorderly[0]*100 if len(company_lgd_rate_disorderly) > 0 else float('nan'),
-            '無序轉型_估計可能損失數': float('nan')
-        }
-
-        # Baseline scenario
-        if not pd.isna(result['基準情境_平均違約率']) and not pd.isna(result['基準情境_平均違約損失率']):
-            base_el = calculate_expected_loss(company_ead, result['基準情境_平均違約率'], result['基準情境_平均違約損失率'])
-            result['基準情境_估計可能損失數'] = base_el
-
-        # Orderly transition scenario
-        if not pd.isna(result['有序轉型_平均違約率']) and not pd.isna(result['有序轉型_平均違約損失率']):
-            orderly_el = calculate_expected_loss(company_ead, result['有序轉型_平均違約率'], result['有序轉型_平均違約損失率'])
-            result['有序轉型_估計可能損失數'] = orderly_el
-
-        # Disorderly transition scenario
-        if not pd.isna(result['無序轉型_平均違約率']) and not pd.isna(result['無序轉型_平均違約損失率']):
-            disorderly_el = calculate_expected_loss(company_ead, result['無序轉型_平均違約率'], result['無序轉型_平均違約損失率'])
-            result['無序轉型_估計可能損失數'] = disorderly_el        
-
-        summary_data.append(result)
-
-    summary_result_df = pd.DataFrame(summary_data)
-
-    # Update column titles
-    summary_result_df.columns = ['客戶名', '曝險金額'] + ['平均違約率(%)', '平均違約損失率(%)', '估計可能損失數'] * 3
-
-    # Save the summary data frame to the specified Excel sheet
-    summary_result_df.to_excel(writer, sheet_name=sheet_name, index=False, startrow=1)
-    worksheet = writer.sheets[sheet_name]
-
-    # Merge cells for the scenario headers and set alignment
-    worksheet.merge_cells('C1:E1')
-    worksheet['C1'] = '基準情境'
-    worksheet['C1'].alignment = Alignment(horizontal='center', vertical='center')
-
-    worksheet.merge_cells('F1:H1')
-    worksheet['F1'] = '有序轉型'
-    worksheet['F1'].alignment = Alignment(horizontal='center', vertical='center')
-
-    worksheet.merge_cells('I1:K1')
-    worksheet['I1'] = '無序轉型'
-    worksheet['I1'].alignment = Alignment(horizontal='center', vertical='center')
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment
+    from openpyxl.utils import get_column_letter
+
+    worksheet = workbook.create_sheet(sheet_name)
+    scenario_count = (len(summary_result_df.columns) - 2) // len(SUMMARY_MEASURES)
+
+    # Scenario headers, each merged over the cells of its measures and centered
+    header_row = [None] * (2 + scenario_count * len(SUMMARY_MEASURES))
+    for index, header in enumerate(SCENARIO_HEADERS[:scenario_count]):
+        first_column = 3 + index * len(SUMMARY_MEASURES)
+        header_row[first_column - 1] = WriteOnlyCell(worksheet, value=header)
+        header_row[first_column - 1].alignment = Alignment(horizontal='center', vertical='center')
+        worksheet.merged_cells.add(f'{get_column_letter(first_column)}1:{get_column_letter(first_column + len(SUMMARY_MEASURES) - 1)}1')
+    worksheet.append(header_row)
+
+    # Column titles and rows
+    worksheet.append(['客戶名', '曝險金額'] + SUMMARY_MEASURES * scenario_count)
+    rows = summary_result_df.astype(object).where(summary_result_df.notna(), '')
+    for row in rows.itertuples(index=False, name=None):
+        worksheet.append(row)
+
+def stream_results(output_dir, filename, file_path, portfolio_type, sheet_names):
+    """Stream a CSV or Parquet portfolio in chunks of STREAM_CHUNK_SIZE rows into summary files.
 
+    Args:
+        output_dir (str): Directory of the result files.
+        filename (str): Name of the input file.
+        file_path (str): Path to the input file.
+        portfolio_type (str): Portfolio type, e.g. 'domestic_corporate_credit'.
+        sheet_names (dict): Summary table name by horizon ('2030' and '2050').
 
-def process_domestic_corporate_credit():
-    input_dir = 'input-data_files/授信部位/國內授信/'
-    output_dir = 'results-data_files/授信部位/國內授信/'
-
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    for filename in os.listdir(input_dir):
-        if filename.endswith('國內企業授信.xlsx'):
-            file_path = os.path.join(input_dir, filename)
-            xls = pd.ExcelFile(file_path)
-
-            pd_rate, pd_rate_orderly_2030, pd_rate_disorderly_2030, pd_rate_no_policy_2030, pd_rate_orderly_2050, pd_rate_disorderly_2050, pd_rate_no_policy_2050, pd_rate_no_policy_2090 = process_PD_domestic_corporate_credit(file_path)
-            lgd_rate, lgd_rate_orderly_2030, lgd_rate_disorderly_2030, lgd_rate_no_policy_2030, lgd_rate_orderly_2050, lgd_rate_disorderly_2050, lgd_rate_no_policy_2050, lgd_rate_no_policy_2090 = process_LGD_domestic_corporate_credit(file_path)
-            ead = process_EAD_domestic_corporate_credit(file_path)
-
-            summary_2030 = []
-            summary_2050 = []
-            
-            for sheet_name in xls.sheet_names:
-                df = pd.read_excel(xls, sheet_name=sheet_name)
-                summary_2030.append(df)
-                summary_2050.append(df)
-            
-            summary_df_2030 = pd.concat(summary_2030, ignore_index=True)
-            summary_df_2050 = pd.concat(summary_2050, ignore_index=True)
-
-            output_file_path = os.path.join(output_dir, filename)
-            with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-                save_to_excel(summary_df_2030, '國內授信彙總表(2030年)(企業授信)', writer, pd_rate, lgd_rate, pd_rate_orderly_2030, lgd_rate_orderly_2030, pd_rate_disorderly_2030, lgd_rate_disorderly_2030, pd_rate_no_policy_2030, lgd_rate_no_policy_2030, ead)
-                save_to_excel(summary_df_2050, '國內授信彙總表(2050年)(企業授信)', writer, pd_rate, lgd_rate, pd_rate_orderly_2050, lgd_rate_orderly_2050, pd_rate_disorderly_2050, lgd_rate_disorderly_2050, pd_rate_no_policy_2050, lgd_rate_no_policy_2050, ead)
-
-                print(f"結果已儲存至 {output_file_path}")
+    Returns:
+        tuple: (summary_rows, output_paths) of the file.
+    """
+    stem = os.path.splitext(filename)[0]
+    extension = '.parquet' if 'parquet' in OUTPUT_FORMATS else '.csv'
+    output_paths = {horizon: os.path.join(output_dir, f'{stem}-{sheet_name}{extension}') for horizon, sheet_name in sheet_names.items()}
+    summary_rows = stream_portfolio(file_path, portfolio_type, output_paths, chunk_size=STREAM_CHUNK_SIZE)
+    return summary_rows, list(output_paths.values())
 
-def process_domestic_personal_mortgage_credit():
-    input_dir = 'input-data_files/授信部位/國內授信/'
-    output_dir = 'results-data_files/授信部位/國內授信/'
-
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    for filename in os.listdir(input_dir):
-        if filename.endswith('國內個人授信-房貸擔保品.xlsx'):
-            file_path = os.path.join(input_dir, filename)
-            xls = pd.ExcelFile(file_path)
-
-            pd_rate, pd_rate_orderly_2030, pd_rate_disorderly_2030, pd_rate_no_policy_2030, pd_rate_orderly_2050, pd_rate_disorderly_2050, pd_rate_no_policy_2050, pd_rate_no_policy_2090 = process_PD_domestic_personal_mortgage(file_path)
-            lgd_rate, lgd_rate_orderly_2030, lgd_rate_disorderly_2030, lgd_rate_no_policy_2030, lgd_rate_orderly_2050, lgd_rate_disorderly_2050, lgd_rate_no_policy_2050, lgd_rate_no_policy_2090 = process_LGD_domestic_personal_mortgage(file_path)
-            ead = process_EAD_domestic_personal_mortgage(file_path)
-
-            summary_2030 = []
-            summary_2050 = []
-            
-            for sheet_name in xls.sheet_names:
-                df = pd.read_excel(xls, sheet_name=sheet_name)
-                summary_2030.append(df)
-                summary_2050.append(df)
-            
-            summary_df_2030 = pd.concat(summary_2030, ignore_index=True)
-            summary_df_2050 = pd.concat(summary_2050, ignore_index=True)
-
-            output_file_path = os.path.join(output_dir, filename)
-            with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-                save_to_excel(summary_df_2030, '國內授信彙總表(2030年)(個人授信-房貸擔保品)', writer, pd_rate, lgd_rate, pd_rate_orderly_2030, lgd_rate_orderly_2030, pd_rate_disorderly_2030, lgd_rate_disorderly_2030, pd_rate_no_policy_2030, lgd_rate_no_policy_2030, ead)
-                save_to_excel(summary_df_2050, '國內授信彙總表(2050年)(個人授信-房貸擔保品)', writer, pd_rate, lgd_rate, pd_rate_orderly_2050, lgd_rate_orderly_2050, pd_rate_disorderly_2050, lgd_rate_disorderly_2050, pd_rate_no_policy_2050, lgd_rate_no_policy_2050, ead)
-
-                print(f"結果已儲存至 {output_file_path}")
+def is_streamed(filename):
+    """Check whether an input file is processed in chunks.
 
-def process_domestic_personal_other_credit():
-    input_dir = 'input-data_files/授信部位/國內授信/'
-    output_dir = 'results-data_files/授信部位/國內授信/'
-
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    for filename in os.listdir(input_dir):
-        if filename.endswith('國內個人授信-其他擔保品.xlsx'):
-            file_path = os.path.join(input_dir, filename)
-            xls = pd.ExcelFile(file_path)
-
-            pd_rate, pd_rate_orderly_2030, pd_rate_disorderly_2030, pd_rate_no_policy_2030, pd_rate_orderly_2050, pd_rate_disorderly_2050, pd_rate_no_policy_2050, pd_rate_no_policy_2090 = process_PD_domestic_personal_other(file_path)
-            lgd_rate, lgd_rate_orderly_2030, lgd_rate_disorderly_2030, lgd_rate_no_policy_2030, lgd_rate_orderly_2050, lgd_rate_disorderly_2050, lgd_rate_no_policy_2050, lgd_rate_no_policy_2090 = process_LGD_domestic_personal_other(file_path)
-            ead = process_EAD_domestic_personal_other(file_path)
-
-            summary_2030 = []
-            summary_2050 = []
-            
-            for sheet_name in xls.sheet_names:
-                df = pd.read_excel(xls, sheet_name=sheet_name)
-                summary_2030.append(df)
-                summary_2050.append(df)
-            
-            summary_df_2030 = pd.concat(summary_2030, ignore_index=True)
-            summary_df_2050 = pd.concat(summary_2050, ignore_index=True)
-
-            output_file_path = os.path.join(output_dir, filename)
-            with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-                save_to_excel(summary_df_2030, '國內授信彙總表(2030年)(個人授信-其他擔保品)', writer, pd_rate, lgd_rate, pd_rate_orderly_2030, lgd_rate_orderly_2030, pd_rate_disorderly_2030, lgd_rate_disorderly_2030, pd_rate_no_policy_2030, lgd_rate_no_policy_2030, ead)
-                save_to_excel(summary_df_2050, '國內授信彙總表(2050年)(個人授信-其他擔保品)', writer, pd_rate, lgd_rate, pd_rate_orderly_2050, lgd_rate_orderly_2050, pd_rate_disorderly_2050, lgd_rate_disorderly_2050, pd_rate_no_policy_2050, lgd_rate_no_policy_2050, ead)
-
-                print(f"結果已儲存至 {output_file_path}")
+    Args:
+        filename (str): Name of the input file.
 
-def process_overseas_credit():
-    input_dir = 'input-data_files/授信部位/國外授信/'
-    output_dir = 'results-data_files/授信部位/國外授信/'
-
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    for filename in os.listdir(input_dir):
-        if filename.endswith('國外授信.xlsx'):
-            file_path = os.path.join(input_dir, filename)
-            xls = pd.ExcelFile(file_path)
-
-            pd_rate, pd_rate_orderly_2030, pd_rate_orderly_2050, pd_rate_disorderly_2030, pd_rate_disorderly_2050 = process_PD_overseas_credit(file_path)
-            lgd_rate, lgd_rate_orderly_2030, lgd_rate_disorderly_2030, lgd_rate_orderly_2050, lgd_rate_disorderly_2050 = process_LGD_overseas_credit(file_path)
-            ead = process_EAD_overseas_credit(file_path)
-
-            summary_2030 = []
-            summary_2050 = []
-            
-            for sheet_name in xls.sheet_names:
-                df = pd.read_excel(xls, sheet_name=sheet_name)
-                summary_2030.append(df)
-                summary_2050.append(df)
-            
-            summary_df_2030 = pd.concat(summary_2030, ignore_index=True)
-            summary_df_2050 = pd.concat(summary_2050, ignore_index=True)
-
-            output_file_path = os.path.join(output_dir, filename)
-            with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-                save_to_excel_overseas(summary_df_2030, '國外授信彙總表(2030年)', writer, pd_rate, lgd_rate, pd_rate_orderly_2030, lgd_rate_orderly_2030, pd_rate_disorderly_2030, lgd_rate_disorderly_2030, ead)
-                save_to_excel_overseas(summary_df_2050, '國外授信彙總表(2050年)', writer, pd_rate, lgd_rate, pd_rate_orderly_2050, lgd_rate_orderly_2050, pd_rate_disorderly_2050, lgd_rate_disorderly_2050, ead)
-
-                print(f"結果已儲存至 {output_file_path}")
+    Returns:
+        bool: True when streaming is enabled and the file is CSV or Parquet.
+    """
+    return STREAM_CHUNK_SIZE is not None and os.path.splitext(filename)[1].lower() in STREAMABLE_EXTENSIONS
 
-def process_domestic_investment():
-    input_dir = 'input-data_files/投資部位/國內投資/'
-    output_dir = 'results-data_files/投資部位/國內投資/'
+def save_results(output_dir, filename, summaries):
+    """Save the summary tables of an input file in every format of OUTPUT_FORMATS.
 
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    Args:
+        output_dir (str): Directory of the result files.
+        filename (str): Name of the input file; results keep its name with the output extension.
+        summaries (dict): Summary tables by sheet name.
 
-    for filename in os.listdir(input_dir):
-        if filename.endswith('.xlsx'):
-            file_path = os.path.join(input_dir, filename)
-            xls = pd.ExcelFile(file_path)
+    Returns:
+        list: Paths of the result files.
+    """
+    stem = os.path.splitext(filename)[0]
+    output_paths = []
+    if 'excel' in OUTPUT_FORMATS:
+        from openpyxl import Workbook
+
+        output_file_path = os.path.join(output_dir, f'{stem}.xlsx')
+        workbook = Workbook(write_only=True)
+        for sheet_name, summary_result_df in summaries.items():
+            write_summary_sheet(summary_result_df, sheet_name, workbook)
+        workbook.save(output_file_path)
+        output_paths.append(output_file_path)
+    if 'parquet' in OUTPUT_FORMATS:
+        for sheet_name, summary_result_df in summaries.items():
+            output_file_path = os.path.join(output_dir, f'{stem}-{sheet_name}.parquet')
+            summary_result_df.to_parquet(output_file_path, index=False)
+            output_paths.append(output_file_path)
+    return output_paths
+
+
+def portfolio_type_of(run, filename):
+    """Get the portfolio type of an input file of a portfolio run.
 
-            pd_rate, pd_rate_orderly_2030, pd_rate_disorderly_2030, pd_rate_no_policy_2030, pd_rate_orderly_2050, pd_rate_disorderly_2050, pd_rate_no_policy_2050, pd_rate_no_policy_2090 = process_PD_domestic_investment(file_path)
-            if filename.endswith('股權投資部位.xlsx'):
-                lgd_rate = [{"客戶名": row['客戶名'], "情境": scenario, "LGD(%)": 1} for row in pd.read_excel(file_path).to_dict('records') for scenario in ["基準情境", "2050淨零轉型 2030", "無序轉型 2030", "無政策情境 2030", "2050淨零轉型 2050", "無序轉型 2050", "無政策情境 2050", "無政策情境 2090"]]
-                lgd_rate_orderly_2030 = lgd_rate_disorderly_2030 = lgd_rate_no_policy_2030 = lgd_rate_orderly_2050 = lgd_rate_disorderly_2050 = lgd_rate_no_policy_2050 = lgd_rate_no_policy_2090 = lgd_rate
-            else:
-                lgd_rate, lgd_rate_orderly_2030, lgd_rate_disorderly_2030, lgd_rate_no_policy_2030, lgd_rate_orderly_2050, lgd_rate_disorderly_2050, lgd_rate_no_policy_2050, lgd_rate_no_policy_2090 = process_LGD_domestic_investment(file_path)
+    Args:
+        run (str): Key of PORTFOLIO_RUNS.
+        filename (str): Name of the input file.
 
-            ead = process_EAD_domestic_investment(file_path)
+    Returns:
+        str: Portfolio type, e.g. 'domestic_corporate_credit'.
+    """
+    if run == 'domestic_investment' and is_input_file(filename, '股權投資部位'):
+        return 'domestic_equity_investment'
+    return run
 
-            summary_2030 = []
-            summary_2050 = []
+def list_tasks(runs=None):
+    """List the input files of portfolio runs.
 
-            for sheet_name in xls.sheet_names:
-                df = pd.read_excel(xls, sheet_name=sheet_name)
-                summary_2030.append(df)
-                summary_2050.append(df)
+    Args:
+        runs (list): Keys of PORTFOLIO_RUNS. Defaults to every run.
+
+    Returns:
+        list: (run, filename) tuples in run order, then file name order.
+    """
+    tasks = []
+    for run in runs or PORTFOLIO_RUNS:
+        input_dir, output_dir, suffix, sheet_names = PORTFOLIO_RUNS[run]
+        tasks.extend((run, filename) for filename in sorted(os.listdir(input_dir)) if is_input_file(filename, suffix))
+    return tasks
+
+def read_file(run, filename):
+    """Parse an input file of a portfolio run.
+
+    Args:
+        run (str): Key of PORTFOLIO_RUNS.
+        filename (str): Name of the input file in the input directory of the run.
+
+    Returns:
+        LoadedPortfolio: The parsed portfolio.
+    """
+    input_dir = PORTFOLIO_RUNS[run][0]
+    return load_portfolio(os.path.join(input_dir, filename), portfolio_type_of(run, filename), engine=EXCEL_ENGINE)
+
+def summarize_file(run, filename, portfolio, shard_workers=1, shard_pool=None):
+    """Compute the summary tables of a parsed input file.
+
+    Args:
+        run (str): Key of PORTFOLIO_RUNS.
+        filename (str): Name of the input file.
+        portfolio (LoadedPortfolio): The file parsed by read_file.
+        shard_workers (int): Number of worker processes the rows of the file are split across.
+        shard_pool (ProcessPoolExecutor): Pool from start_shard_pool the rows are split across,
+            or None to start one for the file.
+
+    Returns:
+        dict: Summary tables by sheet name.
+    """
+    sheet_names = PORTFOLIO_RUNS[run][3]
+    portfolio_type = portfolio_type_of(run, filename)
+
+    store = compute_results_sharded(portfolio.data, portfolio_type, shard_workers, pool=shard_pool)
+
+    # Every sheet of the workbook feeds both summary tables
+    summarize_table = summarize_overseas if portfolio_type.startswith('overseas') else summarize
+    return {sheet_name: summarize_table(portfolio.summary, store, horizon, portfolio.data.index) for horizon, sheet_name in sheet_names.items()}
+
+def write_file(run, filename, summaries):
+    """Save the summary tables of an input file in the output directory of its run.
+
+    Args:
+        run (str): Key of PORTFOLIO_RUNS.
+        filename (str): Name of the input file.
+        summaries (dict): Summary tables by sheet name, from summarize_file.
 
-                summary_df_2030 = pd.concat(summary_2030, ignore_index=True)
-                summary_df_2050 = pd.concat(summary_2050, ignore_index=True)
+    Returns:
+        list: Paths of the result files.
+    """
+    output_dir = PORTFOLIO_RUNS[run][1]
+    os.makedirs(output_dir, exist_ok=True)
+    return save_results(output_dir, filename, summaries)
 
-                output_file_path = os.path.join(output_dir, filename)
-                with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-                    save_to_excel(summary_df_2030, '國內投資彙總表(2030年)', writer, pd_rate, lgd_rate, pd_rate_orderly_2030, lgd_rate_orderly_2030, pd_rate_disorderly_2030, lgd_rate_disorderly_2030, pd_rate_no_policy_2030, lgd_rate_no_policy_2030, ead)
-                    save_to_excel(summary_df_2050, '國內投資彙總表(2050年)', writer, pd_rate, lgd_rate, pd_rate_orderly_2050, lgd_rate_orderly_2050, pd_rate_disorderly_2050, lgd_rate_disorderly_2050, pd_rate_no_policy_2050, lgd_rate_no_policy_2050, ead)
+def stream_file(run, filename):
+    """Read, compute and write a streamed input file chunk by chunk.
+
+    Args:
+        run (str): Key of PORTFOLIO_RUNS.
+        filename (str): Name of the input file.
+
+    Returns:
+        tuple: (summary_rows, output_paths) of the file.
+    """
+    input_dir, output_dir, suffix, sheet_names = PORTFOLIO_RUNS[run]
+    os.makedirs(output_dir, exist_ok=True)
+    return stream_results(output_dir, filename, os.path.join(input_dir, filename), portfolio_type_of(run, filename), sheet_names)
 
-                print(f"結果已儲存至 {output_file_path}")
+def process_file(run, filename, shard_workers=1):
+    """Compute and save the summary tables of one input file.
+
+    Args:
+        run (str): Key of PORTFOLIO_RUNS.
+        filename (str): Name of the input file in the input directory of the run.
+        shard_workers (int): Number of worker processes the rows of the file are split across.
+
+    Returns:
+        tuple: (summary_rows, output_paths) of the file.
+    """
+    if is_streamed(filename):
+        return stream_file(run, filename)
+    portfolio = read_file(run, filename)
+    summaries = summarize_file(run, filename, portfolio, shard_workers)
+    return len(portfolio.summary), write_file(run, filename, summaries)
+
+def report_row(task):
+    """Start the run report row of an input file.
+
+    Args:
+        task (tuple): (run, filename) from list_tasks.
+
+    Returns:
+        dict: Report row with the columns of RUN_REPORT_COLUMNS. Its worker is None until the
+        process that handles the whole file sets it.
+    """
+    run, filename = task
+    return {'run': run, 'file': filename, 'portfolio_type': portfolio_type_of(run, filename), 'summary_rows': None,
+            'seconds': None, 'worker': None, 'status': 'ok', 'error': '', 'outputs': []}
+
+def record_failure(row, error):
+    """Mark a report row as failed.
+
+    Args:
+        row (dict): Report row from report_row.
+        error (Exception): The error the file failed with.
+    """
+    row['status'] = 'failed'
+    row['error'] = f'{type(error).__name__}: {error}'
+
+def run_task(task, shard_workers=1):
+    """Process one input file and report on it; a failure is recorded in the report instead of raised.
+
+    Args:
+        task (tuple): (run, filename) from list_tasks.
+        shard_workers (int): Number of worker processes the rows of the file are split across.
+
+    Returns:
+        dict: Report row of the file, with the columns of RUN_REPORT_COLUMNS.
+    """
+    row = report_row(task)
+    row['worker'] = os.getpid()
+    started = time.perf_counter()
+    try:
+        row['summary_rows'], row['outputs'] = process_file(*task, shard_workers)
+    except Exception as error:
+        record_failure(row, error)
+    row['seconds'] = round(time.perf_counter() - started, 3)
+    return row
+
+def stage_executor():
+    """Create the executor of the read or write stage of run_pipeline.
+
+    Returns:
+        Executor: A one-process pool where there is more than one CPU, a one-thread pool otherwise.
+        The process is started with forkserver where available, since the pipeline runs threads.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if (os.cpu_count() or 1) > 1:
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context(start_method))
+    return ThreadPoolExecutor(max_workers=1)
+
+async def run_pipeline(tasks, shard_workers=1, depth=None, shard_pool=None):
+    """Process input files in a three-stage pipeline.
+
+    A reader stage parses the next workbook while the compute stage summarizes the current one
+    and a writer stage saves the previous summaries, so a run takes about as long as its
+    slowest stage. Bounded queues between the stages hold at most depth files. Parsing and
+    writing workbooks with openpyxl hold the GIL, so with spare CPUs the reader and writer each
+    run in a one-process pool; on a single CPU they run in threads. The compute stage runs in a
+    thread of this process. A file that fails in one stage skips the later ones. Streamed files
+    are read, computed and written in the compute stage. The stages of a file may run in different
+    processes, so its report row has no worker. The stages run threads, so large files are only
+    split across forked workers that inherit the reference tables when shard_pool is given.
+
+    Args:
+        tasks (list): (run, filename) tuples from list_tasks.
+        shard_workers (int): Number of worker processes the rows of a file are split across.
+        depth (int): Files buffered between two stages. Defaults to PIPELINE_DEPTH.
+        shard_pool (ProcessPoolExecutor): Pool from start_shard_pool, started before the pipeline,
+            that the rows of large files are split across.
+
+    Returns:
+        list: Report rows in task order.
+    """
+    import asyncio
+
+    rows = [report_row(task) for task in tasks]
+    started = [None] * len(tasks)
+    loop = asyncio.get_running_loop()
+    read_pool, write_pool = stage_executor(), stage_executor()
+    parsed = asyncio.Queue(maxsize=depth or PIPELINE_DEPTH)
+    summarized = asyncio.Queue(maxsize=depth or PIPELINE_DEPTH)
+
+    def finish(position):
+        rows[position]['seconds'] = round(time.perf_counter() - started[position], 3)
+
+    async def reader():
+        for position, (run, filename) in enumerate(tasks):
+            started[position] = time.perf_counter()
+            portfolio = None
+            if not is_streamed(filename):
+                try:
+                    portfolio = await loop.run_in_executor(read_pool, read_file, run, filename)
+                except Exception as error:
+                    record_failure(rows[position], error)
+            await parsed.put((position, portfolio))
+        await parsed.put(None)
+
+    async def computer():
+        while (item := await parsed.get()) is not None:
+            position, portfolio = item
+            run, filename = tasks[position]
+            summaries = None
+            try:
+                if portfolio is None and rows[position]['status'] == 'ok':
+                    rows[position]['summary_rows'], rows[position]['outputs'] = await asyncio.to_thread(stream_file, run, filename)
+                elif portfolio is not None:
+                    summaries = await asyncio.to_thread(summarize_file, run, filename, portfolio, shard_workers, shard_pool)
+                    rows[position]['summary_rows'] = len(portfolio.summary)
+            except Exception as error:
+                record_failure(rows[position], error)
+            await summarized.put((position, summaries))
+        await summarized.put(None)
+
+    async def writer():
+        while (item := await summarized.get()) is not None:
+            position, summaries = item
+            if summaries is not None and rows[position]['status'] == 'ok':
+                try:
+                    rows[position]['outputs'] = await loop.run_in_executor(write_pool, write_file, *tasks[position], summaries)
+                except Exception as error:
+                    record_failure(rows[position], error)
+            finish(position)
+
+    try:
+        await asyncio.gather(reader(), computer(), writer())
+    finally:
+        read_pool.shutdown()
+        write_pool.shutdown()
+    return rows
+
+def run_tasks(tasks, workers=None):
+    """Process input files on a pool of worker processes, or pipelined in this process.
+
+    Input files are independent, so every file is its own task. The largest files are
+    submitted first so they do not hold up the end of the run; the report keeps task order
+    whatever order the workers finish in. The CPUs left over by the file-level workers split
+    the rows of large files, see SHARD_WORKERS.
+
+    Args:
+        tasks (list): (run, filename) tuples from list_tasks.
+        workers (int): Number of worker processes. None uses every CPU; 1 runs in this process,
+            through run_pipeline unless PIPELINE_DEPTH is 0 or there is a single file to overlap nothing with.
+
+    Returns:
+        pd.DataFrame: Run report, one row per task.
+    """
+    cpus = os.cpu_count() or 1
+    workers = min(workers or cpus, len(tasks))
+    shard_workers = SHARD_WORKERS or max(1, cpus // max(workers, 1))
+    if workers <= 1 and PIPELINE_DEPTH and len(tasks) > 1:
+        import asyncio
+
+        # Forked before the pipeline starts any thread; a fork from the pipeline would not be safe
+        shard_pool = start_shard_pool(shard_workers) if shard_workers > 1 else None
+        try:
+            rows = asyncio.run(run_pipeline(tasks, shard_workers, shard_pool=shard_pool))
+        finally:
+            if shard_pool is not None:
+                shard_pool.shutdown()
+    elif workers <= 1:
+        rows = [run_task(task, shard_workers) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        sizes = [os.path.getsize(os.path.join(PORTFOLIO_RUNS[run][0], filename)) for run, filename in tasks]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {position: pool.submit(run_task, tasks[position], shard_workers) for position in sorted(range(len(tasks)), key=lambda position: -sizes[position])}
+            rows = []
+            for position, task in enumerate(tasks):
+                # run_task records its own failures; this catches the task dying with its worker
+                try:
+                    rows.append(futures[position].result())
+                except Exception as error:
+                    row = report_row(task)
+                    record_failure(row, error)
+                    rows.append(row)
+    return pd.DataFrame(rows, columns=RUN_REPORT_COLUMNS)
+
+def run_portfolios(runs=None, workers=1, report_path=None):
+    """Process every input file of portfolio runs and print the result files.
+
+    Args:
+        runs (list): Keys of PORTFOLIO_RUNS. Defaults to every run.
+        workers (int): Number of worker processes, see run_tasks.
+        report_path (str): CSV file the run report is written to; None does not write it.
+
+    Returns:
+        pd.DataFrame: Run report, one row per input file.
+
+    Raises:
+        RuntimeError: If any input file failed; the other files are still processed.
+    """
+    report = run_tasks(list_tasks(runs), workers)
+    for output_paths in report['outputs']:
+        for output_file_path in output_paths:
+            print(f"結果已儲存至 {output_file_path}")
+    if report_path is not None:
+        os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+        report.assign(outputs=report['outputs'].str.join(';')).to_csv(report_path, index=False, encoding='utf-8-sig')
+        print(f"執行報告已儲存至 {report_path}")
+    failed = report[report['status'] != 'ok']
+    if len(failed):
+        raise RuntimeError(f"{len(failed)} input file(s) failed: " + '; '.join(f"{file}: {error}" for file, error in zip(failed['file'], failed['error'])))
+    return report
+
+def process_domestic_corporate_credit():
+    return run_portfolios(['domestic_corporate_credit'])
+
+def process_domestic_personal_mortgage_credit():
+    return run_portfolios(['domestic_personal_mortgage'])
+
+def process_domestic_personal_other_credit():
+    return run_portfolios(['domestic_personal_other'])
+
+def process_overseas_credit():
+    return run_portfolios(['overseas_credit'])
+
+def process_domestic_investment():
+    return run_portfolios(['domestic_investment'])
 
 def process_overseas_investment():
-    input_dir = 'input-data_files/投資部位/國外投資/'
-    output_dir = 'results-data_files/投資部位/國外投資/'
-
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    for filename in os.listdir(input_dir):
-        if filename.endswith('國外投資.xlsx'):
-            file_path = os.path.join(input_dir, filename)
-            xls = pd.ExcelFile(file_path)
-
-            pd_rate, pd_rate_orderly_2030, pd_rate_orderly_2050, pd_rate_disorderly_2030, pd_rate_disorderly_2050 = process_PD_overseas_investment(file_path)
-            lgd_rate, lgd_rate_orderly_2030, lgd_rate_disorderly_2030, lgd_rate_orderly_2050, lgd_rate_disorderly_2050 = process_LGD_overseas_investment(file_path)
-            ead = process_EAD_overseas_investment(file_path)
-
-            summary_2030 = []
-            summary_2050 = []
-            
-            for sheet_name in xls.sheet_names:
-                df = pd.read_excel(xls, sheet_name=sheet_name)
-                summary_2030.append(df)
-                summary_2050.append(df)
-            
-            summary_df_2030 = pd.concat(summary_2030, ignore_index=True)
-            summary_df_2050 = pd.concat(summary_2050, ignore_index=True)
-
-            output_file_path = os.path.join(output_dir, filename)
-            with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-                save_to_excel_overseas(summary_df_2030, '國外投資彙總表(2030年)', writer, pd_rate, lgd_rate, pd_rate_orderly_2030, lgd_rate_orderly_2030, pd_rate_disorderly_2030, lgd_rate_disorderly_2030, ead)
-                save_to_excel_overseas(summary_df_2050, '國外投資彙總表(2050年)', writer, pd_rate, lgd_rate, pd_rate_orderly_2050, lgd_rate_orderly_2050, pd_rate_disorderly_2050, lgd_rate_disorderly_2050, ead)
-
-                print(f"結果已儲存至 {output_file_path}")
-
-
-def main():
-    process_domestic_corporate_credit()
-    process_domestic_personal_mortgage_credit()
-    process_domestic_personal_other_credit()
-    process_overseas_credit()
-    process_domestic_investment()
-    process_overseas_investment()
+    return run_portfolios(['overseas_investment'])
+
+
+def main(workers=None, runs=None):
+    """Process portfolio runs and write the run report.
+
+    Args:
+        workers (int): Number of worker processes. Defaults to WORKERS.
+        runs (list): Keys of PORTFOLIO_RUNS. Defaults to every run.
+    """
+    run_portfolios(runs, workers=workers or WORKERS, report_path=RUN_REPORT_PATH)
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run the climate stress test on every input file.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes; defaults to WORKERS")
+    parser.add_argument('--run', action='append', choices=list(PORTFOLIO_RUNS), help="Portfolio run to process; repeat for several. Defaults to every run.")
+    args = parser.parse_args()
+    main(args.workers, args.run)
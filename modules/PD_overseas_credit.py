@@ -1,36 +1,20 @@
-import json
-from decimal import Decimal, getcontext
+from .reference_data import get_reference_data
 
-# Set the precision for Decimal calculations
-getcontext().prec = 10
-
-def load_json(file_path):
-    """
-    Load JSON data from a file.
-
-    Parameters:
-    file_path (str): Path to the JSON file.
-
-    Returns:
-    dict: Loaded JSON data.
-    """
-    with open(file_path, 'r', encoding='utf-8') as file:
-        return json.load(file)
-
-def load_and_query_parameters__overseas(pd_overseas_file_path, credit_rating, downgrade):
+def load_and_query_parameters__overseas(reference_data, credit_rating, downgrade):
     """
-    Load and query PD parameters for overseas credits based on credit rating and downgrade scenarios.
+    Query PD parameters for overseas credits based on credit rating and downgrade scenarios.
 
     Parameters:
-    pd_overseas_file_path (str): Path to the PD overseas JSON file.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry when None.
     credit_rating (str): Current credit rating.
     downgrade (list): List of downgrade steps.
 
     Returns:
     list: List of PD values for the given downgrades.
     """
-    with open(pd_overseas_file_path, 'r', encoding='utf-8') as file:
-        pd_overseas_data = json.load(file)
+    if reference_data is None:
+        reference_data = get_reference_data()
+    pd_overseas_data = reference_data.pd_overseas
 
     ratings_list = [
         "AAA", "AA+", "AA", "AA-", "A+", "A", "A-", 
@@ -73,18 +57,18 @@ class RiskAssessment:
     """
     A class for assessing risks based on country, industry, and scenarios.
     """
-    def __init__(self, country_file, industry_file, scenario_adjustment_table):
+    def __init__(self, reference_data=None):
         """
-        Initialize the RiskAssessment class.
+        Initialize the RiskAssessment class from the shared reference data.
 
         Parameters:
-        country_file (str): Path to the JSON file containing country risk levels.
-        industry_file (str): Path to the JSON file containing industry classifications.
-        scenario_adjustment_table (str): Path to the JSON file containing scenario adjustments.
+        reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
         """
-        self.classification_data = load_json(country_file)
-        self.industry_data = load_json(industry_file)
-        self.scenario_adjustment_table = load_json(scenario_adjustment_table)
+        if reference_data is None:
+            reference_data = get_reference_data()
+        self.classification_data = reference_data.country_classification
+        self.industry_data = reference_data.industry_classification
+        self.scenario_adjustment_table = reference_data.scenario_adjustments
 
     def get_country_risk_level(self, country):
         """
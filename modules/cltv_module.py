@@ -1,9 +1,7 @@
-from decimal import Decimal, getcontext
+from decimal import Decimal, localcontext
+from .numeric import DECIMAL_CONTEXT
 
-# Set the precision for Decimal calculations
-getcontext().prec = 10
-
-def calculate_stressed_cltv_value(city_input, district_input, current_mortgage, collateral_value):
+def calculate_stressed_cltv_value(city_input, district_input, current_mortgage, collateral_value, reference_data=None):
     """
     Calculate the ratio of the current mortgage to the stressed collateral value.
 
@@ -12,6 +10,7 @@ def calculate_stressed_cltv_value(city_input, district_input, current_mortgage,
     district_input (str): Name of the district.
     current_mortgage (float): Current mortgage loan amount.
     collateral_value (float): Value of the collateral.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
 
     Returns:
     dict: CLTV values for different scenarios.
@@ -22,7 +21,8 @@ def calculate_stressed_cltv_value(city_input, district_input, current_mortgage,
     stressed_collateral_value = calculate_stressed_collateral_value(
         city_input, 
         district_input, 
-        collateral_value
+        collateral_value,
+        reference_data
     )
     
     if stressed_collateral_value is None:
@@ -34,7 +34,8 @@ def calculate_stressed_cltv_value(city_input, district_input, current_mortgage,
         ]}
     
     # Calculate CLTV values for each scenario using Decimal for precision
-    stressed_cltv_values = {scenario: float(Decimal(current_mortgage) / Decimal(value)) for scenario, value in stressed_collateral_value.items()}
+    with localcontext(DECIMAL_CONTEXT):
+        stressed_cltv_values = {scenario: float(Decimal(current_mortgage) / Decimal(value)) for scenario, value in stressed_collateral_value.items()}
     
     return stressed_cltv_values
 
@@ -50,5 +51,6 @@ def calculate_cltv_value(current_mortgage, collateral_value):
     float: The ratio of the current mortgage to the collateral value (CLTV).
     """
     # Calculate CLTV using Decimal for precision
-    cltv = float(Decimal(current_mortgage) / Decimal(collateral_value))
+    with localcontext(DECIMAL_CONTEXT):
+        cltv = float(Decimal(current_mortgage) / Decimal(collateral_value))
     return cltv
@@ -1,25 +1,38 @@
-import json
-from decimal import Decimal, getcontext
-getcontext().prec = 10
+from decimal import Decimal, localcontext
+from .numeric import DECIMAL_CONTEXT
+from .reference_data import get_reference_data
 
 class CollateralValueLossCalculator:
     """
     A class to calculate stressed collateral value under different scenarios.
     """
 
-    def __init__(self, region_data_path, risk_level_data_path):
+    def __init__(self, reference_data=None):
         """
-        Initialize the calculator with paths to JSON data files.
+        Initialize the calculator from the shared reference data.
 
         Parameters:
-        region_data_path (str): Path to the JSON file containing regional risk information.
-        risk_level_data_path (str): Path to the JSON file containing risk level information.
+        reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
         """
-        with open(region_data_path, 'r', encoding='utf-8') as file:
-            self.region_data = json.load(file)
+        if reference_data is None:
+            reference_data = get_reference_data()
+        self.region_data = reference_data.collateral_region_levels
+        self.risk_level_data = reference_data.collateral_loss_percentages
+        self.region_table = reference_data.collateral_region_table
 
-        with open(risk_level_data_path, 'r', encoding='utf-8') as file:
-            self.risk_level_data = json.load(file)
+    def find_parameters(self, city, district):
+        """
+        Find the regional risk record for a city and district.
+
+        Parameters:
+        city (str): The city name.
+        district (str): The district name.
+
+        Returns:
+        dict: The matching record, or None if not found.
+        """
+        from .common import find_parameters
+        return find_parameters(city, district, self.region_table)
 
     def calculate_stressed_value(self, city, district, collateral_value):
         """
@@ -52,9 +65,10 @@ class CollateralValueLossCalculator:
         for scenario in scenarios:
             if scenario in record:
                 risk_level = Decimal(record[scenario])
-                risk_level_params = find_risk_level_parameters(risk_level)
+                risk_level_params = find_risk_level_parameters(risk_level, self.risk_level_data)
                 if risk_level_params:
-                    result = (Decimal(1) - Decimal(risk_level_params[scenario]) / Decimal(100)) * Decimal(collateral_value)
+                    with localcontext(DECIMAL_CONTEXT):
+                        result = (Decimal(1) - Decimal(risk_level_params[scenario]) / Decimal(100)) * Decimal(collateral_value)
                     results[scenario] = float(result)
 
         return results
\ No newline at end of file
@@ -1,34 +1,46 @@
-import json
-import os
+from .reference_data import get_reference_data
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-region_data_path = os.path.join(current_dir, '../data/Physical_Risk/collateral_value_loss_by_region_and_scenario_risk_level.json')
-risk_level_data_path = os.path.join(current_dir, '../data/Physical_Risk/collateral_value_loss_percentage_by_risk_level.json')
-pd_file_path = os.path.join(current_dir, '../data/PD_Conversion/PD_Conversion_Table_for_Domestic_Corporate_Credit.json')
-sector_file_path = os.path.join(current_dir, '../data/Industry_to_Sector/Industry_to_Sector.json')
+# Reference tables once exposed as module attributes, now looked up on first access so
+# importing this module does not parse any JSON
+_REFERENCE_ATTRIBUTES = {
+    'region_data': 'collateral_region_levels',
+    'risk_level_data': 'collateral_loss_percentages',
+}
 
-with open(region_data_path, 'r', encoding='utf-8') as file:
-    region_data = json.load(file)
+def __getattr__(name):
+    if name in _REFERENCE_ATTRIBUTES:
+        return getattr(get_reference_data(), _REFERENCE_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-with open(risk_level_data_path, 'r', encoding='utf-8') as file:
-    risk_level_data = json.load(file)
+# Stressed scenarios in the column order of the physical and transition risk tables
+STRESSED_SCENARIOS = (
+    "2050淨零轉型 2030",
+    "2050淨零轉型 2050",
+    "無序轉型 2030",
+    "無序轉型 2050",
+    "無政策情境 2030",
+    "無政策情境 2050",
+    "無政策情境 2090"
+)
+SCENARIOS = ("基準情境",) + STRESSED_SCENARIOS
 
 class IndustryToSectorMapper:
     """
-    A class to map industry names to their corresponding sectors based on a JSON mapping file.
+    A class to map industry names to their corresponding sectors based on the sector mapping table.
     
     Attributes:
     sector_mapping (dict): A dictionary mapping sectors to industries.
     """
-    def __init__(self, sector_file_path):
+    def __init__(self, reference_data=None):
         """
-        Initialize the mapper using the path to the JSON file.
+        Initialize the mapper from the shared reference data.
         
         Parameters:
-        sector_file_path (str): Path to the JSON file containing sector mappings.
+        reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
         """
-        with open(sector_file_path, 'r', encoding='utf-8') as file:
-            self.sector_mapping = json.load(file)
+        if reference_data is None:
+            reference_data = get_reference_data()
+        self.sector_mapping = reference_data.sector_mapping
     
     def get_sector(self, industry):
         """
@@ -59,23 +71,19 @@ def standardize_city_name(city):
         city = city.replace('台', '臺')
     return city
 
-def find_parameters(city, district, data):
+def find_parameters(city, district, region_table):
     """
     Find the corresponding risk level parameters based on city and district.
     
     Parameters:
     city (str): Name of the city.
     district (str): Name of the district.
-    data (list): List of data records.
+    region_table (RegionRiskTable): Indexed regional risk table.
     
     Returns:
     dict: The matching record.
     """
-    city = standardize_city_name(city)
-    for record in data:
-        if record["縣市"] == city and record["鄉鎮市區"] == district:
-            return record
-    return None
+    return region_table.find_record(city, district)
 
 def find_risk_level_parameters(risk_level, risk_level_data):
     """
@@ -189,3 +197,16 @@ def range_key(range_str):
         return -float(range_str[1:])
     else:
         raise ValueError(f"Unknown range format: {range_str}")
+
+def split_by_scenario(results, scenarios):
+    """
+    Split a long result DataFrame into one list of result entries per scenario.
+
+    Parameters:
+    results (pd.DataFrame): Results with a 情境 column.
+    scenarios (list): Scenario names in the order of the returned lists.
+
+    Returns:
+    tuple: One list of dictionaries per scenario, rows kept in input order.
+    """
+    return tuple(results[results['情境'] == scenario].to_dict('records') for scenario in scenarios)
@@ -0,0 +1,80 @@
+import pandas as pd
+from ..ingestion import frame_portfolio
+from ..reference_data import get_reference_data
+from .result_store import RESULT_ENGINES, ResultStore
+from .ead_engine import compute_EAD
+from .pd_engine import corporate_industry_tables
+from .summary import DOMESTIC_SUMMARY_SCENARIOS, OVERSEAS_SUMMARY_SCENARIOS, store_summary
+
+# Compiled lookup structures of the reference data, built by preload_reference_data
+COMPILED_TABLES = (
+    'collateral_region_table',
+    'revenue_region_table',
+    'pd_corporate_cube',
+    'pd_personal_mortgage_tables',
+    'pd_personal_other_tables',
+)
+
+def preload_reference_data(reference_data=None):
+    """
+    Load the reference data and compile every lookup structure the engines use, so the first
+    run_stress_test call does not pay for it.
+
+    Parameters:
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+
+    Returns:
+    ReferenceData: The registry, with its compiled structures cached.
+    """
+    if reference_data is None:
+        reference_data = get_reference_data()
+    for name in COMPILED_TABLES:
+        getattr(reference_data, name)
+    corporate_industry_tables(reference_data)
+    return reference_data
+
+def run_stress_test(data, portfolio_type, reference_data=None, backend='decimal'):
+    """
+    Run the climate stress test on an in-memory portfolio.
+
+    The rows are conformed to the columns and dtypes of the portfolio schema, as when a file
+    is loaded; the caller's DataFrame is not modified. Every result carries the row_id of the
+    input row it belongs to: its position in data.
+
+    Parameters:
+    data (pd.DataFrame): Input data with the columns of the portfolio's workbook.
+    portfolio_type (str): Key of RESULT_ENGINES, e.g. 'domestic_corporate_credit'.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide
+        registry, see preload_reference_data.
+    backend (str): Numeric backend of the column-wise engines, 'decimal' (default) or 'float64'.
+
+    Returns:
+    dict: Result DataFrames by name:
+        'PD': One row per loan and scenario with row_id, 客戶名, 情境, PD(%) and the ratios the PD engine reports.
+        'LGD': One row per loan and scenario with row_id, 客戶名, 情境 and LGD(%).
+        'EAD': One row per loan with a 客戶名, with row_id, 客戶名 and EAD.
+        'EL_2030', 'EL_2050' and, for domestic portfolios, 'EL_2090': The summary tables of
+        main.py, with PD, LGD and expected loss per scenario group of the horizon.
+    """
+    try:
+        pd_engine, lgd_engine, ead_type = RESULT_ENGINES[portfolio_type]
+    except KeyError:
+        raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+    if reference_data is None:
+        reference_data = get_reference_data()
+    portfolio = frame_portfolio(data, portfolio_type)
+    overseas = portfolio_type.startswith('overseas')
+
+    pd_results = pd_engine(portfolio.data, reference_data, backend)
+    lgd_results = lgd_engine(portfolio.data, reference_data, backend)
+    ead = compute_EAD(portfolio.data, ead_type)
+    store = ResultStore.from_results(portfolio.data, pd_results, lgd_results, ead)
+
+    results = {
+        'PD': pd_results.reset_index(),
+        'LGD': lgd_results.reset_index(),
+        'EAD': pd.DataFrame({'客戶名': portfolio.data.loc[ead.index, '客戶名'], 'EAD': ead}).reset_index(),
+    }
+    for horizon in (OVERSEAS_SUMMARY_SCENARIOS if overseas else DOMESTIC_SUMMARY_SCENARIOS):
+        results[f'EL_{horizon}'] = store_summary(portfolio.summary, store, horizon, overseas, portfolio.data.index)
+    return results
@@ -0,0 +1,102 @@
+import argparse
+import numpy as np
+import pandas as pd
+from ..reference_data import get_reference_data
+from .calculate_pd import compute_PD_overseas
+from .calculate_lgd import compute_LGD_overseas_credit, compute_LGD_overseas_investment
+from .lgd_engine import compute_LGD_domestic_equity_investment, compute_LGD_domestic_personal_other
+from .result_store import RESULT_ENGINES
+
+# Engines of RESULT_ENGINES that accept a backend only for the common signature
+FLOAT_ENGINES = {compute_PD_overseas, compute_LGD_overseas_credit, compute_LGD_overseas_investment,
+                 compute_LGD_domestic_personal_other, compute_LGD_domestic_equity_investment}
+
+# Column-wise engines with a numeric backend, per portfolio type: every engine of RESULT_ENGINES but FLOAT_ENGINES
+BACKEND_ENGINES = {}
+for _portfolio_type, (_pd_engine, _lgd_engine, _ead_type) in RESULT_ENGINES.items():
+    _engines = tuple((component, engine) for component, engine in (('PD', _pd_engine), ('LGD', _lgd_engine)) if engine not in FLOAT_ENGINES)
+    if _engines:
+        BACKEND_ENGINES[_portfolio_type] = _engines
+
+DEVIATION_COLUMNS = ['組件', '欄位', 'max_abs_deviation', 'max_rel_deviation', 'nan_mismatches', 'unmatched_rows']
+
+def _keyed(results):
+    """
+    Key engine results by input row label, scenario and occurrence, so both backends line up.
+
+    Parameters:
+    results (pd.DataFrame): Engine results indexed by the input row label.
+
+    Returns:
+    pd.DataFrame: The results with a (row, 情境, occurrence) index.
+    """
+    results = results.rename_axis('row').reset_index()
+    results['occurrence'] = results.groupby(['row', '情境']).cumcount()
+    return results.set_index(['row', '情境', 'occurrence'])
+
+def _deviation(component, column, reference, candidate):
+    """
+    Measure how far a candidate column deviates from a reference column.
+
+    Parameters:
+    component (str): Component name, e.g. 'PD'.
+    column (str): Output column name.
+    reference (np.ndarray): Values of the decimal backend.
+    candidate (np.ndarray): Values of the float64 backend.
+
+    Returns:
+    dict: One row of the deviation report, without unmatched_rows.
+    """
+    both = np.isfinite(reference) & np.isfinite(candidate)
+    absolute = np.abs(candidate[both] - reference[both])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = np.where(reference[both] != 0, absolute / np.abs(reference[both]), np.where(absolute == 0, 0.0, np.inf))
+    return {
+        '組件': component,
+        '欄位': column,
+        'max_abs_deviation': absolute.max() if absolute.size else 0.0,
+        'max_rel_deviation': relative.max() if relative.size else 0.0,
+        'nan_mismatches': int((np.isnan(reference) != np.isnan(candidate)).sum()),
+    }
+
+def compare_backends(data, portfolio_type, reference_data=None):
+    """
+    Run the column-wise engines of a portfolio with the decimal and float64 backends and report
+    the deviation of every numeric output column.
+
+    Parameters:
+    data (pd.DataFrame): Input data of the portfolio.
+    portfolio_type (str): Key of BACKEND_ENGINES, e.g. 'domestic_corporate_credit'.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+
+    Returns:
+    pd.DataFrame: One row per component and output column with max_abs_deviation,
+    max_rel_deviation, nan_mismatches (entries NaN in one backend only) and unmatched_rows
+    (entries emitted by one backend only, e.g. a PD pushed across a table boundary).
+    """
+    try:
+        engines = BACKEND_ENGINES[portfolio_type]
+    except KeyError:
+        raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+    if reference_data is None:
+        reference_data = get_reference_data()
+
+    report = []
+    for component, engine in engines:
+        reference = _keyed(engine(data, reference_data, backend='decimal'))
+        candidate = _keyed(engine(data, reference_data, backend='float64'))
+        matched = reference.index.intersection(candidate.index)
+        unmatched = len(reference.index.symmetric_difference(candidate.index))
+        reference, candidate = reference.loc[matched], candidate.loc[matched]
+        for column in reference.columns.drop('客戶名'):
+            row = _deviation(component, column, reference[column].to_numpy(dtype=float), candidate[column].to_numpy(dtype=float))
+            row['unmatched_rows'] = unmatched
+            report.append(row)
+    return pd.DataFrame(report, columns=DEVIATION_COLUMNS)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the decimal and float64 numeric backends on a portfolio.")
+    parser.add_argument('file_path', help="Excel file with the portfolio input data")
+    parser.add_argument('portfolio_type', choices=sorted(BACKEND_ENGINES))
+    args = parser.parse_args()
+    print(compare_backends(pd.read_excel(args.file_path), args.portfolio_type).to_string(index=False))
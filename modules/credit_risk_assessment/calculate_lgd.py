@@ -1,422 +1,179 @@
 import pandas as pd
-from ..stressed_collateral_ratio_module import calculate_stressed_collateral_value
+from ..ingestion import read_input
+from ..common import split_by_scenario
+from .lgd_engine import para, LGD_COLUMNS, compute_LGD_domestic_corporate_credit, compute_LGD_domestic_personal_mortgage, compute_LGD_domestic_personal_other, compute_LGD_domestic_investment
 
-# Define scenarios and result dictionary
+# Define scenarios
 scenarios = [
     "基準情境", "2050淨零轉型 2030", "2050淨零轉型 2050",
     "無序轉型 2030", "無序轉型 2050", "無政策情境 2030",
     "無政策情境 2050", "無政策情境 2090"
 ]
-result = {scenario: [] for scenario in scenarios}
-para = {
-    "2050淨零轉型 2030": 1.0, 
-    "2050淨零轉型 2050": 1.2, 
-    "無序轉型 2030": 1.2, 
-    "無序轉型 2050": 1.2, 
-    "無政策情境 2030": 1.0,  
-    "無政策情境 2050": 1.2, 
-    "無政策情境 2090": 1.2
-}
-
-def process_LGD_domestic_corporate_credit(file_path):
+# Order of the per-scenario result lists returned for domestic portfolios
+DOMESTIC_RESULT_ORDER = ["基準情境", "2050淨零轉型 2030", "無序轉型 2030", 
+            "無政策情境 2030", "2050淨零轉型 2050", "無序轉型 2050", 
+            "無政策情境 2050", "無政策情境 2090"]
+# Order of the per-scenario result lists returned for overseas portfolios
+OVERSEAS_LGD_RESULT_ORDER = ["基準情境", "2050淨零轉型 2030", "無序轉型 2030", 
+            "2050淨零轉型 2050", "無序轉型 2050"]
+
+def process_LGD_domestic_corporate_credit(file_path, reference_data=None, backend='decimal'):
     """
     Process LGD for domestic corporate credits based on different scenarios.
 
     Parameters:
-    file_path (str): Path to the Excel file containing input data.
+    file_path (str or LoadedPortfolio): Path to the Excel, Parquet or CSV file containing input data, or the portfolio parsed by load_portfolio.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend of the calculation, 'decimal' (default) or 'float64'.
 
     Returns:
     tuple: Results for different scenarios.
     """
-    data = pd.read_excel(file_path)
+    data = read_input(file_path, 'domestic_corporate_credit')
+    results = compute_LGD_domestic_corporate_credit(data, reference_data, backend)
+    return split_by_scenario(results, DOMESTIC_RESULT_ORDER)
 
-    for index, row in data.iterrows():
-        if pd.isna(row['客戶名']) or not row['客戶名']:
-            continue
-
-        company_data = {
-            'city_input': str(row['登記縣市']),
-            'district_input': str(row['登記鄉鎮市區']),
-            'industry': row['行業別'],
-            'collateral_city_input': str(row['擔保品縣市']),
-            'collateral_district_input': str(row['擔保品鄉鎮市區']),
-            'collateral_value': float(row['擔保品價值']),
-            'credit': float(row['授信金額']),
-            'is_real_estate': str(row['是否有不動產擔保品']),
-            'is_collateral': str(row['是否有其他擔保品']), 
-            'recovery_rate': float(row['擔保品/無擔回收率(%)']) if '擔保品/無擔回收率(%)' in row and not pd.isna(row['擔保品/無擔回收率(%)']) else float(75)
-        }
-
-        if company_data['is_real_estate'] == '是':
-            for scenario in scenarios:
-                if scenario == "基準情境":
-                    result_entry = {
-                        '客戶名': str(row['客戶名']),
-                        '情境': "基準情境",
-                        'LGD(%)': (100 - company_data['recovery_rate'])/100
-                    }
-                    result["基準情境"].append(result_entry)
-                else:
-                    stressed_collateral_value = calculate_stressed_collateral_value(
-                        company_data['collateral_city_input'], 
-                        company_data['collateral_district_input'], 
-                        company_data['collateral_value']
-                    )
-                    if stressed_collateral_value: 
-                        for scenario, ratio in stressed_collateral_value.items():
-                            stressed_LGD = max(1 - (ratio * 75 / 100 / company_data['credit']), 10 / 100)
-                            result_entry = {
-                                '客戶名': str(row['客戶名']),
-                                '情境': scenario,
-                                'LGD(%)': stressed_LGD
-                            }
-                            result[scenario].append(result_entry)
-                    else:
-                        for scenario in scenarios:
-                            result_entry = {
-                                '客戶名': str(row['客戶名']),
-                                '情境': scenario,
-                                'LGD(%)': float('nan')
-                            }
-                            result[scenario].append(result_entry)
-
-        elif company_data['is_collateral'] == '是':
-            for scenario in scenarios:
-                if scenario == "基準情境":
-                    result_entry = {
-                        '客戶名': str(row['客戶名']),
-                        '情境': "基準情境",
-                        'LGD(%)': (100 - company_data['recovery_rate'])/100
-                    }
-                    result["基準情境"].append(result_entry)
-                else:
-                    stressed_LGD = max(1 - (company_data['collateral_value'] * float(company_data['recovery_rate']) / 100 / para[scenario]) / company_data['credit'], 10 / 100)
-                    result_entry = {
-                        '客戶名': str(row['客戶名']),
-                        '情境': scenario,
-                        'LGD(%)': stressed_LGD
-                    }
-                    result[scenario].append(result_entry)
-
-        else:
-            for scenario in scenarios:
-                if scenario == "基準情境":
-                    result_entry = {
-                        '客戶名': str(row['客戶名']),
-                        '情境': "基準情境",
-                        'LGD(%)': (100 - company_data['recovery_rate'])/100
-                    }
-                    result["基準情境"].append(result_entry)
-                else:
-                    stressed_LGD = max(1 - (company_data['collateral_value'] * float(company_data['recovery_rate']) / 100 / para[scenario]) / company_data['credit'], 10 / 100)
-                    result_entry = {
-                        '客戶名': str(row['客戶名']),
-                        '情境': scenario,
-                        'LGD(%)': stressed_LGD
-                    }
-                    result[scenario].append(result_entry)
-
-    return (result["基準情境"], result["2050淨零轉型 2030"], result["無序轉型 2030"], 
-            result["無政策情境 2030"], result["2050淨零轉型 2050"], result["無序轉型 2050"], 
-            result["無政策情境 2050"], result["無政策情境 2090"])
-
-def process_LGD_domestic_personal_mortgage(file_path):
+def process_LGD_domestic_personal_mortgage(file_path, reference_data=None, backend='decimal'):
     """
     Process LGD for domestic personal mortgage based on different scenarios.
 
     Parameters:
-    file_path (str): Path to the Excel file containing input data.
+    file_path (str or LoadedPortfolio): Path to the Excel, Parquet or CSV file containing input data, or the portfolio parsed by load_portfolio.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend of the calculation, 'decimal' (default) or 'float64'.
 
     Returns:
     tuple: Results for different scenarios.
     """
-    data = pd.read_excel(file_path)
-
-    for index, row in data.iterrows():
-        if pd.isna(row['客戶名']) or not row['客戶名']:
-            continue
-
-        company_data = {
-            'collateral_city_input': str(row['擔保品縣市']),
-            'collateral_district_input': str(row['擔保品鄉鎮市區']),
-            'collateral_value': float(row['擔保品價值']),
-            'credit': float(row['授信金額']),
-        }
-
-        result_entry = {
-            '客戶名': str(row['客戶名']),
-            '情境': "基準情境",
-            'LGD(%)': max(1 - (company_data['collateral_value'] * 75 / 100 / company_data['credit']), 10 / 100)
-        }
-        result["基準情境"].append(result_entry)
-
-        stressed_collateral_value = calculate_stressed_collateral_value(
-            company_data['collateral_city_input'], 
-            company_data['collateral_district_input'], 
-            company_data['collateral_value']
-        )
-
-        for scenario, ratio in stressed_collateral_value.items():
-            stressed_LGD = max(1 - (ratio * 75 / 100 / company_data['credit']), 10 / 100)
-            result_entry = {
-                '客戶名': str(row['客戶名']),
-                '情境': scenario,
-                'LGD(%)': stressed_LGD
-            }
-            result[scenario].append(result_entry)
-
-    return (result["基準情境"], result["2050淨零轉型 2030"], result["無序轉型 2030"], 
-            result["無政策情境 2030"], result["2050淨零轉型 2050"], result["無序轉型 2050"], 
-            result["無政策情境 2050"], result["無政策情境 2090"])
+    data = read_input(file_path, 'domestic_personal_mortgage')
+    results = compute_LGD_domestic_personal_mortgage(data, reference_data, backend)
+    return split_by_scenario(results, DOMESTIC_RESULT_ORDER)
 
 def process_LGD_domestic_personal_other(file_path):
     """
     Process LGD for domestic personal other credits based on different scenarios.
 
     Parameters:
-    file_path (str): Path to the Excel file containing input data.
+    file_path (str or LoadedPortfolio): Path to the Excel, Parquet or CSV file containing input data, or the portfolio parsed by load_portfolio.
 
     Returns:
     tuple: Results for different scenarios.
     """
-    data = pd.read_excel(file_path)
+    data = read_input(file_path, 'domestic_personal_other')
+    results = compute_LGD_domestic_personal_other(data)
+    return split_by_scenario(results, DOMESTIC_RESULT_ORDER)
 
+def _overseas_LGD(data, collateral_value_column, recovery_rate_column, is_collateral):
+    """
+    Compute LGD for overseas loans row by row.
+
+    Parameters:
+    data (pd.DataFrame): Input data.
+    collateral_value_column (str): Name of the collateral value column.
+    recovery_rate_column (str): Name of the recovery rate column.
+    is_collateral (callable): Tells from a row whether the loan has collateral.
+
+    Returns:
+    pd.DataFrame: One row per loan and scenario with 客戶名, 情境 and LGD(%), indexed by the input row label.
+    """
+    labels, entries = [], []
     for index, row in data.iterrows():
         if pd.isna(row['客戶名']) or not row['客戶名']:
             continue
 
         company_data = {
-            'collateral_value': float(row['擔保品價值']),
+            'collateral_value': float(row[collateral_value_column]),
             'credit': float(row['授信金額']),
-            'recovery_rate': float(row['擔保品/無擔回收率(%)']) if not pd.isna(row['擔保品/無擔回收率(%)']) else float(75),
-            'is_collateral': str(row['是否有擔保品'])
+            'recovery_rate': float(row[recovery_rate_column]) if not pd.isna(row[recovery_rate_column]) else float(75),
+            'is_collateral': is_collateral(row)
         }
 
         for scenario in scenarios:
             if scenario == '基準情境':
-                LGD = max(1 - (company_data['collateral_value'] * company_data['recovery_rate'] / 100) / company_data['credit'], 10 / 100)
+                if company_data['is_collateral']:
+                    LGD = max(1 - (company_data['collateral_value'] * company_data['recovery_rate'] / 100) / company_data['credit'], 10 / 100)
+                else:
+                    LGD = max(1 - (company_data['credit'] * company_data['recovery_rate'] / 100) / company_data['credit'], 10 / 100)
             else:
-                if company_data['is_collateral'] == '是':
+                if company_data['is_collateral']:
                     stressed_LGD = max(1 - (company_data['collateral_value'] * company_data['recovery_rate'] / 100 / para[scenario]) / company_data['credit'], 10 / 100)
                 else:
                     stressed_LGD = max(1 - (company_data['credit'] * company_data['recovery_rate'] / 100 / para[scenario]) / company_data['credit'], 10 / 100)
                 LGD = stressed_LGD
 
-            result_entry = {
-                '客戶名': str(row['客戶名']),
-                '情境': scenario,
-                'LGD(%)': LGD
-            }
-            result[scenario].append(result_entry)
+            labels.append(index)
+            entries.append((str(row['客戶名']), scenario, LGD))
 
-    return (
-        result["基準情境"], result["2050淨零轉型 2030"], result["無序轉型 2030"], 
-        result["無政策情境 2030"], result["2050淨零轉型 2050"], result["無序轉型 2050"], 
-        result["無政策情境 2050"], result["無政策情境 2090"]
-    )
+    return pd.DataFrame(entries, index=pd.Index(labels, name=data.index.name), columns=LGD_COLUMNS)
 
-def process_LGD_overseas_credit(file_path):
+def compute_LGD_overseas_credit(data, reference_data=None, backend='decimal'):
     """
-    Process LGD for overseas credits based on different scenarios.
+    Compute LGD for overseas credits row by row.
 
     Parameters:
-    file_path (str): Path to the Excel file containing input data.
+    data (pd.DataFrame): Input data with the overseas credit columns.
+    reference_data (ReferenceData): Unused; accepted for the common engine signature.
+    backend (str): Unused; accepted for the common engine signature.
 
     Returns:
-    tuple: Results for different scenarios.
+    pd.DataFrame: One row per loan and scenario with 客戶名, 情境 and LGD(%), indexed by the input row label.
     """
-    data = pd.read_excel(file_path)
+    return _overseas_LGD(data, '擔保品價值', '擔保品/無擔回收率(%)', lambda row: str(row['是否有擔保品']) == '是')
 
-    for index, row in data.iterrows():
-        if pd.isna(row['客戶名']) or not row['客戶名']:
-            continue
+def compute_LGD_overseas_investment(data, reference_data=None, backend='decimal'):
+    """
+    Compute LGD for overseas investments row by row.
 
-        company_data = {
-            'collateral_value': float(row['擔保品價值']),
-            'credit': float(row['授信金額']),
-            'recovery_rate': float(row['擔保品/無擔回收率(%)']) if not pd.isna(row['擔保品/無擔回收率(%)']) else float(75),
-            'is_collateral': str(row['是否有擔保品'])
-        }
+    Parameters:
+    data (pd.DataFrame): Input data with every column of the overseas investment file; the
+        collateral columns are read under the names 擭保品價值, 擭保品/無擭回收率(%) and 是否有擭保品.
+    reference_data (ReferenceData): Unused; accepted for the common engine signature.
+    backend (str): Unused; accepted for the common engine signature.
 
-        for scenario in scenarios:
-            if scenario == '基準情境':
-                if company_data['is_collateral'] == '是':
-                    LGD = max(1 - (company_data['collateral_value'] * company_data['recovery_rate'] / 100) / company_data['credit'], 10 / 100)
-                else:
-                    LGD = max(1 - (company_data['credit'] * company_data['recovery_rate'] / 100) / company_data['credit'], 10 / 100)
-            else:
-                if company_data['is_collateral'] == '是':
-                    stressed_LGD = max(1 - (company_data['collateral_value'] * company_data['recovery_rate'] / 100 / para[scenario]) / company_data['credit'], 10 / 100)
-                else:
-                    stressed_LGD = max(1 - (company_data['credit'] * company_data['recovery_rate'] / 100 / para[scenario]) / company_data['credit'], 10 / 100)
-                LGD = stressed_LGD
+    Returns:
+    pd.DataFrame: One row per investment and scenario with 客戶名, 情境 and LGD(%), indexed by the input row label.
+    """
+    return _overseas_LGD(data, '擭保品價值', '擭保品/無擭回收率(%)', lambda row: str(row['是否有擭保品']).strip() == '是')
+
+def process_LGD_overseas_credit(file_path):
+    """
+    Process LGD for overseas credits based on different scenarios.
 
-            result_entry = {
-                '客戶名': str(row['客戶名']),
-                '情境': scenario,
-                'LGD(%)': LGD
-            }
-            result[scenario].append(result_entry)
+    Parameters:
+    file_path (str or LoadedPortfolio): Path to the Excel, Parquet or CSV file containing input data, or the portfolio parsed by load_portfolio.
 
-    return (
-        result["基準情境"], result["2050淨零轉型 2030"], result["無序轉型 2030"], 
-        result["2050淨零轉型 2050"], result["無序轉型 2050"]
-    )
+    Returns:
+    tuple: Results for different scenarios.
+    """
+    data = read_input(file_path, 'overseas_credit')
+    results = compute_LGD_overseas_credit(data)
+    return split_by_scenario(results, OVERSEAS_LGD_RESULT_ORDER)
 
-def process_LGD_domestic_investment(file_path):
+def process_LGD_domestic_investment(file_path, reference_data=None, backend='decimal'):
     """
     Process LGD for domestic investments based on different scenarios.
 
     Parameters:
-    file_path (str): Path to the Excel file containing input data.
+    file_path (str or LoadedPortfolio): Path to the Excel, Parquet or CSV file containing input data, or the portfolio parsed by load_portfolio.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend of the calculation, 'decimal' (default) or 'float64'.
 
     Returns:
     tuple: Results for different scenarios.
     """
-    data = pd.read_excel(file_path)
-    
-    result = {
-        "基準情境": [],
-        "2050淨零轉型 2030": [],
-        "無序轉型 2030": [],
-        "無政策情境 2030": [],
-        "2050淨零轉型 2050": [],
-        "無序轉型 2050": [],
-        "無政策情境 2050": [],
-        "無政策情境 2090": []
-    }
-    
-    for index, row in data.iterrows():
-        if pd.isna(row['客戶名']) or not row['客戶名']:
-            continue
-
-        company_data = {
-            'city_input': str(row['登記縣市']),
-            'district_input': str(row['登記鄉鎮市區']),
-            'industry': row['行業別'],
-            'collateral_city_input': str(row['擔保品縣市']),
-            'collateral_district_input': str(row['擔保品鄉鎮市區']),
-            'collateral_value': float(row['擔保品價值']),
-            'credit': float(row['授信金額']),
-            'is_real_estate': str(row['是否有不動產擔保品']).strip() == '是',
-            'is_collateral': str(row['是否有其他擔保品']).strip() == '是',
-            'recovery_rate': float(row['擔保品/無擔回收率(%)']) if not pd.isna(row['擔保品/無擔回收率(%)']) else float(75)
-        }
-
-        if company_data['is_real_estate']:
-            result_entry = {
-                '客戶名': str(row['客戶名']),
-                '情境': "基準情境",
-                'LGD(%)': 1 - company_data['recovery_rate'] / 100
-            }
-            result["基準情境"].append(result_entry)
-            
-            stressed_collateral_value = calculate_stressed_collateral_value(
-                company_data['collateral_city_input'], 
-                company_data['collateral_district_input'], 
-                company_data['collateral_value']
-            )
-            if stressed_collateral_value:
-                for scenario, ratio in stressed_collateral_value.items():
-                    stressed_LGD = max(1 - (ratio * 75 / 100 / company_data['credit']), 10 / 100)
-                    result_entry = {
-                        '客戶名': str(row['客戶名']),
-                        '情境': scenario,
-                        'LGD(%)': stressed_LGD
-                    }
-                    result[scenario].append(result_entry)
-            else:
-                for scenario in scenarios:
-                    result_entry = {
-                        '客戶名': str(row['客戶名']),
-                        '情境': scenario,
-                        'LGD(%)': float('nan')
-                    }
-                    result[scenario].append(result_entry)
-
-        elif company_data['is_collateral']:
-            result_entry = {
-                '客戶名': str(row['客戶名']),
-                '情境': "基準情境",
-                'LGD(%)': 1 - company_data['recovery_rate'] / 100
-            }
-            result["基準情境"].append(result_entry)
-
-            for scenario in scenarios:
-                stressed_LGD = max(1 - (company_data['collateral_value'] * company_data['recovery_rate'] / 100) / company_data['credit'], 10 / 100)
-                result_entry = {
-                    '客戶名': str(row['客戶名']),
-                    '情境': scenario,
-                    'LGD(%)': stressed_LGD
-                }
-                result[scenario].append(result_entry)
-
-        else:
-            result_entry = {
-                '客戶名': str(row['客戶名']),
-                '情境': "基準情境",
-                'LGD(%)': float('nan')
-            }
-            result["基準情境"].append(result_entry)
-
-            for scenario in scenarios:
-                stressed_LGD = max(1 - (company_data['credit'] * company_data['recovery_rate'] / 100) / company_data['credit'], 10 / 100)
-                result_entry = {
-                    '客戶名': str(row['客戶名']),
-                    '情境': scenario,
-                    'LGD(%)': stressed_LGD
-                }
-                result[scenario].append(result_entry)
-
-    return (result["基準情境"], result["2050淨零轉型 2030"], result["無序轉型 2030"], 
-            result["無政策情境 2030"], result["2050淨零轉型 2050"], result["無序轉型 2050"], 
-            result["無政策情境 2050"], result["無政策情境 2090"])
+    data = read_input(file_path, 'domestic_investment')
+    results = compute_LGD_domestic_investment(data, reference_data, backend)
+    return split_by_scenario(results, DOMESTIC_RESULT_ORDER)
 
 def process_LGD_overseas_investment(file_path):
     """
     Process LGD for overseas investments based on different scenarios.
 
     Parameters:
-    file_path (str): Path to the Excel file containing input data.
+    file_path (str or LoadedPortfolio): Path to the Excel, Parquet or CSV file containing input data, or the portfolio parsed by load_portfolio.
 
     Returns:
     tuple: Results for different scenarios.
     """
-    data = pd.read_excel(file_path)
-    result = {scenario: [] for scenario in scenarios}
-
-    for index, row in data.iterrows():
-        if pd.isna(row['客戶名']) or not row['客戶名']:
-            continue
-
-        company_data = {
-            'collateral_value': float(row['擭保品價值']),
-            'credit': float(row['授信金額']),
-            'recovery_rate': float(row['擭保品/無擭回收率(%)']) if not pd.isna(row['擭保品/無擭回收率(%)']) else float(75),
-            'is_collateral': str(row['是否有擭保品']).strip() == '是'
-        }
-
-        for scenario in scenarios:
-            if scenario == '基準情境':
-                if company_data['is_collateral']:
-                    LGD = max(1 - (company_data['collateral_value'] * company_data['recovery_rate'] / 100) / company_data['credit'], 10 / 100)
-                else:
-                    LGD = max(1 - (company_data['credit'] * company_data['recovery_rate'] / 100) / company_data['credit'], 10 / 100)
-            else:
-                if company_data['is_collateral']:
-                    stressed_LGD = max(1 - (company_data['collateral_value'] * company_data['recovery_rate'] / 100 / para[scenario]) / company_data['credit'], 10 / 100)
-                else:
-                    stressed_LGD = max(1 - (company_data['credit'] * company_data['recovery_rate'] / 100 / para[scenario]) / company_data['credit'], 10 / 100)
-                LGD = stressed_LGD
-
-            result_entry = {
-                '客戶名': str(row['客戶名']),
-                '情境': scenario,
-                'LGD(%)': LGD
-            }
-            result[scenario].append(result_entry)
-
-    return (
-        result["基準情境"], result["2050淨零轉型 2030"], result["無序轉型 2030"], 
-        result["2050淨零轉型 2050"], result["無序轉型 2050"]
-    )
+    data = read_input(file_path, 'overseas_investment')
+    return split_by_scenario(compute_LGD_overseas_investment(data), OVERSEAS_LGD_RESULT_ORDER)
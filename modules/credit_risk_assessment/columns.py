@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+def text_column(column):
+    """
+    Convert a column to str values the way the row-wise code does with str(row[...]).
+
+    Parameters:
+    column (pd.Series): Input column.
+
+    Returns:
+    np.ndarray: Object array of str.
+    """
+    if isinstance(column.dtype, pd.StringDtype):
+        return column.to_numpy(dtype=object, na_value=str(np.nan))
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Code -1 (missing) picks the trailing 'nan'
+        categories = np.array([str(value) for value in column.cat.categories] + [str(np.nan)], dtype=object)
+        return categories[column.cat.codes.to_numpy()]
+    return column.map(str).to_numpy(dtype=object)
+
+def float_column(column, default=None):
+    """
+    Convert a column to float64 the way the row-wise code does with float(row[...]).
+
+    Parameters:
+    column (pd.Series): Input column.
+    default (float): Value used for missing entries, or None to keep them as NaN.
+
+    Returns:
+    np.ndarray: float64 array.
+    """
+    values = column.to_numpy(dtype=float)
+    if default is not None:
+        values = np.where(np.isnan(values), default, values)
+    return values
+
+def mapped_ids(column, mapping, default=-1):
+    """
+    Map the values of a column to integer ids, looking each distinct value up once.
+
+    Parameters:
+    column (pd.Series): Input column, e.g. 行業別.
+    mapping (dict): Value to id.
+    default (int): Id of missing values and values not in the mapping.
+
+    Returns:
+    np.ndarray: int64 ids.
+    """
+    codes, uniques = pd.factorize(column)
+    ids = np.array([mapping.get(value, default) for value in uniques] + [default], dtype=np.int64)
+    return ids[codes]
+
+def text_equals(column, text, strip=True):
+    """
+    Compare a column with a text the way the row-wise code does with str(row[...]).strip() == text.
+
+    Parameters:
+    column (pd.Series): Input column.
+    text (str): Text to compare with.
+    strip (bool): Whether surrounding whitespace is ignored.
+
+    Returns:
+    np.ndarray: Boolean mask.
+    """
+    matching = [value for value in column.unique() if (str(value).strip() if strip else str(value)) == text]
+    return column.isin(matching).to_numpy()
+
+def falsy_mask(column):
+    """
+    Find entries the row-wise code skips with pd.isna(value) or not value.
+
+    Parameters:
+    column (pd.Series): Input column.
+
+    Returns:
+    np.ndarray: Boolean mask of missing or falsy entries.
+    """
+    falsy = [value for value in column.unique() if pd.isna(value) or not value]
+    return column.isin(falsy).to_numpy() | column.isna().to_numpy()
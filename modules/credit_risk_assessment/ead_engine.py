@@ -0,0 +1,46 @@
+from .columns import text_column
+
+# Columns summed into EAD for each portfolio type; missing amounts are left out of the sum
+# and a loan with every amount missing gets NaN
+EAD_COLUMN_SPEC = {
+    'domestic_corporate_credit': ('現貸餘額', '表外交易信用暴險相當額'),
+    'domestic_personal_mortgage': ('現貸餘額',),
+    'domestic_personal_other': ('現貸餘額', '本行雙卡未動用之有效額度'),
+    'overseas_credit': ('現貸餘額', '表外交易信用暴險相當額'),
+    'domestic_investment': ('現貸餘額', '表外交易信用暴險相當額'),
+    'overseas_investment': ('現貸餘額', '表外交易信用暴險相當額'),
+}
+
+def compute_EAD(data, portfolio_type):
+    """
+    Compute EAD for a loaded portfolio column-wise.
+
+    Parameters:
+    data (pd.DataFrame): Input data of the portfolio.
+    portfolio_type (str): Key of EAD_COLUMN_SPEC, e.g. 'domestic_corporate_credit'.
+
+    Returns:
+    pd.Series: EAD named 'EAD', indexed by the input row label, for rows with a 客戶名.
+    """
+    try:
+        columns = EAD_COLUMN_SPEC[portfolio_type]
+    except KeyError:
+        raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+
+    data = data[data['客戶名'].notna()]
+    amounts = data[list(columns)].astype(float)
+    return amounts.sum(axis=1, min_count=1).rename('EAD')
+
+def ead_records(data, ead):
+    """
+    Convert an EAD column to the list of result entries returned by the process_EAD_* functions.
+
+    Parameters:
+    data (pd.DataFrame): Input data the EAD was computed from.
+    ead (pd.Series): EAD from compute_EAD.
+
+    Returns:
+    list: Dictionaries with 客戶名 and EAD, in input order.
+    """
+    clients = text_column(data.loc[data['客戶名'].notna(), '客戶名'])
+    return [{'客戶名': client, 'EAD': value} for client, value in zip(clients, ead.tolist())]
@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+from ..common import SCENARIOS, STRESSED_SCENARIOS
+from ..numeric import DecimalValues, get_arithmetic
+from ..reference_data import get_reference_data
+from .columns import text_column, float_column, text_equals, falsy_mask
+
+LGD_COLUMNS = ['客戶名', '情境', 'LGD(%)']
+
+# Lower bound applied to every stressed LGD
+LGD_FLOOR = 10 / 100
+
+# Scenario multipliers dividing the recovered amount in stressed scenarios
+para = {
+    "2050淨零轉型 2030": 1.0,
+    "2050淨零轉型 2050": 1.2,
+    "無序轉型 2030": 1.2,
+    "無序轉型 2050": 1.2,
+    "無政策情境 2030": 1.0,
+    "無政策情境 2050": 1.2,
+    "無政策情境 2090": 1.2
+}
+SCENARIO_MULTIPLIERS = np.array([para[scenario] for scenario in STRESSED_SCENARIOS])
+
+def apply_floor(values):
+    """
+    Apply the LGD floor the way max(value, 10 / 100) does, keeping NaN.
+
+    Parameters:
+    values (np.ndarray): LGD values.
+
+    Returns:
+    np.ndarray: Floored LGD values.
+    """
+    return np.where(LGD_FLOOR > values, LGD_FLOOR, values)
+
+def stressed_collateral_values(data, collateral_value, reference_data, backend='decimal'):
+    """
+    Compute the stressed collateral value of every loan for every stressed scenario at once.
+
+    Parameters:
+    data (pd.DataFrame): Input data with 擔保品縣市 and 擔保品鄉鎮市區.
+    collateral_value (np.ndarray): Collateral values.
+    reference_data (ReferenceData): Reference data registry.
+    backend (str): Numeric backend, 'decimal' or 'float64'.
+
+    Returns:
+    tuple: (values, found) where values has one column per stressed scenario, NaN for unknown
+    regions, and found marks the loan and scenario pairs with a collateral value loss for the region.
+    """
+    table = reference_data.collateral_region_table
+    region_ids = table.lookup_ids(text_column(data['擔保品縣市']), text_column(data['擔保品鄉鎮市區']))
+    value_factors = table.gather(table.value_factors, region_ids)
+    values = get_arithmetic(backend).multiply(DecimalValues(value_factors), collateral_value[:, None]).values
+    return values, np.isfinite(value_factors)
+
+def _long_frame(data, clients, lgd, emitted=None):
+    """
+    Lay out an LGD matrix with one column per scenario as result entries.
+
+    Parameters:
+    data (pd.DataFrame): Filtered input data, for the row labels.
+    clients (np.ndarray): Client names.
+    lgd (np.ndarray): LGD values with one column per scenario in SCENARIOS order.
+    emitted (np.ndarray): Mask of the loan and scenario entries to keep, or None to keep all.
+
+    Returns:
+    pd.DataFrame: One row per kept loan and scenario with 客戶名, 情境 and LGD(%), indexed by the input row label.
+    """
+    if emitted is None:
+        emitted = np.ones(lgd.shape, dtype=bool)
+    rows, columns = np.nonzero(emitted)
+    return pd.DataFrame({
+        '客戶名': clients[rows],
+        '情境': np.asarray(SCENARIOS, dtype=object)[columns],
+        'LGD(%)': lgd[rows, columns],
+    }, index=data.index[rows], columns=LGD_COLUMNS)
+
+def compute_LGD_domestic_corporate_credit(data, reference_data=None, backend='decimal'):
+    """
+    Compute LGD for domestic corporate credit column-wise.
+
+    Loans with real estate collateral (是否有不動產擔保品) are stressed through the regional
+    collateral value loss, computed once per loan; the others use the recovery rate divided by
+    the scenario multiplier. Stressed LGDs are floored at 10%.
+
+    Parameters:
+    data (pd.DataFrame): Input data with the domestic corporate credit columns.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend, 'decimal' to match the scalar Decimal modules exactly or 'float64'.
+
+    Returns:
+    pd.DataFrame: One row per loan and scenario with 客戶名, 情境 and LGD(%), indexed by the input row label.
+    Real estate loans in regions missing from the table get NaN stressed LGDs.
+    """
+    if reference_data is None:
+        reference_data = get_reference_data()
+
+    data = data[~falsy_mask(data['客戶名'])]
+    clients = text_column(data['客戶名'])
+    collateral_value = float_column(data['擔保品價值'])
+    credit = float_column(data['授信金額'])
+    if '擔保品/無擔回收率(%)' in data:
+        recovery_rate = float_column(data['擔保品/無擔回收率(%)'], default=75.0)
+    else:
+        recovery_rate = np.full(len(data), 75.0)
+    is_real_estate = text_equals(data['是否有不動產擔保品'], '是', strip=False)
+
+    stressed_value, found = stressed_collateral_values(data, collateral_value, reference_data, backend)
+    region_found = found.any(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        real_estate_lgd = apply_floor(1 - (stressed_value * 75 / 100 / credit[:, None]))
+        # Other collateral and unsecured loans share the same formula here
+        recovery_lgd = apply_floor(1 - (collateral_value[:, None] * recovery_rate[:, None] / 100 / SCENARIO_MULTIPLIERS) / credit[:, None])
+
+    lgd = np.empty((len(data), len(SCENARIOS)))
+    lgd[:, 0] = (100 - recovery_rate) / 100
+    lgd[:, 1:] = np.where(
+        is_real_estate[:, None],
+        np.where(region_found[:, None], real_estate_lgd, np.nan),
+        recovery_lgd
+    )
+    return _long_frame(data, clients, lgd)
+
+def compute_LGD_domestic_investment(data, reference_data=None, backend='decimal'):
+    """
+    Compute LGD for domestic investments column-wise.
+
+    Positions are split into real estate collateral, other collateral and unsecured with
+    boolean masks. Real estate positions are stressed through the regional collateral value
+    loss, computed once per position. Stressed LGDs are floored at 10%.
+
+    Parameters:
+    data (pd.DataFrame): Input data with the domestic investment columns.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend, 'decimal' to match the scalar Decimal modules exactly or 'float64'.
+
+    Returns:
+    pd.DataFrame: One row per position and scenario with 客戶名, 情境 and LGD(%), indexed by the input row label.
+    Unsecured positions have no 基準情境 LGD; real estate positions in regions missing from the table
+    get NaN stressed LGDs.
+    """
+    if reference_data is None:
+        reference_data = get_reference_data()
+
+    data = data[~falsy_mask(data['客戶名'])]
+    clients = text_column(data['客戶名'])
+    collateral_value = float_column(data['擔保品價值'])
+    credit = float_column(data['授信金額'])
+    recovery_rate = float_column(data['擔保品/無擔回收率(%)'], default=75.0)
+    is_real_estate = text_equals(data['是否有不動產擔保品'], '是')
+    is_collateral = text_equals(data['是否有其他擔保品'], '是') & ~is_real_estate
+    is_unsecured = ~is_real_estate & ~is_collateral
+
+    stressed_value, found = stressed_collateral_values(data, collateral_value, reference_data, backend)
+    region_found = found.any(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        real_estate_lgd = np.where(region_found[:, None], apply_floor(1 - (stressed_value * 75 / 100 / credit[:, None])), np.nan)
+        collateral_lgd = apply_floor(1 - (collateral_value * recovery_rate / 100) / credit)
+        unsecured_lgd = apply_floor(1 - (credit * recovery_rate / 100) / credit)
+
+    lgd = np.empty((len(data), len(SCENARIOS)))
+    lgd[:, 0] = np.where(is_unsecured, np.nan, 1 - recovery_rate / 100)
+    lgd[:, 1:] = np.select(
+        [is_real_estate[:, None], is_collateral[:, None]],
+        [real_estate_lgd, collateral_lgd[:, None]],
+        unsecured_lgd[:, None]
+    )
+    return _long_frame(data, clients, lgd)
+
+def compute_LGD_domestic_personal_mortgage(data, reference_data=None, backend='decimal'):
+    """
+    Compute LGD for domestic personal mortgages column-wise.
+
+    The collateral is stressed through the regional collateral value loss, computed once per
+    loan, and 75% of it is assumed recovered. Every LGD is floored at 10%.
+
+    Parameters:
+    data (pd.DataFrame): Input data with the domestic personal mortgage columns.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend, 'decimal' to match the scalar Decimal modules exactly or 'float64'.
+
+    Returns:
+    pd.DataFrame: One row per loan and scenario with 客戶名, 情境 and LGD(%), indexed by the input row label.
+    Stressed scenarios without a collateral value loss for the loan's region are left out.
+    """
+    if reference_data is None:
+        reference_data = get_reference_data()
+
+    data = data[~falsy_mask(data['客戶名'])]
+    clients = text_column(data['客戶名'])
+    collateral_value = float_column(data['擔保品價值'])
+    credit = float_column(data['授信金額'])
+
+    stressed_value, found = stressed_collateral_values(data, collateral_value, reference_data, backend)
+    lgd = np.empty((len(data), len(SCENARIOS)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lgd[:, 0] = apply_floor(1 - (collateral_value * 75 / 100 / credit))
+        lgd[:, 1:] = apply_floor(1 - (stressed_value * 75 / 100 / credit[:, None]))
+
+    emitted = np.column_stack([np.ones(len(data), dtype=bool), found])
+    return _long_frame(data, clients, lgd, emitted)
+
+def compute_LGD_domestic_personal_other(data, reference_data=None, backend='decimal'):
+    """
+    Compute LGD for domestic personal other credit column-wise.
+
+    Loans with collateral (是否有擔保品) recover the collateral value, the others the credit,
+    at the recovery rate divided by the scenario multiplier. Every LGD is floored at 10%.
+
+    Parameters:
+    data (pd.DataFrame): Input data with the domestic personal other credit columns.
+    reference_data (ReferenceData): Unused; accepted for the common engine signature.
+    backend (str): Unused; the calculation is plain float64 arithmetic.
+
+    Returns:
+    pd.DataFrame: One row per loan and scenario with 客戶名, 情境 and LGD(%), indexed by the input row label.
+    """
+    data = data[~falsy_mask(data['客戶名'])]
+    clients = text_column(data['客戶名'])
+    collateral_value = float_column(data['擔保品價值'])
+    credit = float_column(data['授信金額'])
+    recovery_rate = float_column(data['擔保品/無擔回收率(%)'], default=75.0)
+    is_collateral = text_equals(data['是否有擔保品'], '是', strip=False)
+
+    recovered = np.where(is_collateral, collateral_value, credit)
+    lgd = np.empty((len(data), len(SCENARIOS)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lgd[:, 0] = apply_floor(1 - (collateral_value * recovery_rate / 100) / credit)
+        lgd[:, 1:] = apply_floor(1 - (recovered[:, None] * recovery_rate[:, None] / 100 / SCENARIO_MULTIPLIERS) / credit[:, None])
+    return _long_frame(data, clients, lgd)
+
+def compute_LGD_domestic_equity_investment(data, reference_data=None, backend='decimal'):
+    """
+    Compute LGD for domestic equity investments, which lose the whole exposure in every scenario.
+
+    Parameters:
+    data (pd.DataFrame): Input data with 客戶名.
+    reference_data (ReferenceData): Unused; accepted for the common engine signature.
+    backend (str): Unused; accepted for the common engine signature.
+
+    Returns:
+    pd.DataFrame: One row per investment and scenario with 客戶名, 情境 and an LGD(%) of 1, indexed by the input row label.
+    """
+    data = data[data['客戶名'].notna()]
+    return _long_frame(data, text_column(data['客戶名']), np.ones((len(data), len(SCENARIOS))))
@@ -0,0 +1,255 @@
+import numpy as np
+import pandas as pd
+from ..common import SCENARIOS, STRESSED_SCENARIOS
+from ..numeric import DecimalValues, get_arithmetic
+from ..reference_data import get_reference_data
+from .columns import text_column, float_column, text_equals, mapped_ids
+
+CORPORATE_PD_COLUMNS = ['客戶名', '情境', 'PD(%)', '十足擔保比率', '營授比']
+MORTGAGE_PD_COLUMNS = ['客戶名', '情境', 'PD(%)', 'CLTV', 'DBR']
+PERSONAL_OTHER_PD_COLUMNS = ['客戶名', '情境', 'PD(%)', 'DBR']
+
+def _build_industry_tables(reference_data):
+    """
+    Index the industry tables used by the corporate engine.
+
+    Parameters:
+    reference_data (ReferenceData): Reference data registry.
+
+    Returns:
+    dict: 'sector_ids' (industry to cube sector index, first sector wins), 'transition_groups'
+    (industry to row of 'transition_percentages', first group wins) and 'transition_percentages'
+    (transition impact per group and stressed scenario, with a trailing zero row for unknown industries).
+    """
+    cube = reference_data.pd_corporate_cube
+    sector_ids = {}
+    for sector, industries in reference_data.sector_mapping.items():
+        for industry in industries:
+            sector_ids.setdefault(industry, cube.sector_ids.get(sector, -1))
+
+    groups = list(reference_data.industry_classification.items())
+    transition_groups = {}
+    for group_id, (group_name, records) in enumerate(groups):
+        for record in records:
+            transition_groups.setdefault(record.get("Industry"), group_id)
+
+    # Row len(groups) stays zero: industries without a group carry no transition impact
+    transition_percentages = np.zeros((len(groups) + 1, len(STRESSED_SCENARIOS)))
+    for group_id in range(len(groups)):
+        for impact in reference_data.industry_impact_percentages:
+            if impact["風險等級"] == group_id + 1:
+                transition_percentages[group_id] = [impact.get(scenario, 0) for scenario in STRESSED_SCENARIOS]
+                break
+
+    return {
+        'sector_ids': sector_ids,
+        'transition_groups': transition_groups,
+        'transition_percentages': transition_percentages,
+    }
+
+def corporate_industry_tables(reference_data):
+    """
+    Get the industry tables of the corporate engine, building them on first use.
+
+    Parameters:
+    reference_data (ReferenceData): Reference data registry.
+
+    Returns:
+    dict: The tables described in _build_industry_tables.
+    """
+    return reference_data.derived('corporate_industry_tables', _build_industry_tables)
+
+def compute_PD_domestic_corporate_credit(data, reference_data=None, backend='decimal'):
+    """
+    Compute PD for domestic corporate credit column-wise.
+
+    Baseline and stressed 營授比 and 十足擔保比率 are computed for every loan and scenario as
+    arrays, emulating each Decimal step of the scalar modules with the decimal backend, and PDs are resolved in bulk
+    through the corporate PD cube.
+
+    Parameters:
+    data (pd.DataFrame): Input data with the domestic corporate credit columns.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend, 'decimal' to match the scalar Decimal modules exactly or 'float64'.
+
+    Returns:
+    pd.DataFrame: One row per loan and scenario with 客戶名, 情境, PD(%), 十足擔保比率 and 營授比,
+    indexed by the input row label. Loans whose ratios cannot be computed get NaN rows for every
+    scenario; scenarios without a PD are left out.
+    """
+    if reference_data is None:
+        reference_data = get_reference_data()
+    cube = reference_data.pd_corporate_cube
+    industry_tables = corporate_industry_tables(reference_data)
+
+    data = data[data['客戶名'].notna()]
+    clients = text_column(data['客戶名'])
+    industries = data['行業別']
+    net_revenue = float_column(data['營業淨額'])
+    total_market_credit = float_column(data['全市場授信金額'])
+    total_credit = float_column(data['貸放額度'])
+    collateral_value = float_column(data['擔保品價值'])
+
+    collateral_cities = text_column(data['擔保品縣市'])
+    collateral_districts = text_column(data['擔保品鄉鎮市區'])
+    cities = text_column(data['登記縣市'])
+    districts = text_column(data['登記鄉鎮市區'])
+
+    arithmetic = get_arithmetic(backend)
+    # 十足擔保比率: collateral value * 0.8 / total credit, baseline then per stressed scenario
+    collateral_ratio = arithmetic.divide(arithmetic.multiply(collateral_value, 0.8), total_credit).values
+    collateral_table = reference_data.collateral_region_table
+    value_factors = collateral_table.gather(collateral_table.value_factors, collateral_table.lookup_ids(collateral_cities, collateral_districts))
+    stressed_collateral_value = arithmetic.multiply(DecimalValues(value_factors), collateral_value[:, None]).values
+    stressed_collateral_ratio = arithmetic.divide(arithmetic.multiply(stressed_collateral_value, 0.8), total_credit[:, None]).values
+
+    # 營授比: net revenue / total market credit, stressed by transition and physical impacts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        net_operating_income = net_revenue / total_market_credit
+    transition_groups = mapped_ids(industries, industry_tables['transition_groups'])
+    transition = industry_tables['transition_percentages'][transition_groups]
+    physical = np.nan_to_num(reference_data.revenue_region_table.loss_percentages_for(cities, districts))
+    total_impact = arithmetic.add(transition, physical).values
+    remaining = arithmetic.subtract(1, arithmetic.divide(total_impact, 100))
+    stressed_net_operating_income = arithmetic.divide(arithmetic.multiply(net_revenue[:, None], remaining), total_market_credit[:, None]).values
+
+    ratios = np.column_stack([net_operating_income, stressed_net_operating_income])
+    collateral_ratios = np.column_stack([collateral_ratio, stressed_collateral_ratio])
+
+    # Same truthiness test as the row-wise code; NaN counts as present there
+    valid = (net_operating_income != 0) & (collateral_ratio != 0) & np.isfinite(value_factors).any(axis=1)
+
+    sector_ids = mapped_ids(industries, industry_tables['sector_ids'])
+    sector_ids = np.where(valid, sector_ids, -1)
+    pd_values, has_value = cube.pd_matrix(sector_ids, ratios, collateral_ratios, exp=arithmetic.exp)
+
+    ratios[~valid] = np.nan
+    collateral_ratios[~valid] = np.nan
+    emitted = has_value | ~valid[:, None]
+    rows, columns = np.nonzero(emitted)
+
+    return pd.DataFrame({
+        '客戶名': clients[rows],
+        '情境': np.asarray(SCENARIOS, dtype=object)[columns],
+        'PD(%)': pd_values[rows, columns],
+        '十足擔保比率': collateral_ratios[rows, columns],
+        '營授比': ratios[rows, columns],
+    }, index=data.index[rows], columns=CORPORATE_PD_COLUMNS)
+
+def compute_PD_domestic_personal_mortgage(data, reference_data=None, backend='decimal'):
+    """
+    Compute PD for domestic personal mortgages column-wise.
+
+    CLTV and DBR are computed once per loan, stressed CLTV for every stressed scenario comes
+    from one gather of the regional collateral value factors, and PDs are resolved through the
+    compiled mortgage range tables (CLTV ranges, then DBR ranges) one scenario at a time.
+
+    Parameters:
+    data (pd.DataFrame): Input data with the domestic personal mortgage columns.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend, 'decimal' to match the scalar Decimal modules exactly or 'float64'.
+
+    Returns:
+    pd.DataFrame: Result entries with 客戶名, 情境, PD(%), CLTV and DBR, indexed by the input row label,
+    in the order the row-wise code appends them: per loan a 基準情境 entry without PD, then either
+    the scenarios with a PD or, when the stressed CLTV cannot be computed, NaN entries for every scenario.
+    """
+    if reference_data is None:
+        reference_data = get_reference_data()
+    pd_tables = reference_data.pd_personal_mortgage_tables
+
+    data = data[data['客戶名'].notna()]
+    clients = text_column(data['客戶名'])
+    collateral_cities = text_column(data['擔保品縣市'])
+    collateral_districts = text_column(data['擔保品鄉鎮市區'])
+    collateral_value = float_column(data['擔保品價值'])
+    current_mortgage = float_column(data['貸放額度'])
+    consumer_unsecured_credit = float_column(data['消金無擔保授信金額'])
+    annual_income = float_column(data['年收入'])
+
+    arithmetic = get_arithmetic(backend)
+    cltv = arithmetic.divide(current_mortgage, collateral_value).values
+    dbr = arithmetic.divide(consumer_unsecured_credit, arithmetic.divide(annual_income, 12)).values
+    collateral_table = reference_data.collateral_region_table
+    value_factors = collateral_table.gather(collateral_table.value_factors, collateral_table.lookup_ids(collateral_cities, collateral_districts))
+    stressed_collateral_value = arithmetic.multiply(DecimalValues(value_factors), collateral_value[:, None]).values
+    stressed_cltv = arithmetic.divide(current_mortgage[:, None], stressed_collateral_value).values
+
+    # Same truthiness test as the row-wise code; NaN counts as present there
+    valid = (cltv != 0) & np.isfinite(value_factors).any(axis=1)
+
+    cltv_values = np.column_stack([cltv, stressed_cltv])
+    pd_values = np.full(cltv_values.shape, np.nan)
+    has_value = np.zeros(cltv_values.shape, dtype=bool)
+    for column, scenario in enumerate(SCENARIOS):
+        table = pd_tables.get(scenario)
+        if table is not None:
+            pd_values[:, column], has_value[:, column] = table.pd_values(cltv_values[:, column], dbr, exp=arithmetic.exp)
+
+    # Entry slots per loan: the 基準情境 entry, then one per scenario
+    slot_scenarios = np.asarray(("基準情境",) + SCENARIOS, dtype=object)
+    emitted = np.column_stack([np.ones(len(data), dtype=bool), (has_value & valid[:, None]) | ~valid[:, None]])
+    slot_pd = np.column_stack([np.full(len(data), np.nan), np.where(valid[:, None], pd_values, np.nan)])
+    slot_cltv = np.column_stack([cltv, np.where(valid[:, None], cltv_values, np.nan)])
+    slot_dbr = np.column_stack([dbr, np.where(valid, dbr, np.nan)[:, None].repeat(len(SCENARIOS), axis=1)])
+    rows, slots = np.nonzero(emitted)
+
+    return pd.DataFrame({
+        '客戶名': clients[rows],
+        '情境': slot_scenarios[slots],
+        'PD(%)': slot_pd[rows, slots],
+        'CLTV': slot_cltv[rows, slots],
+        'DBR': slot_dbr[rows, slots],
+    }, index=data.index[rows], columns=MORTGAGE_PD_COLUMNS)
+
+def compute_PD_domestic_personal_other(data, reference_data=None, backend='decimal'):
+    """
+    Compute PD for domestic personal other credit column-wise.
+
+    DBR is computed once per loan and shared by every scenario. Loans are split by 是否有擔保品
+    into the 個人其他有擔 and 個人其他無擔 sections, and PDs are resolved through the compiled
+    range tables of each section and scenario.
+
+    Parameters:
+    data (pd.DataFrame): Input data with the domestic personal other credit columns.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend, 'decimal' to match the scalar Decimal modules exactly or 'float64'.
+
+    Returns:
+    pd.DataFrame: Result entries with 客戶名, 情境, PD(%) and DBR, indexed by the input row label,
+    in the order the row-wise code appends them: per loan a 基準情境 entry without PD, then the
+    scenarios with a PD.
+    """
+    if reference_data is None:
+        reference_data = get_reference_data()
+    pd_tables = reference_data.pd_personal_other_tables
+
+    data = data[data['客戶名'].notna()]
+    clients = text_column(data['客戶名'])
+    consumer_unsecured_credit = float_column(data['消金無擔保授信金額'])
+    annual_income = float_column(data['年收入'])
+    is_collateral = text_equals(data['是否有擔保品'], '是')
+
+    arithmetic = get_arithmetic(backend)
+    dbr = arithmetic.divide(consumer_unsecured_credit, arithmetic.divide(annual_income, 12)).values
+
+    pd_values = np.full((len(data), len(SCENARIOS)), np.nan)
+    has_value = np.zeros((len(data), len(SCENARIOS)), dtype=bool)
+    for section, rows in (('個人其他有擔', np.flatnonzero(is_collateral)), ('個人其他無擔', np.flatnonzero(~is_collateral))):
+        for column, scenario in enumerate(SCENARIOS):
+            table = pd_tables.get((section, scenario))
+            if table is not None and rows.size:
+                pd_values[rows, column], has_value[rows, column] = table.pd_values(dbr[rows], exp=arithmetic.exp)
+
+    # Entry slots per loan: the 基準情境 entry, then one per scenario with a PD
+    slot_scenarios = np.asarray(("基準情境",) + SCENARIOS, dtype=object)
+    emitted = np.column_stack([np.ones(len(data), dtype=bool), has_value])
+    slot_pd = np.column_stack([np.full(len(data), np.nan), pd_values])
+    rows, slots = np.nonzero(emitted)
+
+    return pd.DataFrame({
+        '客戶名': clients[rows],
+        '情境': slot_scenarios[slots],
+        'PD(%)': slot_pd[rows, slots],
+        'DBR': dbr[rows],
+    }, index=data.index[rows], columns=PERSONAL_OTHER_PD_COLUMNS)
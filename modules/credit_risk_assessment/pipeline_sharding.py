@@ -0,0 +1,81 @@
+import argparse
+import math
+import os
+import tempfile
+import pandas as pd
+from . import sharding
+
+def large_copies(file_path, input_dir, suffix, copies):
+    """
+    Write copies of the first sheet of an input file, its rows repeated until each copy is
+    split into shards.
+
+    Parameters:
+    file_path (str): Path to the Excel, Parquet or CSV file containing input data.
+    input_dir (str): Directory the copies are written to, as CSV.
+    suffix (str): End of the copies' file names, the input file name suffix of their run.
+    copies (int): Number of copies.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.parquet':
+        data = pd.read_parquet(file_path)
+    elif extension == '.csv':
+        data = pd.read_csv(file_path)
+    else:
+        data = pd.read_excel(file_path)
+    rows = 2 * sharding.MIN_SHARD_ROWS
+    data = pd.concat([data] * math.ceil(rows / len(data)), ignore_index=True).head(rows)
+    for copy in range(1, copies + 1):
+        data.to_csv(os.path.join(input_dir, f'{copy}_{suffix}.csv'), index=False)
+
+def check_pipeline_sharding(file_path, run, copies=2, shard_workers=2):
+    """
+    Run large copies of an input file through main.run_tasks with one worker, the pipelined
+    mode, and count the start method of the workers every file was sharded across.
+
+    The pipeline stages run threads, so a shard pool started from the compute stage could not
+    fork; every sharded file should still run on forked workers that inherit the compiled
+    reference tables. The run takes place in a scratch working directory. Run it from the
+    repository root, like main.py.
+
+    Parameters:
+    file_path (str): Path to an Excel, Parquet or CSV input file of the run.
+    run (str): Key of main.PORTFOLIO_RUNS, e.g. 'domestic_corporate_credit'.
+    copies (int): Number of input files; the pipeline only runs with more than one.
+    shard_workers (int): Number of worker processes every file is split across.
+
+    Returns:
+    tuple: (report, start_methods): the run report of main.run_tasks, and a Counter of the
+    start method of every sharded computation.
+    """
+    import main
+
+    if run not in main.PORTFOLIO_RUNS:
+        raise ValueError(f"Unknown portfolio run: {run}")
+    input_dir, output_dir, suffix, sheet_names = main.PORTFOLIO_RUNS[run]
+    working_dir, configured_shard_workers = os.getcwd(), main.SHARD_WORKERS
+    with tempfile.TemporaryDirectory() as workspace:
+        os.makedirs(os.path.join(workspace, input_dir))
+        large_copies(file_path, os.path.join(workspace, input_dir), suffix or run, copies)
+        sharding.SHARD_START_METHODS.clear()
+        os.chdir(workspace)
+        main.SHARD_WORKERS = shard_workers
+        try:
+            report = main.run_tasks(main.list_tasks([run]), workers=1)
+        finally:
+            main.SHARD_WORKERS = configured_shard_workers
+            os.chdir(working_dir)
+    return report, sharding.SHARD_START_METHODS.copy()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that a pipelined run of main.py shards large files on forked workers.")
+    parser.add_argument('file_path', help="Excel, Parquet or CSV input file whose rows are repeated")
+    parser.add_argument('run', help="Portfolio run of main.py, e.g. domestic_corporate_credit")
+    parser.add_argument('--copies', type=int, default=2)
+    parser.add_argument('--shard-workers', type=int, default=2)
+    args = parser.parse_args()
+    report, start_methods = check_pipeline_sharding(args.file_path, args.run, args.copies, args.shard_workers)
+    print(report[['file', 'summary_rows', 'seconds', 'status', 'error']].to_string(index=False))
+    print('Shard start methods:', dict(start_methods))
+    forked = set(start_methods) == {'fork'} and sum(start_methods.values()) == len(report) and (report['status'] == 'ok').all()
+    print("PIPELINE SHARDING OK" if forked else "PIPELINE SHARDING FAIL")
@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+from ..common import SCENARIOS
+from ..reference_data import get_reference_data
+from .columns import text_column
+from .pd_engine import compute_PD_domestic_corporate_credit, compute_PD_domestic_personal_mortgage, compute_PD_domestic_personal_other
+from .lgd_engine import compute_LGD_domestic_corporate_credit, compute_LGD_domestic_personal_mortgage, compute_LGD_domestic_personal_other, compute_LGD_domestic_investment, compute_LGD_domestic_equity_investment
+from .ead_engine import compute_EAD
+from .calculate_pd import compute_PD_overseas
+from .calculate_lgd import compute_LGD_overseas_credit, compute_LGD_overseas_investment
+
+# Integer code of every scenario: its position in SCENARIOS
+SCENARIO_CODES = {scenario: code for code, scenario in enumerate(SCENARIOS)}
+
+# Measures of the result store and the result entry column each one is taken from
+RESULT_COLUMNS = {
+    'PD': 'PD(%)',
+    'LGD': 'LGD(%)',
+    'EAD': 'EAD',
+    '營授比': '營授比',
+    '十足擔保比率': '十足擔保比率',
+    'CLTV': 'CLTV',
+    'DBR': 'DBR',
+}
+
+# PD engine, LGD engine and EAD portfolio type of every portfolio type.
+# Every engine takes (data, reference_data, backend) and returns result entries indexed by row id.
+RESULT_ENGINES = {
+    'domestic_corporate_credit': (compute_PD_domestic_corporate_credit, compute_LGD_domestic_corporate_credit, 'domestic_corporate_credit'),
+    'domestic_personal_mortgage': (compute_PD_domestic_personal_mortgage, compute_LGD_domestic_personal_mortgage, 'domestic_personal_mortgage'),
+    'domestic_personal_other': (compute_PD_domestic_personal_other, compute_LGD_domestic_personal_other, 'domestic_personal_other'),
+    'overseas_credit': (compute_PD_overseas, compute_LGD_overseas_credit, 'overseas_credit'),
+    'domestic_investment': (compute_PD_domestic_corporate_credit, compute_LGD_domestic_investment, 'domestic_investment'),
+    'domestic_equity_investment': (compute_PD_domestic_corporate_credit, compute_LGD_domestic_equity_investment, 'domestic_investment'),
+    'overseas_investment': (compute_PD_overseas, compute_LGD_overseas_investment, 'overseas_investment'),
+}
+
+class ResultStore:
+    """
+    The results of a portfolio in long format: one entry per input row and scenario, keyed by
+    (row_id, scenario_code) and sorted by that key, with one float64 NumPy column per measure.
+
+    A measure is present on the entries its calculation emitted; the value of a present entry
+    can still be NaN. EAD does not depend on the scenario: it is present on every entry of a
+    row, and every row with an EAD has at least its 基準情境 entry.
+
+    Attributes:
+    row_ids (np.ndarray): int64 row id of every entry.
+    scenario_codes (np.ndarray): int8 code of every entry's scenario, see SCENARIO_CODES.
+    clients (np.ndarray): 客戶名 of every entry as str.
+    columns (dict): Measure name to its float64 values, NaN where the measure is absent.
+    present (dict): Measure name to the bool mask of the entries it is present on.
+    """
+    def __init__(self, row_ids, scenario_codes, clients, columns, present):
+        """
+        Parameters:
+        row_ids (np.ndarray): int64 row id of every entry, sorted with scenario_codes.
+        scenario_codes (np.ndarray): int8 scenario code of every entry.
+        clients (np.ndarray): 客戶名 of every entry.
+        columns (dict): Measure name to float64 values.
+        present (dict): Measure name to bool masks.
+        """
+        self.row_ids = row_ids
+        self.scenario_codes = scenario_codes
+        self.clients = clients
+        self.columns = columns
+        self.present = present
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    @classmethod
+    def from_results(cls, data, pd_results=None, lgd_results=None, ead=None):
+        """
+        Combine the result entries of the PD and LGD engines and the EAD of a portfolio.
+
+        Parameters:
+        data (pd.DataFrame): Input data the results were computed from, indexed by row id.
+        pd_results (pd.DataFrame): PD result entries, indexed by row id, at most one per row and scenario.
+        lgd_results (pd.DataFrame): LGD result entries, indexed by row id, at most one per row and scenario.
+        ead (pd.Series): EAD from compute_EAD, indexed by row id.
+
+        Returns:
+        ResultStore: The combined results.
+        """
+        results = [frame for frame in (pd_results, lgd_results) if frame is not None]
+        keys = [cls._keys(frame.index.to_numpy(dtype=np.int64), frame['情境']) for frame in results]
+        if ead is not None:
+            keys.append(cls._keys(ead.index.to_numpy(dtype=np.int64), SCENARIOS[0]))
+        keys = np.unique(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+        row_ids, scenario_codes = np.divmod(keys, len(SCENARIOS))
+
+        columns, present = {}, {}
+        for frame in results:
+            positions = np.searchsorted(keys, cls._keys(frame.index.to_numpy(dtype=np.int64), frame['情境']))
+            for measure, column in RESULT_COLUMNS.items():
+                if column in frame:
+                    columns[measure] = np.full(len(keys), np.nan)
+                    columns[measure][positions] = frame[column].to_numpy(dtype=float)
+                    present[measure] = np.zeros(len(keys), dtype=bool)
+                    present[measure][positions] = True
+        if ead is not None:
+            row_ead = ead.reindex(row_ids)
+            columns['EAD'] = row_ead.to_numpy(dtype=float)
+            present['EAD'] = np.isin(row_ids, ead.index.to_numpy(dtype=np.int64))
+
+        clients = text_column(data['客戶名']).take(data.index.get_indexer(row_ids)) if len(keys) else np.empty(0, dtype=object)
+        return cls(row_ids, scenario_codes.astype(np.int8), clients, columns, present)
+
+    @classmethod
+    def concat(cls, stores):
+        """
+        Join the result stores of consecutive row shards of a portfolio.
+
+        Parameters:
+        stores (list): Result stores whose row ids increase from one store to the next.
+
+        Returns:
+        ResultStore: The results of every shard, still sorted by (row_id, scenario_code).
+        """
+        measures = list(dict.fromkeys(measure for store in stores for measure in store.columns))
+        columns = {measure: np.concatenate([store.columns.get(measure, np.full(len(store), np.nan)) for store in stores]) for measure in measures}
+        present = {measure: np.concatenate([store.present.get(measure, np.zeros(len(store), dtype=bool)) for store in stores]) for measure in measures}
+        return cls(
+            np.concatenate([store.row_ids for store in stores]).astype(np.int64),
+            np.concatenate([store.scenario_codes for store in stores]).astype(np.int8),
+            np.concatenate([store.clients for store in stores]),
+            columns,
+            present,
+        )
+
+    @staticmethod
+    def _keys(row_ids, scenarios):
+        """
+        Encode (row_id, scenario) pairs as sortable int64 keys.
+
+        Parameters:
+        row_ids (np.ndarray): Row ids.
+        scenarios (pd.Series or str): Scenario names, or one scenario for every row.
+
+        Returns:
+        np.ndarray: row_id * len(SCENARIOS) + scenario code.
+        """
+        if isinstance(scenarios, str):
+            codes = SCENARIO_CODES[scenarios]
+        else:
+            codes = scenarios.map(SCENARIO_CODES).to_numpy(dtype=np.int64)
+        return row_ids * len(SCENARIOS) + codes
+
+    def select(self, measure, scenario):
+        """
+        Get the entries of one scenario a measure is present on, in row order.
+
+        Parameters:
+        measure (str): Key of RESULT_COLUMNS, e.g. 'PD'.
+        scenario (str): Scenario name, e.g. '無序轉型 2030'.
+
+        Returns:
+        tuple: (row_ids, clients, values) arrays of the entries.
+        """
+        mask = (self.scenario_codes == SCENARIO_CODES[scenario])
+        if measure in self.present:
+            mask &= self.present[measure]
+        else:
+            mask[:] = False
+        values = self.columns[measure][mask] if measure in self.columns else np.empty(0)
+        return self.row_ids[mask], self.clients[mask], values
+
+    def by_row(self, measure, row_ids):
+        """
+        Get a scenario-independent measure, such as EAD, of rows.
+
+        Parameters:
+        measure (str): Key of RESULT_COLUMNS.
+        row_ids (array-like): Row ids.
+
+        Returns:
+        np.ndarray: One value per row id, NaN for rows without the measure.
+        """
+        entry_rows, clients, values = self.select(measure, SCENARIOS[0])
+        return pd.Series(values, index=entry_rows).reindex(row_ids).to_numpy(dtype=float)
+
+    def first_by_client(self, measure, scenario, keys):
+        """
+        Get the value of the first entry of every client name in a scenario.
+
+        Parameters:
+        measure (str): Key of RESULT_COLUMNS, e.g. 'PD'.
+        scenario (str): Scenario name.
+        keys (np.ndarray): Client names, e.g. from summary.client_keys.
+
+        Returns:
+        np.ndarray: One value per key, NaN for clients without an entry.
+        """
+        entry_rows, clients, values = self.select(measure, scenario)
+        clients = pd.Index(clients, dtype=object)
+        first = ~clients.duplicated()
+        return pd.Series(values[first], index=clients[first]).reindex(pd.Index(keys, dtype=object)).to_numpy(dtype=float)
+
+    def to_frame(self):
+        """
+        Lay the store out as a DataFrame.
+
+        Returns:
+        pd.DataFrame: One row per entry with 客戶名, 情境 and the measures, indexed by (row_id, scenario_code).
+        """
+        index = pd.MultiIndex.from_arrays([self.row_ids, self.scenario_codes], names=['row_id', 'scenario_code'])
+        frame = pd.DataFrame({'客戶名': self.clients, '情境': np.asarray(SCENARIOS, dtype=object)[self.scenario_codes]}, index=index)
+        for measure, values in self.columns.items():
+            frame[measure] = values
+        return frame
+
+def compute_results(data, portfolio_type, reference_data=None, backend='decimal'):
+    """
+    Run PD, LGD and EAD for a portfolio into one result store.
+
+    Parameters:
+    data (pd.DataFrame): Input data of the portfolio, indexed by row id.
+    portfolio_type (str): Key of RESULT_ENGINES, e.g. 'domestic_corporate_credit'.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend of the column-wise engines, 'decimal' (default) or 'float64'.
+
+    Returns:
+    ResultStore: The results of the portfolio.
+    """
+    try:
+        pd_engine, lgd_engine, ead_type = RESULT_ENGINES[portfolio_type]
+    except KeyError:
+        raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+    if reference_data is None:
+        reference_data = get_reference_data()
+
+    pd_results = pd_engine(data, reference_data, backend)
+    lgd_results = lgd_engine(data, reference_data, backend)
+    return ResultStore.from_results(data, pd_results, lgd_results, compute_EAD(data, ead_type))
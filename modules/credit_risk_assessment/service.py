@@ -0,0 +1,276 @@
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from ..common import SCENARIOS
+from ..ingestion import PORTFOLIO_SCHEMAS, frame_portfolio
+from .api import preload_reference_data
+from .result_store import RESULT_ENGINES, compute_results
+from .summary import expected_loss
+
+# Most loans computed together in one batch
+BATCH_MAX_LOANS = 256
+# How long a batch waits for more requests after its first one, in seconds
+BATCH_WAIT_SECONDS = 0.002
+
+def quote_loans(loans, portfolio_type, reference_data=None):
+    """
+    Price loans under every scenario in one vectorized run.
+
+    Parameters:
+    loans (list): One dict per loan with the columns of the portfolio's workbook.
+    portfolio_type (str): Key of RESULT_ENGINES, e.g. 'domestic_corporate_credit'.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+
+    Returns:
+    list: One quote per loan, in input order: a dict with 客戶名, EAD and, under 'scenarios',
+    PD(%), LGD(%) and EL (expected loss, EAD * PD * LGD) for every scenario with a result.
+    Missing values are None.
+    """
+    portfolio = frame_portfolio(pd.DataFrame.from_records(loans), portfolio_type)
+    store = compute_results(portfolio.data, portfolio_type, reference_data)
+
+    ead = store.by_row('EAD', store.row_ids)
+    pd_rates = store.columns.get('PD', np.full(len(store), np.nan))
+    lgd_rates = store.columns.get('LGD', np.full(len(store), np.nan))
+    losses = expected_loss(ead, pd_rates, lgd_rates)
+    quotes = [{'客戶名': client, 'EAD': None, 'scenarios': {}} for client in portfolio.data['客戶名'].tolist()]
+    for row_id, code, row_ead, pd_rate, lgd_rate, loss in zip(store.row_ids.tolist(), store.scenario_codes.tolist(), ead.tolist(), pd_rates.tolist(), lgd_rates.tolist(), losses.tolist()):
+        quote = quotes[row_id]
+        quote['EAD'] = _json_value(row_ead)
+        quote['scenarios'][SCENARIOS[code]] = {'PD(%)': _json_value(pd_rate), 'LGD(%)': _json_value(lgd_rate), 'EL': _json_value(loss)}
+    for quote in quotes:
+        quote['客戶名'] = _json_value(quote['客戶名'])
+    return quotes
+
+def check_loans(loans, portfolio_type):
+    """
+    Check that every loan has every column its portfolio type reads.
+
+    A batch is framed from the loans of several requests together, and a column missing from one
+    loan would silently be NaN there whenever another loan of the batch has it. A loan may give a
+    column as null, but it must give it. Raises ValueError naming the first loan that lacks columns.
+
+    Parameters:
+    loans (list): One dict per loan.
+    portfolio_type (str): Key of PORTFOLIO_SCHEMAS.
+    """
+    try:
+        schema = PORTFOLIO_SCHEMAS[portfolio_type]
+    except KeyError:
+        raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+    for position, loan in enumerate(loans):
+        missing = [column for column in schema if column not in loan]
+        if missing:
+            raise ValueError(f"Loan {position} is missing columns: {', '.join(missing)}")
+
+def _json_value(value):
+    """
+    Convert a result value to JSON, NaN and missing values to None.
+
+    Parameters:
+    value: Scalar result value.
+
+    Returns:
+    The value, or None for NaN and missing values.
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NA:
+        return None
+    return value
+
+class MicroBatcher:
+    """
+    Coalesce concurrent quote requests of one portfolio type into vectorized batches.
+
+    A worker thread takes the first waiting request, gathers the requests that arrive within
+    BATCH_WAIT_SECONDS up to BATCH_MAX_LOANS loans, and prices them with one quote_loans call.
+    If a batch fails, its requests are priced one by one so only the faulty request fails.
+
+    Attributes:
+    portfolio_type (str): Key of RESULT_ENGINES.
+    reference_data (ReferenceData): Reference data registry the quotes are computed with.
+    """
+    def __init__(self, portfolio_type, reference_data, max_loans=None, max_wait=None):
+        """
+        Parameters:
+        portfolio_type (str): Key of RESULT_ENGINES.
+        reference_data (ReferenceData): Reference data registry.
+        max_loans (int): Most loans per batch. Defaults to BATCH_MAX_LOANS.
+        max_wait (float): Seconds a batch waits for more requests. Defaults to BATCH_WAIT_SECONDS.
+        """
+        self.portfolio_type = portfolio_type
+        self.reference_data = reference_data
+        self._max_loans = max_loans or BATCH_MAX_LOANS
+        self._max_wait = BATCH_WAIT_SECONDS if max_wait is None else max_wait
+        self._requests = queue.Queue()
+        threading.Thread(target=self._run, name=f'batcher-{portfolio_type}', daemon=True).start()
+
+    def quote(self, loans):
+        """
+        Price loans in the next batch, waiting for the result. Loans are checked with check_loans
+        before they are queued, so a request lacking columns fails alone.
+
+        Parameters:
+        loans (list): One dict per loan.
+
+        Returns:
+        list: One quote per loan, see quote_loans.
+        """
+        check_loans(loans, self.portfolio_type)
+        future = Future()
+        self._requests.put((loans, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._requests.get()]
+            loan_count = len(batch[0][0])
+            deadline = time.perf_counter() + self._max_wait
+            while loan_count < self._max_loans:
+                try:
+                    request = self._requests.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                batch.append(request)
+                loan_count += len(request[0])
+            self._price(batch)
+
+    def _price(self, batch):
+        try:
+            quotes = quote_loans([loan for loans, future in batch for loan in loans], self.portfolio_type, self.reference_data)
+        except Exception as error:
+            if len(batch) == 1:
+                batch[0][1].set_exception(error)
+                return
+            for request in batch:
+                self._price([request])
+            return
+        start = 0
+        for loans, future in batch:
+            future.set_result(quotes[start:start + len(loans)])
+            start += len(loans)
+
+class QuoteHandler(BaseHTTPRequestHandler):
+    """
+    HTTP endpoints of the quote service:
+
+    GET  /health                  -> {"status": "ok"}
+    POST /quote/<portfolio_type>  body: one loan object   -> one quote
+    POST /batch/<portfolio_type>  body: a list of loans   -> list of quotes
+    """
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY each response waits on a delayed ACK
+    disable_nagle_algorithm = True
+    batchers = {}
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._respond(200, {'status': 'ok', 'portfolio_types': sorted(self.batchers)})
+        else:
+            self._respond(404, {'error': f'Unknown path: {self.path}'})
+
+    def do_POST(self):
+        # The body is read first so a kept-alive connection stays in sync whatever the response;
+        # without a usable length it cannot be read, and the connection is closed instead
+        length = self.headers.get('Content-Length')
+        if length is None:
+            self.close_connection = True
+            self._respond(411, {'error': 'Content-Length required'})
+            return
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._respond(400, {'error': f"Invalid Content-Length: {self.headers.get('Content-Length')}"})
+            return
+        content = self.rfile.read(length)
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] not in ('quote', 'batch'):
+            self._respond(404, {'error': f'Unknown path: {self.path}'})
+            return
+        endpoint, portfolio_type = parts
+        if portfolio_type not in self.batchers:
+            self._respond(404, {'error': f'Unknown portfolio type: {portfolio_type}'})
+            return
+        try:
+            body = json.loads(content or 'null')
+        except ValueError as error:
+            self._respond(400, {'error': f'Invalid JSON: {error}'})
+            return
+        if endpoint == 'quote':
+            if not isinstance(body, dict):
+                self._respond(400, {'error': 'Expected one loan object'})
+                return
+            loans = [body]
+        else:
+            if not isinstance(body, list) or not all(isinstance(loan, dict) for loan in body):
+                self._respond(400, {'error': 'Expected a list of loan objects'})
+                return
+            loans = body
+        try:
+            quotes = self.batchers[portfolio_type].quote(loans) if loans else []
+        except (KeyError, ValueError, TypeError) as error:
+            self._respond(400, {'error': f'{type(error).__name__}: {error}'})
+            return
+        except Exception as error:
+            self._respond(500, {'error': f'{type(error).__name__}: {error}'})
+            return
+        self._respond(200, quotes[0] if endpoint == 'quote' else quotes)
+
+    def _respond(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class QuoteServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server of the quote service, with a listen backlog sized for many clients
+    connecting at once.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+def create_server(host='127.0.0.1', port=8000, portfolio_types=None, reference_data=None):
+    """
+    Create the quote service with warm reference data and one micro-batcher per portfolio type.
+
+    Parameters:
+    host (str): Interface to listen on.
+    port (int): Port to listen on; 0 picks a free one.
+    portfolio_types (iterable): Keys of RESULT_ENGINES served. Defaults to every type.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+
+    Returns:
+    QuoteServer: The server, not yet serving; call serve_forever.
+    """
+    reference_data = preload_reference_data(reference_data)
+    handler = type('BoundQuoteHandler', (QuoteHandler,), {
+        'batchers': {portfolio_type: MicroBatcher(portfolio_type, reference_data) for portfolio_type in (portfolio_types or RESULT_ENGINES)},
+    })
+    return QuoteServer((host, port), handler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve climate-stressed PD, LGD and EL quotes over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--portfolio-type', action='append', choices=sorted(RESULT_ENGINES), help="Portfolio type to serve; repeat for several. Defaults to every type.")
+    args = parser.parse_args()
+    server = create_server(args.host, args.port, args.portfolio_type)
+    print(f"Serving quotes on http://{args.host}:{server.server_address[1]}")
+    server.serve_forever()
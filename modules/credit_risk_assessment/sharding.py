@@ -0,0 +1,163 @@
+import math
+import os
+import threading
+from collections import Counter
+from ..reference_data import get_reference_data
+from .result_store import ResultStore, compute_results
+
+# Fewest input rows per shard; smaller files are not worth starting worker processes for
+MIN_SHARD_ROWS = 20000
+
+# Portfolio of the running compute_results_sharded call, inherited by forked workers
+_shared = {}
+
+# Reference data of the process that started a shard pool, inherited by its forked workers
+_pool_shared = {}
+
+# Start method of the worker processes of every sharded computation in this process
+SHARD_START_METHODS = Counter()
+
+def shard_bounds(rows, shards):
+    """
+    Split a number of rows into consecutive, nearly equal shards.
+
+    Parameters:
+    rows (int): Number of rows.
+    shards (int): Number of shards.
+
+    Returns:
+    list: (start, stop) positions of every shard, in row order.
+    """
+    size = math.ceil(rows / shards)
+    return [(start, min(start + size, rows)) for start in range(0, rows, size)]
+
+def _compute_shared_shard(bounds):
+    """
+    Compute the results of one shard of the portfolio in _shared, in a forked worker.
+
+    Parameters:
+    bounds (tuple): (start, stop) row positions of the shard.
+
+    Returns:
+    ResultStore: The results of the shard.
+    """
+    start, stop = bounds
+    return compute_results(_shared['data'].iloc[start:stop], _shared['portfolio_type'], _shared['reference_data'], _shared['backend'])
+
+def _compute_shard(data, portfolio_type, data_dir, backend):
+    """
+    Compute the results of one shard sent to a spawned worker.
+
+    Parameters:
+    data (pd.DataFrame): Rows of the shard.
+    portfolio_type (str): Key of RESULT_ENGINES.
+    data_dir (str): Data directory of the reference data, loaded once per worker.
+    backend (str): Numeric backend of the calculation.
+
+    Returns:
+    ResultStore: The results of the shard.
+    """
+    return compute_results(data, portfolio_type, get_reference_data(data_dir), backend)
+
+def _compute_pooled_shard(data, portfolio_type, backend):
+    """
+    Compute the results of one shard sent to a worker of start_shard_pool.
+
+    Parameters:
+    data (pd.DataFrame): Rows of the shard.
+    portfolio_type (str): Key of RESULT_ENGINES.
+    backend (str): Numeric backend of the calculation.
+
+    Returns:
+    ResultStore: The results of the shard.
+    """
+    return compute_results(data, portfolio_type, _pool_shared['reference_data'], backend)
+
+def start_shard_pool(workers, reference_data=None):
+    """
+    Fork the shard workers of a process before it starts other threads, for a caller that
+    computes while threads run, like the pipeline of main.run_pipeline.
+
+    Every reference table is compiled first, so the workers inherit them compiled like the
+    workers compute_results_sharded forks itself; only shard rows and results are pickled.
+
+    Parameters:
+    workers (int): Number of worker processes.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+
+    Returns:
+    ProcessPoolExecutor: The pool with every worker started, to pass to compute_results_sharded
+    and shut down when done. None where fork is not available or other threads already run.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from .api import preload_reference_data
+
+    if 'fork' not in multiprocessing.get_all_start_methods() or threading.active_count() > 1:
+        return None
+    _pool_shared['reference_data'] = preload_reference_data(reference_data)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    # A fork pool starts all of its workers on the first task, so none is forked later from threads
+    pool.submit(int).result()
+    return pool
+
+def compute_results_sharded(data, portfolio_type, workers=None, reference_data=None, backend='decimal', pool=None):
+    """
+    Run PD, LGD and EAD for a portfolio in row shards on a pool of worker processes.
+
+    Every engine works row by row, so the shard results are joined in input order into the
+    same result store compute_results builds. Where the fork start method is available the
+    reference tables are compiled once in this process before the pool starts, and the workers
+    inherit them together with the portfolio through copy-on-write memory: only the shard
+    bounds and the shard results are pickled. Elsewhere, and in a process running other threads
+    (forking those is not safe), every worker loads the reference data once and receives its
+    rows pickled. A pool from start_shard_pool keeps the inherited tables for callers running
+    threads.
+
+    Parameters:
+    data (pd.DataFrame): Input data of the portfolio, indexed by row id in increasing order.
+    portfolio_type (str): Key of RESULT_ENGINES, e.g. 'domestic_corporate_credit'.
+    workers (int): Number of worker processes. None uses every CPU. Files of fewer than
+        2 * MIN_SHARD_ROWS rows, or a single worker, are computed in this process.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend of the column-wise engines, 'decimal' (default) or 'float64'.
+    pool (ProcessPoolExecutor): Pool from start_shard_pool to compute the shards on, with the
+        reference data it was started with. None starts a pool for this call.
+
+    Returns:
+    ResultStore: The results of the portfolio.
+    """
+    if reference_data is None:
+        reference_data = get_reference_data()
+    workers = min(workers or os.cpu_count() or 1, len(data) // MIN_SHARD_ROWS)
+    if workers <= 1:
+        return compute_results(data, portfolio_type, reference_data, backend)
+
+    if pool is not None:
+        SHARD_START_METHODS['fork'] += 1
+        bounds = shard_bounds(len(data), workers)
+        return ResultStore.concat(list(pool.map(_compute_pooled_shard, [data.iloc[start:stop] for start, stop in bounds],
+                                                [portfolio_type] * len(bounds), [backend] * len(bounds))))
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # A one-row run compiles every reference table the engines of this portfolio type use
+    compute_results(data.iloc[:1], portfolio_type, reference_data, backend)
+    bounds = shard_bounds(len(data), workers)
+    start_methods = multiprocessing.get_all_start_methods()
+    if 'fork' in start_methods and threading.active_count() == 1:
+        SHARD_START_METHODS['fork'] += 1
+        _shared.update(data=data, portfolio_type=portfolio_type, reference_data=reference_data, backend=backend)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+                stores = list(pool.map(_compute_shared_shard, bounds))
+        finally:
+            _shared.clear()
+    else:
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in start_methods else 'spawn')
+        SHARD_START_METHODS[context.get_start_method()] += 1
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            stores = list(pool.map(_compute_shard, [data.iloc[start:stop] for start, stop in bounds],
+                                   [portfolio_type] * len(bounds), [reference_data.data_dir] * len(bounds), [backend] * len(bounds)))
+    return ResultStore.concat(stores)
@@ -0,0 +1,92 @@
+import argparse
+import gc
+import os
+import pandas as pd
+from ..ingestion import load_portfolio
+from ..reference_data import get_reference_data
+from .result_store import RESULT_ENGINES, compute_results
+from .summary import store_summary
+from .calculate_pd import process_PD_domestic_corporate_credit, process_PD_domestic_personal_mortgage, process_PD_domestic_personal_other, process_PD_overseas_credit, process_PD_domestic_investment, process_PD_overseas_investment
+from .calculate_lgd import process_LGD_domestic_corporate_credit, process_LGD_domestic_personal_mortgage, process_LGD_domestic_personal_other, process_LGD_overseas_credit, process_LGD_domestic_investment, process_LGD_overseas_investment
+
+# Per-scenario wrappers of every portfolio type that has them
+SOAK_WRAPPERS = {
+    'domestic_corporate_credit': (process_PD_domestic_corporate_credit, process_LGD_domestic_corporate_credit),
+    'domestic_personal_mortgage': (process_PD_domestic_personal_mortgage, process_LGD_domestic_personal_mortgage),
+    'domestic_personal_other': (process_PD_domestic_personal_other, process_LGD_domestic_personal_other),
+    'overseas_credit': (process_PD_overseas_credit, process_LGD_overseas_credit),
+    'domestic_investment': (process_PD_domestic_investment, process_LGD_domestic_investment),
+    'overseas_investment': (process_PD_overseas_investment, process_LGD_overseas_investment),
+}
+
+SOAK_COLUMNS = ['iteration', 'rss_mb', 'store_entries', 'wrapper_entries']
+
+def current_rss_mb():
+    """
+    Get the resident set size of this process.
+
+    Returns:
+    float: RSS in MiB; the peak RSS where the current one is not available, None where neither is.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10
+
+def soak(file_path, portfolio_type, iterations=1000, sample_every=50, reference_data=None):
+    """
+    Process one portfolio file many times in this process, the way main.py processes a
+    directory of files, and sample the RSS as it goes.
+
+    Every iteration parses the file, builds the result store and both summary tables, and
+    calls the per-scenario PD and LGD wrappers of the portfolio type. With re-entrant engines
+    the entry counts stay the same and the RSS flattens out after the first iterations.
+
+    Parameters:
+    file_path (str): Path to the Excel, Parquet or CSV file containing input data.
+    portfolio_type (str): Key of RESULT_ENGINES, e.g. 'domestic_corporate_credit'.
+    iterations (int): Number of times the file is processed.
+    sample_every (int): Number of iterations between two samples.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+
+    Returns:
+    pd.DataFrame: One row per sample with the iteration, rss_mb, the entries of the result
+    store and the entries returned by the wrappers in that iteration.
+    """
+    if portfolio_type not in RESULT_ENGINES:
+        raise ValueError(f"Unknown portfolio type: {portfolio_type}")
+    if reference_data is None:
+        reference_data = get_reference_data()
+    overseas = portfolio_type.startswith('overseas')
+    wrappers = SOAK_WRAPPERS.get(portfolio_type, ())
+
+    samples = []
+    for iteration in range(1, iterations + 1):
+        portfolio = load_portfolio(file_path, portfolio_type)
+        store = compute_results(portfolio.data, portfolio_type, reference_data)
+        for horizon in ('2030', '2050'):
+            store_summary(portfolio.summary, store, horizon, overseas, portfolio.data.index)
+        wrapper_entries = sum(len(entries) for wrapper in wrappers for entries in wrapper(portfolio))
+        if iteration == 1 or iteration % sample_every == 0 or iteration == iterations:
+            gc.collect()
+            samples.append([iteration, current_rss_mb(), len(store), wrapper_entries])
+    return pd.DataFrame(samples, columns=SOAK_COLUMNS)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process a portfolio file repeatedly in one process and report the RSS.")
+    parser.add_argument('file_path', help="Excel, Parquet or CSV file with the portfolio input data")
+    parser.add_argument('portfolio_type', choices=sorted(RESULT_ENGINES))
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--sample-every', type=int, default=50)
+    args = parser.parse_args()
+    report = soak(args.file_path, args.portfolio_type, args.iterations, args.sample_every)
+    print(report.to_string(index=False))
+    settled = report[report['iteration'] >= args.sample_every]
+    if len(settled) > 1 and settled['rss_mb'].notna().all():
+        print(f"RSS growth after iteration {settled['iteration'].iloc[0]}: {settled['rss_mb'].iloc[-1] - settled['rss_mb'].iloc[0]:+.1f} MiB")
@@ -0,0 +1,92 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import pandas as pd
+
+# The command-line entry point whose cold start is measured
+MAIN_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../main.py'))
+
+STARTUP_COLUMNS = ['sample', 'interpreter_s', 'import_s', 'first_result_s']
+
+def one_loan_file(file_path, output_path):
+    """
+    Write the first loan of an input file to a new input file of the same format.
+
+    Parameters:
+    file_path (str): Path to the Excel, Parquet or CSV file containing input data.
+    output_path (str): Path of the one-loan file.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.parquet':
+        pd.read_parquet(file_path).head(1).to_parquet(output_path, index=False)
+    elif extension == '.csv':
+        pd.read_csv(file_path, nrows=1).to_csv(output_path, index=False)
+    else:
+        pd.read_excel(file_path, nrows=1).to_excel(output_path, index=False)
+
+def _elapsed(command, cwd):
+    """
+    Run a command in a fresh interpreter and time it.
+
+    Parameters:
+    command (list): Arguments after the Python executable.
+    cwd (str): Working directory of the command.
+
+    Returns:
+    float: Wall-clock seconds from start to exit.
+    """
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *command], cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def startup_benchmark(file_path, run, samples=10):
+    """
+    Measure the time to first result of a one-loan run of main.py, the way a scheduler calls it.
+
+    The first loan of the input file is copied into the input directory of the run in a scratch
+    working directory, and every sample starts three fresh interpreters: an empty one, one that
+    only imports main, and main.py processing the one-loan run. The gaps between them are the
+    import cost and the cost of the run itself. Run it from the repository root, like main.py.
+
+    Parameters:
+    file_path (str): Path to an Excel, Parquet or CSV input file of the run.
+    run (str): Key of main.PORTFOLIO_RUNS, e.g. 'domestic_corporate_credit'.
+    samples (int): Number of samples, after one unrecorded warm-up that compiles the bytecode.
+
+    Returns:
+    pd.DataFrame: One row per sample with the seconds of each of the three processes.
+    """
+    from main import PORTFOLIO_RUNS
+
+    if run not in PORTFOLIO_RUNS:
+        raise ValueError(f"Unknown portfolio run: {run}")
+    repository = os.path.dirname(MAIN_PATH)
+    with tempfile.TemporaryDirectory() as workspace:
+        input_dir = os.path.join(workspace, PORTFOLIO_RUNS[run][0])
+        os.makedirs(input_dir)
+        one_loan_file(file_path, os.path.join(input_dir, os.path.basename(file_path)))
+
+        commands = (
+            (['-c', 'pass'], workspace),
+            (['-c', 'import main'], repository),
+            ([MAIN_PATH, '--workers', '1', '--run', run], workspace),
+        )
+        for command, cwd in commands:
+            _elapsed(command, cwd)
+        report = [[sample] + [_elapsed(command, cwd) for command, cwd in commands] for sample in range(1, samples + 1)]
+    return pd.DataFrame(report, columns=STARTUP_COLUMNS)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the cold-start time to first result of a one-loan run of main.py.")
+    parser.add_argument('file_path', help="Excel, Parquet or CSV input file whose first loan is run")
+    parser.add_argument('run', help="Portfolio run of main.py, e.g. domestic_corporate_credit")
+    parser.add_argument('--samples', type=int, default=10)
+    args = parser.parse_args()
+    report = startup_benchmark(args.file_path, args.run, args.samples)
+    print(report.round(3).to_string(index=False))
+    medians = report.median()
+    print(f"Median: interpreter {medians['interpreter_s']:.3f} s, import main +{medians['import_s'] - medians['interpreter_s']:.3f} s, "
+          f"first result {medians['first_result_s']:.3f} s")
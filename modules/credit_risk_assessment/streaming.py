@@ -0,0 +1,103 @@
+import os
+from ..ingestion import read_chunks
+from ..reference_data import get_reference_data
+from .ead_engine import compute_EAD, EAD_COLUMN_SPEC
+from .result_store import RESULT_ENGINES
+from .summary import SummaryBuilder
+
+# Rows per chunk when streaming a portfolio
+DEFAULT_CHUNK_SIZE = 50000
+
+class TableAppender:
+    """
+    Appends tables with the same columns to a CSV or Parquet file.
+
+    Attributes:
+    path (str): Output file path; the extension selects the format.
+    """
+    def __init__(self, path):
+        """
+        Parameters:
+        path (str): Output file path ending in .csv or .parquet.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in ('.csv', '.parquet'):
+            raise ValueError(f"Streamed results are written as .csv or .parquet: {path}")
+        self.path = path
+        self._parquet = extension == '.parquet'
+        self._writer = None
+        self._started = False
+
+    def append(self, table):
+        """
+        Append the rows of a table.
+
+        Parameters:
+        table (pd.DataFrame): Rows to append.
+        """
+        if self._parquet:
+            import pyarrow
+            import pyarrow.parquet
+
+            if self._writer is None:
+                arrow_table = pyarrow.Table.from_pandas(table, preserve_index=False)
+                self._writer = pyarrow.parquet.ParquetWriter(self.path, arrow_table.schema)
+            else:
+                arrow_table = pyarrow.Table.from_pandas(table, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(arrow_table)
+        else:
+            table.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+def stream_portfolio(file_path, portfolio_type, output_paths, chunk_size=DEFAULT_CHUNK_SIZE, reference_data=None, backend='decimal'):
+    """
+    Run PD, LGD, EAD and the expected loss summary over a CSV or Parquet portfolio in chunks of
+    rows, appending each chunk's summary rows to the output files.
+
+    The file is read twice: PD and LGD run over every chunk first, then the client names and
+    exposure columns are read again to compute EAD and write the summary rows. A client's
+    first PD and LGD entry can come from any later chunk, so memory is not bounded: besides one
+    chunk it grows linearly with the number of distinct client names. Every name is kept once
+    with its integer code, and the first PD and LGD take 18 bytes per client and scenario, up to
+    half as much again while their matrices grow (see summary.FirstEntryRates).
+
+    Parameters:
+    file_path (str): Path to the Parquet or CSV file containing input data.
+    portfolio_type (str): Key of RESULT_ENGINES.
+    output_paths (dict): Horizon ('2030' or '2050') to the .csv or .parquet file its summary is written to.
+    chunk_size (int): Number of input rows per chunk.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+    backend (str): Numeric backend of the calculation, 'decimal' (default) or 'float64'.
+
+    Returns:
+    int: Number of summary rows written per horizon.
+    """
+    try:
+        pd_engine, lgd_engine, ead_type = RESULT_ENGINES[portfolio_type]
+    except KeyError:
+        raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+    if reference_data is None:
+        reference_data = get_reference_data()
+
+    builder = SummaryBuilder(overseas=portfolio_type.startswith('overseas'))
+    for chunk in read_chunks(file_path, portfolio_type, chunk_size):
+        builder.add_results(pd_engine(chunk, reference_data, backend), lgd_engine(chunk, reference_data, backend))
+
+    exposure_columns = ('客戶名',) + EAD_COLUMN_SPEC[ead_type]
+    appenders = {horizon: TableAppender(path) for horizon, path in output_paths.items()}
+    written = 0
+    try:
+        for chunk in read_chunks(file_path, portfolio_type, chunk_size, columns=exposure_columns):
+            summaries = builder.summarize(chunk, compute_EAD(chunk, ead_type), horizons=appenders)
+            for horizon, appender in appenders.items():
+                appender.append(summaries[horizon])
+            written += int(chunk['客戶名'].notna().sum())
+    finally:
+        for appender in appenders.values():
+            appender.close()
+    return written
@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+from ..common import SCENARIOS
+
+# Scenario behind each group of the summary tables, per horizon
+DOMESTIC_SUMMARY_SCENARIOS = {
+    '2030': (('基準情境', '基準情境'), ('有序轉型', '2050淨零轉型 2030'), ('無序轉型', '無序轉型 2030'), ('無政策情境', '無政策情境 2030')),
+    '2050': (('基準情境', '基準情境'), ('有序轉型', '2050淨零轉型 2050'), ('無序轉型', '無序轉型 2050'), ('無政策情境', '無政策情境 2050')),
+    # Only the no-policy scenario reaches 2090
+    '2090': (('基準情境', '基準情境'), ('無政策情境', '無政策情境 2090')),
+}
+OVERSEAS_SUMMARY_SCENARIOS = {
+    '2030': (('基準情境', '基準情境'), ('有序轉型', '2050淨零轉型 2030'), ('無序轉型', '無序轉型 2030')),
+    '2050': (('基準情境', '基準情境'), ('有序轉型', '2050淨零轉型 2050'), ('無序轉型', '無序轉型 2050')),
+}
+
+def expected_loss(ead, pd_rate, lgd_rate):
+    """
+    Calculate the expected loss column-wise, in the operation order of main.calculate_expected_loss.
+
+    Parameters:
+    ead (np.ndarray): Exposure at default.
+    pd_rate (np.ndarray): Probability of default rate.
+    lgd_rate (np.ndarray): Loss given default rate.
+
+    Returns:
+    np.ndarray: Expected loss, NaN where any input is NaN.
+    """
+    return pd_rate / 100 * lgd_rate / 100 * ead * 100
+
+def client_keys(clients):
+    """
+    Get the key each summary row is matched on: result entries carry the client name as str,
+    so rows whose 客戶名 is not text match no entry.
+
+    Parameters:
+    clients (pd.Series): Raw 客戶名 column.
+
+    Returns:
+    np.ndarray: Object array of client names, None for non-text names.
+    """
+    if isinstance(clients.dtype, pd.StringDtype):
+        return clients.to_numpy(dtype=object, na_value=None)
+    return np.array([client if isinstance(client, str) else None for client in clients], dtype=object)
+
+def summary_table(clients, exposure, rates, overseas=False):
+    """
+    Build a summary table of main.py column-wise.
+
+    Parameters:
+    clients (pd.Series): 客戶名 of the summary rows.
+    exposure (np.ndarray): EAD of the summary rows.
+    rates (iterable): (header, PD, LGD) of every scenario group, with one rate per summary row.
+    overseas (bool): Whether the table has the overseas layout.
+
+    Returns:
+    pd.DataFrame: One row per summary row, with columns named '<header>_<measure>'.
+    """
+    columns = {'客戶名': clients.to_numpy(dtype=object), '曝險金額': exposure}
+    for header, pd_rate, lgd_rate in rates:
+        columns[f'{header}_平均違約率'] = pd_rate
+        columns[f'{header}_平均違約損失率'] = lgd_rate * 100
+        if overseas:
+            columns[f'{header}_估計可能損失數'] = expected_loss(exposure, pd_rate, lgd_rate * 100)
+        elif header == '有序轉型':
+            # The domestic summary has never filled the orderly expected loss
+            columns[f'{header}_估計可能損失數'] = np.full(len(exposure), np.nan)
+        else:
+            columns[f'{header}_估計可能損失數'] = expected_loss(exposure, pd_rate, lgd_rate)
+    return pd.DataFrame(columns)
+
+def store_summary(summary_df, store, horizon, overseas=False, data_rows=None):
+    """
+    Build a summary table of main.py from a result store.
+
+    Every row with a 客戶名 gets the first PD and LGD entry of its client name in each scenario.
+    Rows the store was computed from get their own EAD by row id; the other rows, from the later
+    sheets of a workbook, get the first EAD of their client name, as the 客戶名 merge gave them.
+
+    Parameters:
+    summary_df (pd.DataFrame): Summary rows, indexed by row id.
+    store (ResultStore): Results of the portfolio.
+    horizon (str): Key of DOMESTIC_SUMMARY_SCENARIOS or OVERSEAS_SUMMARY_SCENARIOS, e.g. '2030'.
+    overseas (bool): Whether the table has the overseas layout.
+    data_rows (pd.Index): Row ids of the rows the store was computed from, e.g. the index of
+        LoadedPortfolio.data. None when every summary row is one of them.
+
+    Returns:
+    pd.DataFrame: One row per summary row, with columns named '<header>_<measure>'.
+    """
+    groups = (OVERSEAS_SUMMARY_SCENARIOS if overseas else DOMESTIC_SUMMARY_SCENARIOS)[horizon]
+    rows = summary_df[summary_df['客戶名'].notna()]
+    keys = client_keys(rows['客戶名'])
+    exposure = store.by_row('EAD', rows.index)
+    if data_rows is not None:
+        other_sheets = ~rows.index.isin(data_rows)
+        if other_sheets.any():
+            exposure = exposure.copy()
+            exposure[other_sheets] = store.first_by_client('EAD', SCENARIOS[0], keys[other_sheets])
+    rates = [(header, store.first_by_client('PD', scenario, keys), store.first_by_client('LGD', scenario, keys)) for header, scenario in groups]
+    return summary_table(rows['客戶名'], exposure, rates, overseas)
+
+def client_codes(clients, codes, add=True):
+    """
+    Get the dense integer code of client names, looking each distinct name up once.
+
+    Parameters:
+    clients (np.ndarray): Client names; missing names get no code.
+    codes (dict): Client name to code.
+    add (bool): Give names without a code the next free codes, extending codes in place.
+
+    Returns:
+    np.ndarray: int64 code of every name, -1 for missing names and, unless added, unknown names.
+    """
+    positions, uniques = pd.factorize(clients)
+    if add:
+        unique_codes = np.array([codes.setdefault(client, len(codes)) for client in uniques], dtype=np.int64)
+    else:
+        unique_codes = np.array([codes.get(client, -1) for client in uniques], dtype=np.int64)
+    return np.where(positions >= 0, unique_codes[positions] if len(unique_codes) else positions, -1)
+
+class FirstEntryRates:
+    """
+    The first result entry of every client and scenario, accumulated over chunks of results.
+
+    The summary tables report, for every client, the value of the first entry with that client
+    name in each scenario. Entries are added in input order, so an entry seen in an earlier chunk
+    is never replaced. The state is columnar: row i of values and present belongs to the client
+    with code i, so it takes 9 bytes per client and scenario plus the client name in codes, which
+    the PD and LGD rates of a SummaryBuilder share.
+
+    Attributes:
+    scenarios (tuple): Scenarios kept, in column order.
+    codes (dict): Client name to its row.
+    values (np.ndarray): float64 first entry value per client row and scenario, NaN where absent.
+    present (np.ndarray): bool mask of the client rows and scenarios with an entry.
+    """
+    def __init__(self, scenarios, codes=None):
+        """
+        Parameters:
+        scenarios (tuple): Scenarios kept, in column order.
+        codes (dict): Client name to row, shared with other FirstEntryRates. Defaults to a new dict.
+        """
+        self.scenarios = tuple(scenarios)
+        self.codes = {} if codes is None else codes
+        self.values = np.full((0, len(self.scenarios)), np.nan)
+        self.present = np.zeros((0, len(self.scenarios)), dtype=bool)
+
+    def _reserve(self, rows):
+        """
+        Grow values and present by half their size, or more, to hold at least a number of client rows.
+
+        Parameters:
+        rows (int): Client rows needed.
+        """
+        capacity = len(self.values)
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity + capacity // 2, 1024)
+        values = np.full((capacity, len(self.scenarios)), np.nan)
+        present = np.zeros((capacity, len(self.scenarios)), dtype=bool)
+        values[:len(self.values)] = self.values
+        present[:len(self.present)] = self.present
+        self.values, self.present = values, present
+
+    def add(self, results, value_column):
+        """
+        Record the entries of a chunk of results.
+
+        Parameters:
+        results (pd.DataFrame): Result entries with 客戶名, 情境 and the value column, in input order.
+        value_column (str): Name of the value column, e.g. 'PD(%)'.
+        """
+        columns = pd.Index(self.scenarios).get_indexer(results['情境'])
+        kept = columns >= 0
+        clients = client_codes(results['客戶名'].to_numpy(dtype=object)[kept], self.codes)
+        columns = columns[kept]
+        values = results[value_column].to_numpy(dtype=float, na_value=np.nan)[kept]
+        named = clients >= 0
+        clients, columns, values = clients[named], columns[named], values[named]
+        if not len(clients):
+            return
+        self._reserve(len(self.codes))
+
+        # The first entry of every client and scenario in the chunk, kept where none was seen before
+        first = np.unique(clients * len(self.scenarios) + columns, return_index=True)[1]
+        missing = ~self.present[clients[first], columns[first]]
+        first = first[missing]
+        self.values[clients[first], columns[first]] = values[first]
+        self.present[clients[first], columns[first]] = True
+
+    def lookup(self, keys):
+        """
+        Get the first entry values of clients.
+
+        Parameters:
+        keys (np.ndarray): Client names from client_keys.
+
+        Returns:
+        np.ndarray: One row per key and one column per scenario, NaN without an entry.
+        """
+        rows = client_codes(keys, self.codes, add=False)
+        # Codes are shared, so a client can have a code but no row in this table yet
+        found = (rows >= 0) & (rows < len(self.values))
+        rates = np.full((len(keys), len(self.scenarios)), np.nan)
+        rates[found] = self.values[rows[found]]
+        return rates
+
+class SummaryBuilder:
+    """
+    Builds the per-horizon summary tables of main.py from column-wise results, one chunk of
+    input rows at a time.
+
+    Rows of a chunk are the input rows with a 客戶名, each joined with its own EAD by row id.
+    PD and LGD are the first entries of the client name over every result added, as in the
+    summary tables built from whole files: add the results of all chunks before summarizing
+    any of them when a client name can repeat across chunks.
+
+    Attributes:
+    groups (dict): Horizon to (header, scenario) pairs.
+    overseas (bool): Whether the overseas table layout is built.
+    """
+    def __init__(self, overseas=False):
+        """
+        Parameters:
+        overseas (bool): Build the overseas layout (three scenario groups) instead of the domestic one.
+        """
+        self.groups = OVERSEAS_SUMMARY_SCENARIOS if overseas else DOMESTIC_SUMMARY_SCENARIOS
+        self.overseas = overseas
+        scenarios = tuple(dict.fromkeys(scenario for groups in self.groups.values() for header, scenario in groups))
+        self._pd = FirstEntryRates(scenarios)
+        self._lgd = FirstEntryRates(scenarios, self._pd.codes)
+
+    def add_results(self, pd_results, lgd_results):
+        """
+        Record the PD and LGD result entries of one chunk of input rows.
+
+        Parameters:
+        pd_results (pd.DataFrame): PD result entries of the chunk.
+        lgd_results (pd.DataFrame): LGD result entries of the chunk.
+        """
+        self._pd.add(pd_results, 'PD(%)')
+        self._lgd.add(lgd_results, 'LGD(%)')
+
+    def summarize(self, data, ead, horizons=None):
+        """
+        Summarize one chunk of input rows with the results recorded so far.
+
+        Parameters:
+        data (pd.DataFrame): Input rows of the chunk, indexed by row id.
+        ead (pd.Series): EAD from compute_EAD, indexed by row id.
+        horizons (iterable): Horizons to summarize. Defaults to every horizon of the layout.
+
+        Returns:
+        dict: Horizon to the chunk's summary table, with columns named '<header>_<measure>'
+        like main.summarize.
+        """
+        rows = data[data['客戶名'].notna()]
+        keys = client_keys(rows['客戶名'])
+        exposure = ead.reindex(rows.index).to_numpy(dtype=float)
+        pd_rates = self._pd.lookup(keys)
+        lgd_rates = self._lgd.lookup(keys)
+
+        summaries = {}
+        for horizon in (self.groups if horizons is None else horizons):
+            groups = self.groups[horizon]
+            columns = [self._pd.scenarios.index(scenario) for header, scenario in groups]
+            rates = [(header, pd_rates[:, column], lgd_rates[:, column]) for (header, scenario), column in zip(groups, columns)]
+            summaries[horizon] = summary_table(rows['客戶名'], exposure, rates, self.overseas)
+        return summaries
@@ -0,0 +1,99 @@
+import argparse
+import numpy as np
+import pandas as pd
+from ..ingestion import LoadedPortfolio, load_portfolio, with_row_id
+from ..reference_data import get_reference_data
+from .ead_engine import compute_EAD, ead_records
+from .result_store import RESULT_ENGINES, ResultStore
+from .summary import DOMESTIC_SUMMARY_SCENARIOS, OVERSEAS_SUMMARY_SCENARIOS, store_summary, summary_table
+
+PARITY_COLUMNS = ['horizon', 'column', 'mismatches']
+
+def two_sheet_portfolio(data):
+    """
+    Lay out input data as a two-sheet workbook whose second sheet repeats every row of the
+    first, like the 一般企業 and 公營企業 sheets of the corporate and overseas workbooks.
+
+    Parameters:
+    data (pd.DataFrame): Input data of the portfolio.
+
+    Returns:
+    LoadedPortfolio: The workbook; only its first sheet is computed.
+    """
+    return LoadedPortfolio(None, {'一般企業': with_row_id(data.copy()), '公營企業': with_row_id(data.copy())})
+
+def merged_summary(portfolio, pd_results, lgd_results, ead, horizon, overseas=False):
+    """
+    Build a summary table with the joins of the original summaries: EAD merged on 客戶名 for
+    rows of later sheets, and the first PD and LGD entry of every client name.
+
+    Parameters:
+    portfolio (LoadedPortfolio): The workbook.
+    pd_results (pd.DataFrame): PD result entries of its first sheet.
+    lgd_results (pd.DataFrame): LGD result entries of its first sheet.
+    ead (pd.Series): EAD of its first sheet, from compute_EAD.
+    horizon (str): Key of DOMESTIC_SUMMARY_SCENARIOS or OVERSEAS_SUMMARY_SCENARIOS.
+    overseas (bool): Whether the table has the overseas layout.
+
+    Returns:
+    pd.DataFrame: The summary table, laid out like store_summary.
+    """
+    rows = portfolio.summary[portfolio.summary['客戶名'].notna()]
+    clients = rows['客戶名'].astype(object)
+    first_ead = pd.DataFrame(ead_records(portfolio.data, ead), columns=['客戶名', 'EAD']).drop_duplicates('客戶名')
+    merged = clients.to_frame().merge(first_ead, on='客戶名', how='left')['EAD'].to_numpy(dtype=float)
+    own = ead.reindex(rows.index).to_numpy(dtype=float)
+    exposure = np.where(rows.index.isin(portfolio.data.index), own, merged)
+
+    def first_rates(results, column, scenario):
+        first = results[results['情境'] == scenario].drop_duplicates('客戶名')
+        return clients.map(pd.Series(first[column].to_numpy(dtype=float), index=first['客戶名'].to_numpy(dtype=object))).to_numpy(dtype=float)
+
+    groups = (OVERSEAS_SUMMARY_SCENARIOS if overseas else DOMESTIC_SUMMARY_SCENARIOS)[horizon]
+    rates = [(header, first_rates(pd_results, 'PD(%)', scenario), first_rates(lgd_results, 'LGD(%)', scenario)) for header, scenario in groups]
+    return summary_table(rows['客戶名'], exposure, rates, overseas)
+
+def check_two_sheet_summary(data, portfolio_type, reference_data=None):
+    """
+    Compare store_summary with the merged summary on a two-sheet workbook built from input data.
+
+    Parameters:
+    data (pd.DataFrame): Input data of the portfolio.
+    portfolio_type (str): Key of RESULT_ENGINES, e.g. 'domestic_corporate_credit'.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
+
+    Returns:
+    pd.DataFrame: One row per horizon and summary column with the number of mismatching cells,
+    NaN in one table only counted as a mismatch.
+    """
+    try:
+        pd_engine, lgd_engine, ead_type = RESULT_ENGINES[portfolio_type]
+    except KeyError:
+        raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+    if reference_data is None:
+        reference_data = get_reference_data()
+    overseas = portfolio_type.startswith('overseas')
+    portfolio = two_sheet_portfolio(data)
+    pd_results = pd_engine(portfolio.data, reference_data, 'decimal')
+    lgd_results = lgd_engine(portfolio.data, reference_data, 'decimal')
+    ead = compute_EAD(portfolio.data, ead_type)
+    store = ResultStore.from_results(portfolio.data, pd_results, lgd_results, ead)
+
+    report = []
+    for horizon in (OVERSEAS_SUMMARY_SCENARIOS if overseas else DOMESTIC_SUMMARY_SCENARIOS):
+        expected = merged_summary(portfolio, pd_results, lgd_results, ead, horizon, overseas)
+        actual = store_summary(portfolio.summary, store, horizon, overseas, portfolio.data.index)
+        for column in expected.columns.drop('客戶名'):
+            reference, candidate = expected[column].to_numpy(dtype=float), actual[column].to_numpy(dtype=float)
+            mismatches = ~np.isclose(reference, candidate, rtol=1e-12, atol=0, equal_nan=True)
+            report.append([horizon, column, int(mismatches.sum())])
+    return pd.DataFrame(report, columns=PARITY_COLUMNS)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the summary tables of a two-sheet workbook against the 客戶名 merge.")
+    parser.add_argument('file_path', help="Excel, Parquet or CSV file with the portfolio input data")
+    parser.add_argument('portfolio_type', choices=sorted(RESULT_ENGINES))
+    args = parser.parse_args()
+    report = check_two_sheet_summary(load_portfolio(args.file_path, args.portfolio_type).data, args.portfolio_type)
+    print(report.to_string(index=False))
+    print("TWO-SHEET PARITY OK" if report['mismatches'].sum() == 0 else "TWO-SHEET PARITY FAIL")
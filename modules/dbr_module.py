@@ -1,5 +1,5 @@
-from decimal import Decimal, getcontext
-getcontext().prec = 10
+from decimal import Decimal, localcontext
+from .numeric import DECIMAL_CONTEXT
 
 def calculate_dbr_value(consumer_unsecured_credit, annual_income):
     """
@@ -12,7 +12,8 @@ def calculate_dbr_value(consumer_unsecured_credit, annual_income):
     Returns:
     float: Debt Burden Ratio (DBR) or None if the calculation is not possible.
     """
-    dbr = float(Decimal(consumer_unsecured_credit) / (Decimal(annual_income)/12))
+    with localcontext(DECIMAL_CONTEXT):
+        dbr = float(Decimal(consumer_unsecured_credit) / (Decimal(annual_income)/12))
     if dbr is None:
         return None
     
@@ -0,0 +1,309 @@
+import os
+import pandas as pd
+
+# Name of the index holding the stable row id of every loaded input row
+ROW_ID = 'row_id'
+
+# Accepted input file extensions; Parquet and CSV files hold a single table with the workbook columns
+INPUT_EXTENSIONS = ('.xlsx', '.parquet', '.csv')
+# Input formats that can be read in row chunks
+STREAMABLE_EXTENSIONS = ('.parquet', '.csv')
+
+# Column dtypes. 客戶名 keeps the inferred dtype so its truthiness matches the row-wise code;
+# region and industry keys are categoricals, amounts and rates are float64
+TEXT = 'str'
+CATEGORY = 'category'
+AMOUNT = 'float64'
+
+_CORPORATE_PD_SCHEMA = {
+    '客戶名': None,
+    '登記縣市': CATEGORY,
+    '登記鄉鎮市區': CATEGORY,
+    '行業別': CATEGORY,
+    '全市場授信金額': AMOUNT,
+    '貸放額度': AMOUNT,
+    '營業淨額': AMOUNT,
+    '擔保品縣市': CATEGORY,
+    '擔保品鄉鎮市區': CATEGORY,
+    '擔保品價值': AMOUNT,
+}
+_OVERSEAS_SCHEMA = {
+    '客戶名': None,
+    '國家別': TEXT,
+    '行業別': CATEGORY,
+    'S&P信用評級': TEXT,
+    '授信金額': AMOUNT,
+    '擔保品價值': AMOUNT,
+    '是否有擔保品': TEXT,
+    '擔保品/無擔回收率(%)': AMOUNT,
+}
+_EXPOSURE_SCHEMA = {
+    '現貸餘額': AMOUNT,
+    '表外交易信用暴險相當額': AMOUNT,
+}
+
+# Columns read for each portfolio type: what its PD, LGD and EAD calculations use
+PORTFOLIO_SCHEMAS = {
+    # 國內企業授信
+    'domestic_corporate_credit': {
+        **_CORPORATE_PD_SCHEMA,
+        '授信金額': AMOUNT,
+        '是否有不動產擔保品': TEXT,
+        '擔保品/無擔回收率(%)': AMOUNT,
+        **_EXPOSURE_SCHEMA,
+    },
+    # 國內個人授信-房貸擔保品
+    'domestic_personal_mortgage': {
+        '客戶名': None,
+        '擔保品縣市': CATEGORY,
+        '擔保品鄉鎮市區': CATEGORY,
+        '擔保品價值': AMOUNT,
+        '貸放額度': AMOUNT,
+        '授信金額': AMOUNT,
+        '消金無擔保授信金額': AMOUNT,
+        '年收入': AMOUNT,
+        '現貸餘額': AMOUNT,
+    },
+    # 國內個人授信-其他擔保品
+    'domestic_personal_other': {
+        '客戶名': None,
+        '是否有擔保品': TEXT,
+        '擔保品價值': AMOUNT,
+        '授信金額': AMOUNT,
+        '擔保品/無擔回收率(%)': AMOUNT,
+        '消金無擔保授信金額': AMOUNT,
+        '年收入': AMOUNT,
+        '現貸餘額': AMOUNT,
+        '本行雙卡未動用之有效額度': AMOUNT,
+    },
+    # 國外授信
+    'overseas_credit': {**_OVERSEAS_SCHEMA, **_EXPOSURE_SCHEMA},
+    # 國內票債券投資
+    'domestic_investment': {
+        **_CORPORATE_PD_SCHEMA,
+        '授信金額': AMOUNT,
+        '是否有不動產擔保品': TEXT,
+        '是否有其他擔保品': TEXT,
+        '擔保品/無擔回收率(%)': AMOUNT,
+        **_EXPOSURE_SCHEMA,
+    },
+    # 國內股權投資: LGD is fixed, only PD and EAD read the data
+    'domestic_equity_investment': {**_CORPORATE_PD_SCHEMA, **_EXPOSURE_SCHEMA},
+    # 國外投資: its LGD reads the collateral columns under the names 擭保品價值, 擭保品/無擭回收率(%) and 是否有擭保品
+    'overseas_investment': {
+        **_OVERSEAS_SCHEMA,
+        '擭保品價值': AMOUNT,
+        '是否有擭保品': TEXT,
+        '擭保品/無擭回收率(%)': AMOUNT,
+        **_EXPOSURE_SCHEMA,
+    },
+}
+
+
+class LoadedPortfolio:
+    """
+    An input workbook parsed once and shared by the PD, LGD, EAD and summary stages.
+
+    Attributes:
+    file_path (str): Path the workbook was read from.
+    sheets (dict): Every sheet as a DataFrame, in workbook order.
+    data (pd.DataFrame): The first sheet, which the PD, LGD and EAD calculations read.
+    summary (pd.DataFrame): Every sheet concatenated, the rows of the summary tables.
+    """
+    def __init__(self, file_path, sheets):
+        """
+        Parameters:
+        file_path (str): Path the workbook was read from.
+        sheets (dict): Every sheet as a DataFrame, in workbook order.
+        """
+        self.file_path = file_path
+        self.sheets = sheets
+        frames = list(sheets.values())
+        self.data = frames[0]
+        self.summary = with_row_id(pd.concat(frames, ignore_index=True))
+
+
+def with_row_id(data):
+    """
+    Label the rows of an input frame with their position, the stable row id carried through
+    to the result entries of the column-wise engines.
+
+    Parameters:
+    data (pd.DataFrame): Input data.
+
+    Returns:
+    pd.DataFrame: The same rows indexed by ROW_ID.
+    """
+    data.index = pd.RangeIndex(len(data), name=ROW_ID)
+    return data
+
+def is_input_file(filename, suffix=''):
+    """
+    Check whether a file is an input file of a portfolio.
+
+    Parameters:
+    filename (str): File name.
+    suffix (str): End of the file name without the extension, e.g. '國內企業授信'.
+
+    Returns:
+    bool: True for files in a format of INPUT_EXTENSIONS whose name ends with the suffix.
+    """
+    stem, extension = os.path.splitext(filename)
+    return extension.lower() in INPUT_EXTENSIONS and stem.endswith(suffix)
+
+def _read_parquet(file_path, schema):
+    """
+    Read the schema columns of a Parquet file.
+
+    Parameters:
+    file_path (str): Path to the Parquet file.
+    schema (dict): Column dtypes, or None to read every column.
+
+    Returns:
+    pd.DataFrame: The table.
+    """
+    if schema is None:
+        return pd.read_parquet(file_path)
+    import pyarrow.parquet
+
+    available = pyarrow.parquet.read_schema(file_path).names
+    data = pd.read_parquet(file_path, columns=[column for column in available if column in schema])
+    return data.astype({column: schema[column] for column in data.columns if schema[column] is not None})
+
+def read_sheets(file_path, portfolio_type=None, sheet_name=None, engine=None):
+    """
+    Read sheets of an input file, keeping only the columns of the portfolio schema.
+
+    Parameters:
+    file_path (str): Path to the Excel, Parquet or CSV file containing input data.
+    portfolio_type (str): Key of PORTFOLIO_SCHEMAS, or None to read every column with inferred dtypes.
+    sheet_name (str or int or None): Sheet to read, or None for every sheet. Parquet and CSV
+        files have a single sheet named after the file.
+    engine (str): pandas Excel engine, e.g. 'calamine' when python-calamine is installed.
+        Defaults to openpyxl.
+
+    Returns:
+    pd.DataFrame or dict: The sheet, or every sheet by name when sheet_name is None.
+    Schema columns missing from a sheet are left out.
+    """
+    schema = None
+    if portfolio_type is not None:
+        try:
+            schema = PORTFOLIO_SCHEMAS[portfolio_type]
+        except KeyError:
+            raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+    options = {}
+    if schema is not None:
+        options = {
+            'usecols': lambda column: column in schema,
+            'dtype': {column: dtype for column, dtype in schema.items() if dtype is not None},
+        }
+
+    stem, extension = os.path.splitext(file_path)
+    extension = extension.lower()
+    if extension == '.parquet':
+        data = _read_parquet(file_path, schema)
+    elif extension == '.csv':
+        data = pd.read_csv(file_path, **options)
+    else:
+        return pd.read_excel(file_path, sheet_name=sheet_name, engine=engine, **options)
+    return {os.path.basename(stem): data} if sheet_name is None else data
+
+def load_portfolio(file_path, portfolio_type=None, engine=None):
+    """
+    Parse an input workbook once.
+
+    Parameters:
+    file_path (str): Path to the Excel, Parquet or CSV file containing input data.
+    portfolio_type (str): Key of PORTFOLIO_SCHEMAS; only its columns are read, with their
+        declared dtypes. None reads every column.
+    engine (str): pandas Excel engine, e.g. 'calamine'. Defaults to openpyxl.
+
+    Returns:
+    LoadedPortfolio: The parsed sheets, each indexed by ROW_ID.
+    """
+    sheets = read_sheets(file_path, portfolio_type, engine=engine)
+    return LoadedPortfolio(file_path, {name: with_row_id(frame) for name, frame in sheets.items()})
+
+def frame_portfolio(data, portfolio_type=None):
+    """
+    Wrap an in-memory input table as a portfolio, conformed to the schema like a loaded file.
+
+    Parameters:
+    data (pd.DataFrame): Input data with the workbook columns; it is not modified.
+    portfolio_type (str): Key of PORTFOLIO_SCHEMAS; only its columns are kept, cast to their
+        declared dtypes. None keeps every column as given.
+
+    Returns:
+    LoadedPortfolio: The table as its single sheet, indexed by ROW_ID, with file_path None.
+    """
+    if portfolio_type is None:
+        data = data.copy()
+    else:
+        try:
+            schema = PORTFOLIO_SCHEMAS[portfolio_type]
+        except KeyError:
+            raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+        data = data[[column for column in data.columns if column in schema]]
+        data = data.astype({column: schema[column] for column in data.columns if schema[column] is not None})
+    return LoadedPortfolio(None, {'data': with_row_id(data)})
+
+def read_input(source, portfolio_type=None):
+    """
+    Get the input data of a calculation from a file path or from data already loaded.
+
+    Parameters:
+    source (str or pd.DataFrame or LoadedPortfolio): Path to the Excel, Parquet or CSV file containing input data,
+        or the portfolio already parsed by load_portfolio.
+    portfolio_type (str): Key of PORTFOLIO_SCHEMAS used when reading from a path.
+
+    Returns:
+    pd.DataFrame: The input data.
+    """
+    if isinstance(source, LoadedPortfolio):
+        return source.data
+    if isinstance(source, pd.DataFrame):
+        return source
+    return with_row_id(read_sheets(source, portfolio_type, sheet_name=0))
+
+def read_chunks(file_path, portfolio_type, chunk_size, columns=None):
+    """
+    Read a CSV or Parquet input file in chunks of rows, keeping only the columns of the portfolio schema.
+
+    Parameters:
+    file_path (str): Path to the Parquet or CSV file containing input data.
+    portfolio_type (str): Key of PORTFOLIO_SCHEMAS.
+    chunk_size (int): Number of rows per chunk.
+    columns (iterable): Schema columns to read, or None for the whole schema.
+
+    Yields:
+    pd.DataFrame: Consecutive chunks, indexed by their ROW_ID in the whole file.
+    """
+    try:
+        schema = PORTFOLIO_SCHEMAS[portfolio_type]
+    except KeyError:
+        raise ValueError(f"Unknown portfolio type: {portfolio_type}") from None
+    if columns is not None:
+        schema = {column: schema[column] for column in columns}
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in STREAMABLE_EXTENSIONS:
+        raise ValueError(f"Only {', '.join(STREAMABLE_EXTENSIONS)} files can be read in chunks: {file_path}")
+
+    if extension == '.csv':
+        dtypes = {column: dtype for column, dtype in schema.items() if dtype is not None}
+        chunks = pd.read_csv(file_path, usecols=lambda column: column in schema, dtype=dtypes, chunksize=chunk_size)
+    else:
+        import pyarrow.parquet
+
+        parquet_file = pyarrow.parquet.ParquetFile(file_path)
+        columns = [column for column in parquet_file.schema_arrow.names if column in schema]
+        chunks = (
+            batch.to_pandas().astype({column: schema[column] for column in columns if schema[column] is not None})
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns)
+        )
+
+    start = 0
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(start, start + len(chunk), name=ROW_ID)
+        start += len(chunk)
+        yield chunk
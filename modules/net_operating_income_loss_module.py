@@ -1,34 +1,26 @@
-import json
-from decimal import Decimal, getcontext
-
-getcontext().prec = 10
+from decimal import Decimal, localcontext
+from .numeric import DECIMAL_CONTEXT
+from .reference_data import get_reference_data
 
 class NetOperatingIncomeLossCalculator:
     """
     A class to calculate stressed net operating income under different scenarios.
     """
 
-    def __init__(self, industry_level_data_path, transition_risk_level_data_path, revenue_loss_level_data_path, physical_risk_level_data_path):
+    def __init__(self, reference_data=None):
         """
-        Initialize the calculator with paths to JSON data files.
+        Initialize the calculator from the shared reference data.
 
         Parameters:
-        industry_level_data_path (str): Path to the JSON file containing industry level data.
-        transition_risk_level_data_path (str): Path to the JSON file containing transition risk level data.
-        revenue_loss_level_data_path (str): Path to the JSON file containing revenue loss level data.
-        physical_risk_level_data_path (str): Path to the JSON file containing physical risk level data.
+        reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
         """
-        with open(industry_level_data_path, 'r', encoding='utf-8') as file:
-            self.industry_level_data = json.load(file)
-
-        with open(transition_risk_level_data_path, 'r', encoding='utf-8') as file:
-            self.transition_risk_level_data = json.load(file)
-
-        with open(revenue_loss_level_data_path, 'r', encoding='utf-8') as file:
-            self.revenue_loss_level_data = json.load(file)
-
-        with open(physical_risk_level_data_path, 'r', encoding='utf-8') as file:
-            self.physical_risk_level_data = json.load(file)
+        if reference_data is None:
+            reference_data = get_reference_data()
+        self.industry_level_data = reference_data.industry_classification
+        self.transition_risk_level_data = reference_data.industry_impact_percentages
+        self.revenue_loss_level_data = reference_data.revenue_region_levels
+        self.physical_risk_level_data = reference_data.revenue_loss_percentages
+        self.revenue_region_table = reference_data.revenue_region_table
 
     def find_parameters(self, industry):
         """
@@ -57,13 +49,7 @@ class NetOperatingIncomeLossCalculator:
         Returns:
         dict: The matching record from the dataset.
         """
-        from .common import standardize_city_name
-        county = standardize_city_name(county)
-        township = standardize_city_name(township)
-        for record in self.revenue_loss_level_data:
-            if record["縣市"] == county and record["鄉鎮市區"] == township:
-                return record
-        return None
+        return self.revenue_region_table.find_record(county, township)
 
     def get_company_risk_levels_and_impacts(self, industry, city, district):
         """
@@ -91,15 +77,9 @@ class NetOperatingIncomeLossCalculator:
             company["Transition Impact Percentages"] = None
 
         # Find physical risk levels
-        region_info = self.find_region_risk_level(city, district)
-        if region_info:
-            company["Physical Impact Percentages"] = {}
-            for scenario, risk_level in region_info.items():
-                if scenario in self.physical_risk_level_data[0]:
-                    for impact in self.physical_risk_level_data:
-                        if impact["風險等級"] == risk_level:
-                            company["Physical Impact Percentages"][scenario] = impact[scenario]
-                            break
+        region_id = self.revenue_region_table.lookup(city, district)
+        if region_id is not None:
+            company["Physical Impact Percentages"] = self.revenue_region_table.loss_percentages_for_region(region_id)
         else:
             company["Physical Impact Percentages"] = None
 
@@ -116,6 +96,7 @@ class NetOperatingIncomeLossCalculator:
         for scenario in scenarios:
             transition_impact = company["Transition Impact Percentages"].get(scenario, 0) if company["Transition Impact Percentages"] else 0
             physical_impact = company["Physical Impact Percentages"].get(scenario, 0) if company["Physical Impact Percentages"] else 0
-            company["Total Impact Percentages"][scenario] = float(Decimal(transition_impact) + Decimal(physical_impact))
+            with localcontext(DECIMAL_CONTEXT):
+                company["Total Impact Percentages"][scenario] = float(Decimal(transition_impact) + Decimal(physical_impact))
 
         return company["Total Impact Percentages"]
\ No newline at end of file
@@ -0,0 +1,191 @@
+import math
+import operator
+from decimal import Context, Decimal, localcontext
+import numpy as np
+
+# Significant digits of the Decimal context used by the scalar calculation modules
+DECIMAL_PRECISION = 10
+DECIMAL_CONTEXT = Context(prec=DECIMAL_PRECISION)
+
+# Numeric backends of the column-wise engines: 'decimal' reproduces the scalar Decimal
+# modules exactly, 'float64' uses plain float64 arithmetic
+NUMERIC_BACKENDS = ('decimal', 'float64')
+
+# Relative error budget of one float64 operation on values already rounded to decimals
+TIE_TOLERANCE = 64 * np.finfo(float).eps
+
+def round_significant(values, digits=DECIMAL_PRECISION, return_ties=False):
+    """
+    Round values to a number of significant digits, the way each operation of a
+    Decimal context with that precision rounds its result (half to even).
+
+    Parameters:
+    values (array-like): Values to round.
+    digits (int): Significant digits to keep.
+    return_ties (bool): Also return which values are too close to a rounding tie for
+        float64 to decide the way exact decimal arithmetic would.
+
+    Returns:
+    np.ndarray: Rounded values; zeros, NaN and infinities are returned unchanged.
+    With return_ties, a tuple of the rounded values and the near-tie mask.
+    """
+    values = np.asarray(values, dtype=float)
+    magnitude = np.abs(values)
+    finite = np.isfinite(values) & (magnitude > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exponent = np.floor(np.log10(np.where(finite, magnitude, 1.0)))
+    # log10 can land on the wrong side of an exact power of ten
+    exponent = np.where(magnitude >= 10.0 ** (exponent + 1), exponent + 1, exponent)
+    exponent = np.where(magnitude < 10.0 ** exponent, exponent - 1, exponent)
+
+    shift = digits - 1 - exponent
+    up = 10.0 ** np.clip(shift, 0, None)
+    down = 10.0 ** np.clip(-shift, 0, None)
+    with np.errstate(over='ignore', invalid='ignore'):
+        scaled = np.where(shift >= 0, values * up, values / down)
+        rounded = np.where(shift >= 0, np.round(scaled) / up, np.round(scaled) * down)
+        rounded = np.where(finite, rounded, values)
+    if not return_ties:
+        return rounded
+
+    with np.errstate(invalid='ignore'):
+        fraction = np.abs(scaled - np.floor(scaled) - 0.5)
+        near_tie = finite & (fraction <= TIE_TOLERANCE * np.abs(scaled))
+    return rounded, near_tie
+
+class DecimalValues:
+    """
+    Result of an emulated Decimal operation.
+
+    Attributes:
+    values (np.ndarray): The nearest float64 to each decimal result, i.e. what float() of the
+        Decimal would return.
+    """
+    def __init__(self, values):
+        self.values = values
+
+class DecimalEmulator:
+    """
+    Emulates the arithmetic of a Decimal context on float64 columns.
+
+    Operands are plain arrays, standing for Decimal(float) of each value, or DecimalValues
+    returned by an earlier operation, standing for the exact decimal results. Each operation is
+    computed in float64 and rounded to the context precision; the few elements whose result is
+    within float64 error of a rounding tie are recomputed with Decimal, so results match the
+    scalar Decimal code exactly.
+
+    Attributes:
+    digits (int): Significant digits of the emulated context.
+    exp (callable): Elementwise exponential matching math.exp.
+    """
+    def __init__(self, digits=DECIMAL_PRECISION):
+        """
+        Parameters:
+        digits (int): Significant digits of the emulated context.
+        """
+        self.digits = digits
+        self.exp = exact_exp
+
+    def add(self, a, b):
+        return self._apply(operator.add, a, b)
+
+    def subtract(self, a, b):
+        return self._apply(operator.sub, a, b)
+
+    def multiply(self, a, b):
+        return self._apply(operator.mul, a, b)
+
+    def divide(self, a, b):
+        return self._apply(operator.truediv, a, b)
+
+    def _operand(self, value):
+        return value.values if isinstance(value, DecimalValues) else np.asarray(value, dtype=float)
+
+    def _to_decimal(self, operand, value):
+        if isinstance(operand, DecimalValues):
+            return Decimal(f"{value:.{self.digits - 1}e}")
+        return Decimal(float(value))
+
+    def _apply(self, operation, a, b):
+        """
+        Apply one operation the way the Decimal context would.
+
+        Parameters:
+        operation (callable): Binary operator working on both arrays and Decimal.
+        a: Left operand, an array, scalar or DecimalValues.
+        b: Right operand, an array, scalar or DecimalValues.
+
+        Returns:
+        DecimalValues: The rounded result.
+        """
+        a_values, b_values = self._operand(a), self._operand(b)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            result = operation(a_values, b_values)
+        rounded, near_tie = round_significant(result, self.digits, return_ties=True)
+        if near_tie.any():
+            a_values, b_values = np.broadcast_arrays(a_values, b_values)
+            with localcontext() as context:
+                context.prec = self.digits
+                for index in zip(*np.nonzero(near_tie)):
+                    exact = operation(self._to_decimal(a, a_values[index]), self._to_decimal(b, b_values[index]))
+                    rounded[index] = float(exact)
+        return DecimalValues(rounded)
+
+def exact_exp(values):
+    """
+    Apply math.exp elementwise so results match the scalar calculation modules bit for bit.
+
+    Parameters:
+    values (array-like): Exponents.
+
+    Returns:
+    np.ndarray: exp of each value.
+    """
+    values = np.asarray(values, dtype=float)
+    return np.fromiter(map(math.exp, values.ravel().tolist()), dtype=float, count=values.size).reshape(values.shape)
+
+class Float64Arithmetic:
+    """
+    Plain float64 arithmetic with the interface of DecimalEmulator.
+
+    Results are not rounded to a Decimal precision, so they can differ from the scalar Decimal
+    modules in the last digits; use backend_equivalence to measure the deviation on a portfolio.
+
+    Attributes:
+    exp (callable): Vectorized exponential.
+    """
+    exp = staticmethod(np.exp)
+
+    def add(self, a, b):
+        return self._apply(operator.add, a, b)
+
+    def subtract(self, a, b):
+        return self._apply(operator.sub, a, b)
+
+    def multiply(self, a, b):
+        return self._apply(operator.mul, a, b)
+
+    def divide(self, a, b):
+        return self._apply(operator.truediv, a, b)
+
+    def _apply(self, operation, a, b):
+        a_values = a.values if isinstance(a, DecimalValues) else np.asarray(a, dtype=float)
+        b_values = b.values if isinstance(b, DecimalValues) else np.asarray(b, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return DecimalValues(operation(a_values, b_values))
+
+def get_arithmetic(backend='decimal'):
+    """
+    Get the arithmetic of a numeric backend.
+
+    Parameters:
+    backend (str): One of NUMERIC_BACKENDS.
+
+    Returns:
+    DecimalEmulator or Float64Arithmetic: Arithmetic with add, subtract, multiply, divide and exp.
+    """
+    if backend == 'decimal':
+        return DecimalEmulator()
+    if backend == 'float64':
+        return Float64Arithmetic()
+    raise ValueError(f"Unknown numeric backend: {backend}")
@@ -0,0 +1,244 @@
+import numpy as np
+from .common import SCENARIOS
+
+class CorporatePDCube:
+    """
+    The domestic corporate PD conversion table materialized as dense NumPy arrays.
+
+    Cells are indexed by sector × scenario × 營授比 bucket × 十足擔保比率 bucket, where the
+    buckets are positions in the compiled range tables of that sector and scenario. A cell holds
+    either a fixed PD or the (para_a, para_b) pair of the exponential branch, in which case the
+    PD is ``para_a * exp(para_b * 營授比)``.
+
+    Attributes:
+    sectors (tuple): Sector names along the first axis.
+    scenarios (tuple): Scenario names along the second axis.
+    ranges (dict): RangeTree by (sector, scenario), used to resolve buckets.
+    fixed_pd (np.ndarray): Fixed PD per cell, NaN for exponential or empty cells.
+    para_a (np.ndarray): para_a per cell, NaN unless exponential.
+    para_b (np.ndarray): para_b per cell, NaN unless exponential.
+    is_exponential (np.ndarray): Whether the cell uses the exponential branch.
+    has_value (np.ndarray): Whether the cell holds a PD; falsy table values count as empty, as in the loader.
+    """
+    def __init__(self, pd_corp_data, ranges, scenarios=SCENARIOS):
+        """
+        Materialize the cube.
+
+        Parameters:
+        pd_corp_data (dict): Loaded Domestic_Corporate_Credit table.
+        ranges (dict): Compiled RangeTree by (sector, scenario) for the same table.
+        scenarios (tuple): Scenario order of the second axis.
+        """
+        self.sectors = tuple(pd_corp_data.keys())
+        self.scenarios = tuple(scenarios)
+        self.ranges = ranges
+        self.sector_ids = {sector: index for index, sector in enumerate(self.sectors)}
+        self.scenario_ids = {scenario: index for index, scenario in enumerate(self.scenarios)}
+
+        trees = [ranges.get((sector, scenario)) for sector in self.sectors for scenario in self.scenarios]
+        ratio_buckets = max([len(tree.children) for tree in trees if tree is not None] + [1])
+        collateral_buckets = max([len(child.children) for tree in trees if tree is not None for child in tree.children] + [1])
+
+        shape = (len(self.sectors), len(self.scenarios), ratio_buckets, collateral_buckets)
+        self.fixed_pd = np.full(shape, np.nan)
+        self.para_a = np.full(shape, np.nan)
+        self.para_b = np.full(shape, np.nan)
+        self.is_exponential = np.zeros(shape, dtype=bool)
+        self.has_value = np.zeros(shape, dtype=bool)
+
+        for sector_id, sector in enumerate(self.sectors):
+            for scenario_id, scenario in enumerate(self.scenarios):
+                tree = ranges.get((sector, scenario))
+                if tree is None:
+                    continue
+                for ratio_bucket, collateral_tree in enumerate(tree.children):
+                    for collateral_bucket, value in enumerate(collateral_tree.children):
+                        cell = (sector_id, scenario_id, ratio_bucket, collateral_bucket)
+                        self.has_value[cell] = bool(value)
+                        if isinstance(value, dict):
+                            self.is_exponential[cell] = True
+                            self.para_a[cell] = value["para_a"]
+                            self.para_b[cell] = value["para_b"]
+                        elif value is not None:
+                            self.fixed_pd[cell] = value
+
+    def encode_sectors(self, sectors):
+        """
+        Convert sector names to indexes along the first axis.
+
+        Parameters:
+        sectors (array-like): Sector names; unknown sectors and None map to -1.
+
+        Returns:
+        np.ndarray: Sector indexes.
+        """
+        sector_ids = self.sector_ids
+        return np.fromiter((sector_ids.get(sector, -1) for sector in sectors), dtype=np.int64, count=len(sectors))
+
+    def resolve_buckets(self, sector_ids, scenario_id, ratios, collateral_ratios):
+        """
+        Resolve the 營授比 and 十足擔保比率 buckets of whole columns for one scenario.
+
+        The search follows the RangeTree semantics: when no collateral range matches inside
+        the first matching ratio range, the next matching ratio range is tried.
+
+        Parameters:
+        sector_ids (np.ndarray): Sector indexes from encode_sectors.
+        scenario_id (int): Scenario index along the second axis.
+        ratios (np.ndarray): 營授比 values; NaN never matches.
+        collateral_ratios (np.ndarray): 十足擔保比率 values; NaN never matches.
+
+        Returns:
+        tuple: (ratio_buckets, collateral_buckets) arrays, -1 where no cell matches.
+        """
+        sector_ids = np.asarray(sector_ids, dtype=np.int64)
+        ratios = np.asarray(ratios, dtype=float)
+        collateral_ratios = np.asarray(collateral_ratios, dtype=float)
+        ratio_buckets = np.full(len(sector_ids), -1, dtype=np.int64)
+        collateral_buckets = np.full(len(sector_ids), -1, dtype=np.int64)
+        scenario = self.scenarios[scenario_id]
+
+        for sector_id in np.unique(sector_ids[sector_ids >= 0]):
+            tree = self.ranges.get((self.sectors[sector_id], scenario))
+            if tree is None:
+                continue
+            rows = np.flatnonzero(sector_ids == sector_id)
+            for rank in range(tree.table.segment_buckets.shape[1]):
+                if rows.size == 0:
+                    break
+                candidate = tree.table.buckets(ratios[rows], rank=rank)
+                for ratio_bucket in np.unique(candidate[candidate >= 0]):
+                    selected = rows[candidate == ratio_bucket]
+                    found = tree.children[ratio_bucket].table.buckets(collateral_ratios[selected])
+                    matched = found >= 0
+                    ratio_buckets[selected[matched]] = ratio_bucket
+                    collateral_buckets[selected[matched]] = found[matched]
+                # Only rows still unresolved with another matching ratio range move on
+                rows = rows[(ratio_buckets[rows] < 0) & (candidate >= 0)]
+
+        return ratio_buckets, collateral_buckets
+
+    def pd_values(self, sector_ids, scenario_id, ratios, collateral_ratios, exp=np.exp):
+        """
+        Compute PDs of whole columns for one scenario.
+
+        Parameters:
+        sector_ids (np.ndarray): Sector indexes from encode_sectors.
+        scenario_id (int): Scenario index along the second axis.
+        ratios (np.ndarray): 營授比 values.
+        collateral_ratios (np.ndarray): 十足擔保比率 values.
+        exp (callable): Elementwise exponential used for the exponential cells.
+
+        Returns:
+        tuple: (pd, has_value) arrays; pd is NaN where has_value is False.
+        """
+        sector_ids = np.asarray(sector_ids, dtype=np.int64)
+        ratios = np.asarray(ratios, dtype=float)
+        ratio_buckets, collateral_buckets = self.resolve_buckets(sector_ids, scenario_id, ratios, collateral_ratios)
+        found = ratio_buckets >= 0
+        cell = (np.where(found, sector_ids, 0), scenario_id, np.where(found, ratio_buckets, 0), np.where(found, collateral_buckets, 0))
+
+        has_value = found & self.has_value[cell]
+        exponential = has_value & self.is_exponential[cell]
+        pd_values = np.where(has_value, self.fixed_pd[cell], np.nan)
+        if exponential.any():
+            with np.errstate(over='ignore', invalid='ignore'):
+                pd_values[exponential] = self.para_a[cell][exponential] * exp(self.para_b[cell][exponential] * ratios[exponential])
+        return pd_values, has_value
+
+    def pd_matrix(self, sector_ids, ratios, collateral_ratios, exp=np.exp):
+        """
+        Compute PDs of whole columns for every scenario.
+
+        Parameters:
+        sector_ids (np.ndarray): Sector indexes from encode_sectors.
+        ratios (np.ndarray): 營授比 values, one column per scenario.
+        collateral_ratios (np.ndarray): 十足擔保比率 values, one column per scenario.
+        exp (callable): Elementwise exponential used for the exponential cells.
+
+        Returns:
+        tuple: (pd, has_value) matrices with one column per scenario.
+        """
+        ratios = np.asarray(ratios, dtype=float)
+        collateral_ratios = np.asarray(collateral_ratios, dtype=float)
+        pd_values = np.full(ratios.shape, np.nan)
+        has_value = np.zeros(ratios.shape, dtype=bool)
+        for scenario_id in range(len(self.scenarios)):
+            pd_values[:, scenario_id], has_value[:, scenario_id] = self.pd_values(
+                sector_ids, scenario_id, ratios[:, scenario_id], collateral_ratios[:, scenario_id], exp=exp
+            )
+        return pd_values, has_value
+
+class PDRangeTable:
+    """
+    A compiled PD range tree whose leaves are materialized as parameter arrays.
+
+    Leaves are either a fixed PD or the (para_a, para_b) pair of the exponential branch,
+    in which case the PD is ``para_a * exp(para_b * x)`` for the outermost range value x.
+
+    Attributes:
+    tree (RangeTree): The compiled range tree.
+    fixed_pd (np.ndarray): Fixed PD per leaf, NaN for exponential or empty leaves.
+    para_a (np.ndarray): para_a per leaf, NaN unless exponential.
+    para_b (np.ndarray): para_b per leaf, NaN unless exponential.
+    is_exponential (np.ndarray): Whether the leaf uses the exponential branch.
+    has_value (np.ndarray): Whether the leaf holds a PD; falsy table values count as empty, as in the loader.
+    """
+    def __init__(self, tree):
+        """
+        Materialize the leaves of a range tree.
+
+        Parameters:
+        tree (RangeTree): Compiled range tree of one PD table section.
+        """
+        self.tree = tree
+        leaves = tree.leaves
+        self.fixed_pd = np.full(len(leaves), np.nan)
+        self.para_a = np.full(len(leaves), np.nan)
+        self.para_b = np.full(len(leaves), np.nan)
+        self.is_exponential = np.zeros(len(leaves), dtype=bool)
+        self.has_value = np.zeros(len(leaves), dtype=bool)
+        for leaf_id, value in enumerate(leaves):
+            self.has_value[leaf_id] = bool(value)
+            if isinstance(value, dict):
+                self.is_exponential[leaf_id] = True
+                self.para_a[leaf_id] = value["para_a"]
+                self.para_b[leaf_id] = value["para_b"]
+            elif value is not None:
+                self.fixed_pd[leaf_id] = value
+
+    def pd_values(self, *columns, exp=np.exp):
+        """
+        Compute PDs for whole columns.
+
+        Parameters:
+        *columns (np.ndarray): One column of values per range level, outermost first.
+        exp (callable): Elementwise exponential used for the exponential leaves.
+
+        Returns:
+        tuple: (pd, has_value) arrays; pd is NaN where has_value is False.
+        """
+        leaf_ids = self.tree.leaf_ids(*columns)
+        found = leaf_ids >= 0
+        leaf = np.where(found, leaf_ids, 0)
+        has_value = found & self.has_value[leaf]
+        exponential = has_value & self.is_exponential[leaf]
+
+        pd_values = np.where(has_value, self.fixed_pd[leaf], np.nan)
+        if exponential.any():
+            x = np.asarray(columns[0], dtype=float)[exponential]
+            with np.errstate(over='ignore', invalid='ignore'):
+                pd_values[exponential] = self.para_a[leaf][exponential] * exp(self.para_b[leaf][exponential] * x)
+        return pd_values, has_value
+
+def compile_pd_tables(ranges):
+    """
+    Wrap every compiled range tree of a PD table in a PDRangeTable.
+
+    Parameters:
+    ranges (dict): RangeTree by key, from compile_range_tables.
+
+    Returns:
+    dict: PDRangeTable by the same keys.
+    """
+    return {key: PDRangeTable(tree) for key, tree in ranges.items()}
@@ -0,0 +1,342 @@
+import math
+from bisect import bisect_left, bisect_right
+import numpy as np
+
+def parse_range(range_str):
+    """
+    Parse a range string from the PD conversion tables into its alternatives.
+
+    Supported forms are "None", ">=x", ">x", "<=x", "<x", "=x", a bare number and
+    alternatives joined by " or ", e.g. ">5.5 or None".
+
+    Parameters:
+    range_str (str): The range string.
+
+    Returns:
+    tuple: (operator, bound) pairs; "None" parses to ("None", None).
+    """
+    conditions = []
+    for part in str(range_str).split(" or "):
+        part = part.strip()
+        if part == "None":
+            conditions.append(("None", None))
+            continue
+        for operator in (">=", "<=", ">", "<", "="):
+            if part.startswith(operator):
+                conditions.append((operator, float(part[len(operator):])))
+                break
+        else:
+            conditions.append(("=", float(part)))
+    return tuple(conditions)
+
+def range_key(range_str):
+    """
+    Generate the sorting key deciding the first-match order of a range string.
+
+    Ranges are tried from the highest key down: None alternatives first, then lower
+    bounds from the largest, then upper bounds from the smallest.
+
+    Parameters:
+    range_str (str): The range string.
+
+    Returns:
+    float: Sorting key.
+    """
+    keys = []
+    for operator, bound in parse_range(range_str):
+        if operator == "None":
+            keys.append(float('inf'))
+        elif operator in ("<", "<="):
+            keys.append(-bound)
+        else:
+            keys.append(bound)
+    return max(keys)
+
+def _matches(conditions, value):
+    """
+    Check a parsed range against a value.
+
+    Parameters:
+    conditions (tuple): Parsed range from parse_range.
+    value (float): The value to check, or None.
+
+    Returns:
+    bool: Whether the value falls within the range.
+    """
+    for operator, bound in conditions:
+        if operator == "None":
+            if value is None:
+                return True
+        elif value is None:
+            continue
+        elif operator == ">=" and value >= bound:
+            return True
+        elif operator == ">" and value > bound:
+            return True
+        elif operator == "<=" and value <= bound:
+            return True
+        elif operator == "<" and value < bound:
+            return True
+        elif operator == "=" and value == bound:
+            return True
+    return False
+
+class CompiledRangeTable:
+    """
+    A set of range strings compiled into sorted breakpoints for first-match lookups.
+
+    The breakpoints split the real line into segments: the open interval below the first
+    breakpoint, each breakpoint itself, each open interval between breakpoints and the open
+    interval above the last one. Each segment records the buckets (indexes into labels) whose
+    range covers it, in first-match order, so a lookup is a bisect or ``np.searchsorted``
+    followed by an array read.
+
+    Attributes:
+    labels (tuple): Range strings in first-match order.
+    breakpoints (np.ndarray): Sorted distinct range bounds.
+    segment_buckets (np.ndarray): Matching buckets per segment, padded with -1.
+    none_bucket (int): Bucket matching None, or -1.
+    intervals (tuple): (lower, lower_inclusive, upper, upper_inclusive, label) for each first match.
+    """
+    def __init__(self, range_strings):
+        """
+        Compile the range strings.
+
+        Parameters:
+        range_strings (iterable): Range strings, e.g. the keys of one level of a PD table.
+        """
+        self.labels = tuple(sorted(range_strings, key=range_key, reverse=True))
+        conditions = [parse_range(label) for label in self.labels]
+
+        bounds = sorted({bound for parsed in conditions for operator, bound in parsed if operator != "None"})
+        self.breakpoints = np.array(bounds, dtype=float)
+        self._breakpoints = bounds
+
+        # One representative value per segment: below, at and between the breakpoints
+        representatives = []
+        for position, bound in enumerate(bounds):
+            representatives.append((bounds[position - 1] + bound) / 2 if position else bound - 1.0)
+            representatives.append(bound)
+        representatives.append(bounds[-1] + 1.0 if bounds else 0.0)
+
+        segment_matches = [
+            [bucket for bucket, parsed in enumerate(conditions) if _matches(parsed, value)]
+            for value in representatives
+        ]
+        width = max([len(matches) for matches in segment_matches] + [1])
+        self.segment_buckets = np.full((len(representatives), width), -1, dtype=np.int64)
+        for segment, matches in enumerate(segment_matches):
+            self.segment_buckets[segment, :len(matches)] = matches
+        self._segment_matches = [tuple(matches) for matches in segment_matches]
+
+        none_matches = tuple(bucket for bucket, parsed in enumerate(conditions) if _matches(parsed, None))
+        self.none_bucket = none_matches[0] if none_matches else -1
+        self._none_matches = none_matches
+
+        self.intervals = self._build_intervals()
+
+    def _build_intervals(self):
+        """
+        Merge adjacent segments with the same first match into explicit intervals.
+
+        Returns:
+        tuple: (lower, lower_inclusive, upper, upper_inclusive, label) entries, ascending.
+        """
+        edges = []
+        lower = -math.inf
+        for bound in self._breakpoints:
+            edges.append(((lower, False), (bound, False)))
+            edges.append(((bound, True), (bound, True)))
+            lower = bound
+        edges.append(((lower, False), (math.inf, False)))
+
+        intervals = []
+        for segment, (lower, upper) in enumerate(edges):
+            bucket = int(self.segment_buckets[segment, 0])
+            if bucket < 0:
+                continue
+            label = self.labels[bucket]
+            if intervals and intervals[-1][4] == label and intervals[-1][2] == lower[0]:
+                start, start_inclusive = intervals[-1][0], intervals[-1][1]
+                intervals[-1] = (start, start_inclusive, upper[0], upper[1], label)
+            else:
+                intervals.append((lower[0], lower[1], upper[0], upper[1], label))
+        return tuple(intervals)
+
+    def _segment(self, value):
+        return bisect_left(self._breakpoints, value) + bisect_right(self._breakpoints, value)
+
+    def matching_buckets(self, value):
+        """
+        Get every bucket matching a value, in first-match order.
+
+        Parameters:
+        value (float): The value to look up, or None.
+
+        Returns:
+        tuple: Matching bucket indexes.
+        """
+        if value is None:
+            return self._none_matches
+        if isinstance(value, dict) or value != value:
+            return ()
+        return self._segment_matches[self._segment(value)]
+
+    def bucket(self, value):
+        """
+        Get the first bucket matching a value.
+
+        Parameters:
+        value (float): The value to look up, or None.
+
+        Returns:
+        int: The bucket index, or -1 if no range matches.
+        """
+        matches = self.matching_buckets(value)
+        return matches[0] if matches else -1
+
+    def lookup(self, value):
+        """
+        Get the first range string matching a value.
+
+        Parameters:
+        value (float): The value to look up, or None.
+
+        Returns:
+        str: The matching range string, or None if no range matches.
+        """
+        bucket = self.bucket(value)
+        return self.labels[bucket] if bucket >= 0 else None
+
+    def buckets(self, values, none_mask=None, rank=0):
+        """
+        Get the matching bucket for a whole column of values.
+
+        Parameters:
+        values (array-like): Values to look up. NaN never matches.
+        none_mask (array-like): Optional boolean mask of values to treat as None.
+        rank (int): Which match to return; 0 is the first match.
+
+        Returns:
+        np.ndarray: Bucket indexes, -1 where no range matches.
+        """
+        values = np.asarray(values, dtype=float)
+        result = np.full(values.shape, -1, dtype=np.int64)
+        if rank < self.segment_buckets.shape[1]:
+            segments = np.searchsorted(self.breakpoints, values, side='left') + np.searchsorted(self.breakpoints, values, side='right')
+            result = self.segment_buckets[segments, rank]
+            result[np.isnan(values)] = -1
+        if none_mask is not None:
+            none_mask = np.asarray(none_mask, dtype=bool)
+            result[none_mask] = self._none_matches[rank] if rank < len(self._none_matches) else -1
+        return result
+
+class RangeTree:
+    """
+    A nested range table (e.g. 營授比 then 十足擔保比率) compiled level by level.
+
+    A query walks the levels in first-match order and falls through to the next matching
+    range of an outer level when no inner range matches, like the original nested loops.
+
+    Attributes:
+    table (CompiledRangeTable): Compiled ranges of this level.
+    children (tuple): Child RangeTree, or leaf values, indexed by bucket.
+    depth (int): Number of range levels from this node down.
+    leaves (tuple): Every leaf value below this node, numbered by leaf id.
+    """
+    def __init__(self, mapping, depth):
+        """
+        Compile a nested mapping of range strings.
+
+        Parameters:
+        mapping (dict): Range string to child mapping or leaf value.
+        depth (int): Number of range levels to compile.
+        """
+        self.table = CompiledRangeTable(mapping.keys())
+        self.depth = depth
+        self.children = tuple(
+            RangeTree(mapping[label], depth - 1) if depth > 1 else mapping[label]
+            for label in self.table.labels
+        )
+
+        leaves = []
+        self._leaf_offsets = []
+        for child in self.children:
+            self._leaf_offsets.append(len(leaves))
+            if depth > 1:
+                leaves.extend(child.leaves)
+            else:
+                leaves.append(child)
+        self.leaves = tuple(leaves)
+
+    def query(self, *values):
+        """
+        Get the leaf value for one value per level.
+
+        Parameters:
+        *values (float): One value per level, outermost first.
+
+        Returns:
+        The leaf value, or None if no range matches.
+        """
+        for bucket in self.table.matching_buckets(values[0]):
+            child = self.children[bucket]
+            if self.depth == 1:
+                return child
+            leaf = child.query(*values[1:])
+            if leaf is not None:
+                return leaf
+        return None
+
+    def leaf_ids(self, *columns):
+        """
+        Resolve the leaf of every row for whole columns, one column per level.
+
+        Follows the same fall-through order as query. None leaves count as no match.
+
+        Parameters:
+        *columns (np.ndarray): One column of values per level, outermost first. NaN never matches.
+
+        Returns:
+        np.ndarray: Leaf ids into leaves, -1 where no range matches.
+        """
+        columns = [np.asarray(column, dtype=float) for column in columns]
+        result = np.full(len(columns[0]), -1, dtype=np.int64)
+        rows = np.arange(len(columns[0]))
+        for rank in range(self.table.segment_buckets.shape[1]):
+            if rows.size == 0:
+                break
+            candidate = self.table.buckets(columns[0][rows], rank=rank)
+            for bucket in np.unique(candidate[candidate >= 0]):
+                selected = rows[candidate == bucket]
+                child = self.children[bucket]
+                offset = self._leaf_offsets[bucket]
+                if self.depth == 1:
+                    result[selected] = offset if child is not None else -1
+                else:
+                    found = child.leaf_ids(*(column[selected] for column in columns[1:]))
+                    result[selected] = np.where(found >= 0, found + offset, -1)
+            # Rows still unresolved with another matching range at this level try it next
+            rows = rows[(result[rows] < 0) & (candidate >= 0)]
+        return result
+
+def compile_range_tables(table, key_depth, range_depth):
+    """
+    Compile every range tree of a PD conversion table.
+
+    Parameters:
+    table (dict): Loaded PD conversion table.
+    key_depth (int): Number of plain key levels (sector, scenario, section) above the ranges.
+    range_depth (int): Number of range levels below the keys.
+
+    Returns:
+    dict: RangeTree by key; keys are tuples when key_depth is above one.
+    """
+    def walk(node, prefix):
+        if len(prefix) == key_depth:
+            yield (prefix if key_depth > 1 else prefix[0]), RangeTree(node, range_depth)
+            return
+        for key, child in node.items():
+            yield from walk(child, prefix + (key,))
+
+    return dict(walk(table, ()))
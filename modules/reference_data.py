@@ -0,0 +1,238 @@
+import json
+import os
+import threading
+from functools import lru_cache
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.normpath(os.path.join(current_dir, '../data'))
+
+
+class FrozenDict(dict):
+    """
+    A read-only dictionary used for loaded reference tables.
+
+    It is still a ``dict`` so existing ``isinstance(value, dict)`` checks keep working.
+    """
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Reference data tables are read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value):
+    """
+    Recursively convert loaded JSON into read-only containers.
+
+    Parameters:
+    value: Parsed JSON value.
+
+    Returns:
+    The same value with dicts converted to FrozenDict and lists converted to tuples.
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ReferenceData:
+    """
+    An immutable registry holding every JSON reference table under ``data/``.
+
+    Tables are addressed by their path relative to the data directory without the extension,
+    e.g. ``'Physical_Risk/revenue_loss_percentage_by_risk_level'``, and each one is parsed once,
+    the first time it is used, so a run only pays for the tables its portfolio type reads.
+    Structures compiled from the tables (indexes, lookup arrays) are built on first use and cached
+    on the registry through ``derived``.
+    """
+    def __init__(self, data_dir=DATA_DIR):
+        """
+        Find every JSON table under the data directory; none is parsed yet.
+
+        Parameters:
+        data_dir (str): Path to the data directory.
+        """
+        paths = {}
+        for root, dirs, files in os.walk(data_dir):
+            dirs.sort()
+            for file_name in sorted(files):
+                if not file_name.endswith('.json'):
+                    continue
+                path = os.path.join(root, file_name)
+                paths[os.path.splitext(os.path.relpath(path, data_dir))[0].replace(os.sep, '/')] = path
+
+        object.__setattr__(self, 'data_dir', data_dir)
+        object.__setattr__(self, '_paths', FrozenDict(paths))
+        object.__setattr__(self, '_tables', {})
+        object.__setattr__(self, '_derived', {})
+        object.__setattr__(self, '_derived_lock', threading.RLock())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ReferenceData is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ReferenceData is immutable")
+
+    def table(self, name):
+        """
+        Get a loaded table by its relative name.
+
+        Parameters:
+        name (str): Table name relative to the data directory, without the extension.
+
+        Returns:
+        The loaded table.
+        """
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+        try:
+            path = self._paths[name]
+        except KeyError:
+            raise KeyError(f"Unknown reference table: {name}") from None
+        with self._derived_lock:
+            if name not in self._tables:
+                with open(path, 'r', encoding='utf-8') as file:
+                    self._tables[name] = freeze(json.load(file))
+            return self._tables[name]
+
+    @property
+    def tables(self):
+        """
+        Every table by name, parsing those not used yet.
+
+        Returns:
+        FrozenDict: The loaded tables.
+        """
+        return FrozenDict((name, self.table(name)) for name in self._paths)
+
+    def derived(self, name, builder):
+        """
+        Get a structure compiled from the tables, building it on first use.
+
+        Parameters:
+        name (str): Cache key of the structure.
+        builder (callable): Called with this registry to build the structure.
+
+        Returns:
+        The cached structure.
+        """
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+    @property
+    def sector_mapping(self):
+        return self.table('Industry_to_Sector/Industry_to_Sector')
+
+    @property
+    def collateral_region_levels(self):
+        return self.table('Physical_Risk/collateral_value_loss_by_region_and_scenario_risk_level')
+
+    @property
+    def collateral_loss_percentages(self):
+        return self.table('Physical_Risk/collateral_value_loss_percentage_by_risk_level')
+
+    @property
+    def revenue_region_levels(self):
+        return self.table('Physical_Risk/revenue_loss_by_region_and_scenario_risk_level')
+
+    @property
+    def revenue_loss_percentages(self):
+        return self.table('Physical_Risk/revenue_loss_percentage_by_risk_level')
+
+    @property
+    def country_classification(self):
+        return self.table('Transition_Risk/classification_table_by_country')
+
+    @property
+    def industry_classification(self):
+        return self.table('Transition_Risk/classification_table_by_industry')
+
+    @property
+    def industry_impact_percentages(self):
+        return self.table('Transition_Risk/impact_on_industries_percentage_by_risk_level')
+
+    @property
+    def scenario_adjustments(self):
+        return self.table('Transition_Risk/scenario_adjustment_table')
+
+    @property
+    def pd_corporate(self):
+        return self.table('pd_conversion/Domestic_Corporate_Credit')
+
+    @property
+    def pd_personal_mortgage(self):
+        return self.table('pd_conversion/Domestic_Personal_Mortgage')
+
+    @property
+    def pd_personal_other(self):
+        return self.table('pd_conversion/Domestic_Personal_Other')
+
+    @property
+    def pd_overseas(self):
+        return self.table('pd_conversion/Overseas_Credit')
+
+    @property
+    def group_grading_mapping(self):
+        return self.table('pd_conversion/group_grading_mapping')
+
+    @property
+    def collateral_region_table(self):
+        from .region_risk_table import RegionRiskTable
+        return self.derived('collateral_region_table', lambda data: RegionRiskTable(data.collateral_region_levels, data.collateral_loss_percentages))
+
+    @property
+    def revenue_region_table(self):
+        from .region_risk_table import RegionRiskTable
+        return self.derived('revenue_region_table', lambda data: RegionRiskTable(data.revenue_region_levels, data.revenue_loss_percentages))
+
+    @property
+    def pd_corporate_ranges(self):
+        from .range_table import compile_range_tables
+        return self.derived('pd_corporate_ranges', lambda data: compile_range_tables(data.pd_corporate, key_depth=2, range_depth=2))
+
+    @property
+    def pd_corporate_cube(self):
+        from .pd_cube import CorporatePDCube
+        return self.derived('pd_corporate_cube', lambda data: CorporatePDCube(data.pd_corporate, data.pd_corporate_ranges))
+
+    @property
+    def pd_personal_mortgage_ranges(self):
+        from .range_table import compile_range_tables
+        return self.derived('pd_personal_mortgage_ranges', lambda data: compile_range_tables(data.pd_personal_mortgage, key_depth=1, range_depth=2))
+
+    @property
+    def pd_personal_mortgage_tables(self):
+        from .pd_cube import compile_pd_tables
+        return self.derived('pd_personal_mortgage_tables', lambda data: compile_pd_tables(data.pd_personal_mortgage_ranges))
+
+    @property
+    def pd_personal_other_ranges(self):
+        from .range_table import compile_range_tables
+        return self.derived('pd_personal_other_ranges', lambda data: compile_range_tables(data.pd_personal_other, key_depth=2, range_depth=1))
+
+    @property
+    def pd_personal_other_tables(self):
+        from .pd_cube import compile_pd_tables
+        return self.derived('pd_personal_other_tables', lambda data: compile_pd_tables(data.pd_personal_other_ranges))
+
+
+@lru_cache(maxsize=None)
+def get_reference_data(data_dir=DATA_DIR):
+    """
+    Get the process-wide reference data registry, loading it on first use.
+
+    Parameters:
+    data_dir (str): Path to the data directory.
+
+    Returns:
+    ReferenceData: The shared registry.
+    """
+    return ReferenceData(data_dir)
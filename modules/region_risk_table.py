@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from .common import STRESSED_SCENARIOS, standardize_city_name
+from .numeric import round_significant
+
+def normalize_region_key(city, district):
+    """
+    Build the lookup key for a city and district pair.
+
+    Parameters:
+    city (str): Name of the city.
+    district (str): Name of the district.
+
+    Returns:
+    tuple: The normalized (縣市, 鄉鎮市區) key.
+    """
+    return (
+        standardize_city_name(city) if isinstance(city, str) else city,
+        standardize_city_name(district) if isinstance(district, str) else district
+    )
+
+class RegionRiskTable:
+    """
+    A hash-indexed view of a regional risk level table and its loss percentage table.
+
+    Each region record gets a region id (its position in the source list). Risk levels and
+    loss percentages are held as region-id by scenario matrices so whole columns of
+    city and district can be resolved with a single gather.
+
+    Attributes:
+    scenarios (tuple): Scenario names, in matrix column order.
+    records (tuple): Source region records, indexed by region id.
+    risk_levels (np.ndarray): Risk level per region and scenario, NaN when missing.
+    loss_percentages (np.ndarray): Loss percentage per region and scenario, NaN when the risk level has no match.
+    value_factors (np.ndarray): Share of value kept, 1 - loss percentage / 100, rounded like the Decimal scalar code.
+    """
+    def __init__(self, region_records, loss_percentage_records, scenarios=STRESSED_SCENARIOS):
+        """
+        Build the index and matrices from the loaded tables.
+
+        Parameters:
+        region_records (list): Records with 縣市, 鄉鎮市區 and a risk level per scenario.
+        loss_percentage_records (list): Records with 風險等級 and a loss percentage per scenario.
+        scenarios (tuple): Scenario names to index.
+        """
+        self.scenarios = tuple(scenarios)
+        self.records = tuple(region_records)
+
+        # The first record wins for duplicated keys, matching the previous linear scan
+        self.index = {}
+        for region_id, record in enumerate(self.records):
+            self.index.setdefault(normalize_region_key(record["縣市"], record["鄉鎮市區"]), region_id)
+
+        percentages_by_level = {}
+        for record in loss_percentage_records:
+            percentages_by_level.setdefault(record["風險等級"], record)
+
+        self.risk_levels = np.full((len(self.records), len(self.scenarios)), np.nan)
+        self.loss_percentages = np.full((len(self.records), len(self.scenarios)), np.nan)
+        for region_id, record in enumerate(self.records):
+            for column, scenario in enumerate(self.scenarios):
+                if scenario not in record:
+                    continue
+                risk_level = record[scenario]
+                self.risk_levels[region_id, column] = risk_level
+                level_record = percentages_by_level.get(risk_level)
+                if level_record is not None and scenario in level_record:
+                    self.loss_percentages[region_id, column] = level_record[scenario]
+        self.value_factors = round_significant(1 - round_significant(self.loss_percentages / 100))
+
+    def lookup(self, city, district):
+        """
+        Find the region id for a city and district.
+
+        Parameters:
+        city (str): Name of the city.
+        district (str): Name of the district.
+
+        Returns:
+        int: The region id, or None if the region is not in the table.
+        """
+        return self.index.get(normalize_region_key(city, district))
+
+    def find_record(self, city, district):
+        """
+        Find the source record for a city and district.
+
+        Parameters:
+        city (str): Name of the city.
+        district (str): Name of the district.
+
+        Returns:
+        dict: The matching record, or None if not found.
+        """
+        region_id = self.lookup(city, district)
+        return self.records[region_id] if region_id is not None else None
+
+    def loss_percentages_for_region(self, region_id):
+        """
+        Get the loss percentage of each scenario for one region.
+
+        Parameters:
+        region_id (int): Region id.
+
+        Returns:
+        dict: Loss percentages by scenario, omitting scenarios without a matching risk level.
+        """
+        return {
+            scenario: float(value)
+            for scenario, value in zip(self.scenarios, self.loss_percentages[region_id])
+            if not np.isnan(value)
+        }
+
+    def lookup_ids(self, cities, districts):
+        """
+        Resolve region ids for whole columns of cities and districts.
+
+        The (city, district) pairs are factorized first, so each distinct pair is normalized
+        and looked up once and its id broadcast back to every row that has it; the cost of
+        the lookups follows the number of distinct regions, not the number of rows. Rows with
+        a missing city or district are looked up one by one, since factorizing does not tell
+        None from NaN and the table has regions without a district.
+
+        Parameters:
+        cities (array-like): City names.
+        districts (array-like): District names.
+
+        Returns:
+        np.ndarray: Region ids, -1 where the region is not in the table.
+        """
+        cities = np.asarray(cities, dtype=object)
+        districts = np.asarray(districts, dtype=object)
+        city_codes, city_values = pd.factorize(cities)
+        district_codes, district_values = pd.factorize(districts)
+        # Codes are shifted by one so the -1 of missing values keeps to its own digit
+        width = len(district_values) + 1
+        pair_codes, pairs = pd.factorize((city_codes + 1) * width + district_codes + 1)
+        city_positions, district_positions = np.divmod(pairs, width)
+        complete = (city_positions > 0) & (district_positions > 0)
+
+        index = self.index
+        pair_ids = np.full(len(pairs), -1, dtype=np.int64)
+        pair_ids[complete] = np.fromiter(
+            (index.get(normalize_region_key(city, district), -1) for city, district in zip(city_values[city_positions[complete] - 1], district_values[district_positions[complete] - 1])),
+            dtype=np.int64,
+            count=int(complete.sum())
+        )
+        region_ids = pair_ids[pair_codes]
+        missing = (city_codes < 0) | (district_codes < 0)
+        if missing.any():
+            region_ids[missing] = [index.get(normalize_region_key(city, district), -1) for city, district in zip(cities[missing], districts[missing])]
+        return region_ids
+
+    def gather(self, matrix, region_ids):
+        """
+        Gather rows of a region-id by scenario matrix.
+
+        Parameters:
+        matrix (np.ndarray): Either risk_levels or loss_percentages.
+        region_ids (np.ndarray): Region ids, -1 for unknown regions.
+
+        Returns:
+        np.ndarray: One row per region id, NaN for unknown regions.
+        """
+        region_ids = np.asarray(region_ids, dtype=np.int64)
+        rows = matrix[np.where(region_ids >= 0, region_ids, 0)]
+        rows[region_ids < 0] = np.nan
+        return rows
+
+    def risk_levels_for(self, cities, districts):
+        """
+        Get the risk level matrix for whole columns of cities and districts.
+
+        Parameters:
+        cities (array-like): City names.
+        districts (array-like): District names.
+
+        Returns:
+        np.ndarray: Risk levels with one row per input and one column per scenario.
+        """
+        return self.gather(self.risk_levels, self.lookup_ids(cities, districts))
+
+    def loss_percentages_for(self, cities, districts):
+        """
+        Get the loss percentage matrix for whole columns of cities and districts.
+
+        Parameters:
+        cities (array-like): City names.
+        districts (array-like): District names.
+
+        Returns:
+        np.ndarray: Loss percentages with one row per input and one column per scenario.
+        """
+        return self.gather(self.loss_percentages, self.lookup_ids(cities, districts))
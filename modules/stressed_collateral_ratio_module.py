@@ -1,8 +1,8 @@
-from decimal import Decimal, getcontext
-getcontext().prec = 10
-from .common import standardize_city_name, find_parameters, find_risk_level_parameters
+from decimal import Decimal, localcontext
+from .numeric import DECIMAL_CONTEXT
+from .reference_data import get_reference_data
 
-def calculate_stressed_collateral_value(city, district, collateral_value):
+def calculate_stressed_collateral_value(city, district, collateral_value, reference_data=None):
     """
     Calculate stressed collateral values under different scenarios.
 
@@ -10,38 +10,27 @@ def calculate_stressed_collateral_value(city, district, collateral_value):
     city (str): City name.
     district (str): District name.
     collateral_value (float): Collateral value.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
 
     Returns:
     dict: Stressed collateral values for various scenarios. If no matching parameters are found, returns an empty dictionary.
     """
-    from .common import region_data, risk_level_data
-    city = standardize_city_name(city)
-    record = find_parameters(city, district, region_data)
-    if not record:
+    if reference_data is None:
+        reference_data = get_reference_data()
+    region_table = reference_data.collateral_region_table
+    region_id = region_table.lookup(city, district)
+    if region_id is None:
         return {}  
     
     results = {}
-    scenarios = [
-        "2050淨零轉型 2030",
-        "2050淨零轉型 2050",
-        "無序轉型 2030",
-        "無序轉型 2050",
-        "無政策情境 2030",
-        "無政策情境 2050",
-        "無政策情境 2090"
-    ]
-    
-    for scenario in scenarios:
-        if scenario in record:
-            risk_level = Decimal(record[scenario])
-            risk_level_params = find_risk_level_parameters(risk_level, risk_level_data)
-            if risk_level_params:
-                result = (Decimal(1) - Decimal(risk_level_params[scenario]) / Decimal(100)) * Decimal(collateral_value)
-                results[scenario] = float(result)
+    with localcontext(DECIMAL_CONTEXT):
+        for scenario, loss_percentage in region_table.loss_percentages_for_region(region_id).items():
+            result = (Decimal(1) - Decimal(loss_percentage) / Decimal(100)) * Decimal(collateral_value)
+            results[scenario] = float(result)
     
     return results
 
-def calculate_stressed_collateral_ratio(total_credit, city_input, district_input, collateral_value):
+def calculate_stressed_collateral_ratio(total_credit, city_input, district_input, collateral_value, reference_data=None):
     """
     Calculate stressed collateral ratios under different scenarios.
 
@@ -50,6 +39,7 @@ def calculate_stressed_collateral_ratio(total_credit, city_input, district_input
     city_input (str): City name.
     district_input (str): District name.
     collateral_value (float): Collateral value.
+    reference_data (ReferenceData): Reference data registry. Defaults to the process-wide registry.
 
     Returns:
     dict: Stressed collateral ratios for various scenarios.
@@ -57,12 +47,14 @@ def calculate_stressed_collateral_ratio(total_credit, city_input, district_input
     results = calculate_stressed_collateral_value(
         city_input, 
         district_input, 
-        collateral_value
+        collateral_value,
+        reference_data
     )
     if not results:
         return None
     
-    stressed_collateral_ratios = {scenario: float(Decimal(val) * Decimal(0.8) / Decimal(total_credit)) for scenario, val in results.items()}
+    with localcontext(DECIMAL_CONTEXT):
+        stressed_collateral_ratios = {scenario: float(Decimal(val) * Decimal(0.8) / Decimal(total_credit)) for scenario, val in results.items()}
     return stressed_collateral_ratios
 
 def calculate_collateral_ratio(collateral_value, total_credit):
@@ -76,5 +68,6 @@ def calculate_collateral_ratio(collateral_value, total_credit):
     Returns:
     float: The ratio of collateral value to total credit.
     """
-    collateral_ratio = float(Decimal(collateral_value) * Decimal(0.8) / Decimal(total_credit))
+    with localcontext(DECIMAL_CONTEXT):
+        collateral_ratio = float(Decimal(collateral_value) * Decimal(0.8) / Decimal(total_credit))
     return collateral_ratio
@@ -1,15 +1,9 @@
+from decimal import Decimal, localcontext
+from .numeric import DECIMAL_CONTEXT
 from .net_operating_income_loss_module import NetOperatingIncomeLossCalculator
 
-def calculate_stressed_net_operating_income(net_revenue, industry, city, district, credit):
-    from decimal import Decimal, getcontext
-    getcontext().prec = 10
-
-    calculator = NetOperatingIncomeLossCalculator(
-        './data/Transition_Risk/classification_table_by_industry.json',
-        './data/Transition_Risk/impact_on_industries_percentage_by_risk_level.json',
-        './data/Physical_Risk/revenue_loss_by_region_and_scenario_risk_level.json',
-        './data/Physical_Risk/revenue_loss_percentage_by_risk_level.json'
-    )
+def calculate_stressed_net_operating_income(net_revenue, industry, city, district, credit, reference_data=None):
+    calculator = NetOperatingIncomeLossCalculator(reference_data)
 
     income_risk = calculator.get_company_risk_levels_and_impacts(
         industry,
@@ -19,8 +13,9 @@ def calculate_stressed_net_operating_income(net_revenue, industry, city, distric
 
     stressed_net_income_ratios = {}
     if income_risk:
-        for scenario, risk_percentage in income_risk.items():
-            stressed_net_income_ratios[scenario] = float(Decimal(net_revenue) * (Decimal(1) - Decimal(risk_percentage) / Decimal(100)) / Decimal(credit))
+        with localcontext(DECIMAL_CONTEXT):
+            for scenario, risk_percentage in income_risk.items():
+                stressed_net_income_ratios[scenario] = float(Decimal(net_revenue) * (Decimal(1) - Decimal(risk_percentage) / Decimal(100)) / Decimal(credit))
     return stressed_net_income_ratios
 
 def calculate_net_operating_income(net_revenue, credit):